@@ -0,0 +1,240 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/agent_runtime.py
+"""
+Agent runtime: LLM clients, HTTP pools and AgentExecutors built ONCE per process.
+
+Importing an agent module no longer creates chat clients or executors; they are
+built lazily here on first use and then shared by every request:
+
+- 🔌 One `httpx.Client` / `httpx.AsyncClient` with keep-alive pooling, shared by
+  all chat models → no TLS handshake per request to the LLM provider
+- ⏱️ Every request those clients send is capped by the caller's remaining
+  request budget (`agents.request_budget.client_timeout()`)
+- 🤖 One chat model per role (`LLM_SPECS`)
+- 📦 Every chat model shares the SQLite response cache (`utils.llm_cache`):
+  identical prompts skip the provider, `LLM_CACHE_MODE=replay` runs offline
+- 🧰 One AgentExecutor per agent — executors keep no per-run state, so they are
+  safe to share across concurrent requests
+
+Each request gets its own lightweight `RunnableConfig` (run name, tags,
+request id) via `invocation_config()` instead of its own objects.
+
+✅ Usage:
+     from agents.agent_runtime import get_enhancer_executor, invocation_config
+     get_enhancer_executor().invoke({"input": query}, config=invocation_config(agent="enhancer"))
+"""
+
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from langchain_core.runnables import RunnableConfig
+
+from agents.request_budget import DeadlineExceeded, client_timeout
+from utils.llm_cache import get_llm_cache
+from utils.metrics import get_metrics_callback
+from utils.tracing import get_tracing_callback
+
+
+# ─── Tunables ──────────────────────────────────────────────
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "0") == "1"
+HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "120"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "60"))
+# Per LLM call (the request deadline bounds the whole run, see agents.request_budget)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "3"))
+AGENT_MAX_EXECUTION_SECONDS = float(os.getenv("AGENT_MAX_EXECUTION_SECONDS", "20"))
+
+# 📦 Chat model per role: (provider, model name)
+LLM_SPECS: Dict[str, Dict[str, str]] = {
+    "enhancer": {"provider": "together", "model": "mistralai/Mistral-7B-Instruct-v0.2"},
+    # Mistral-7B-Instruct-v0.2 has no function-calling support on Together
+    "enhancer_tools": {
+        "provider": "together",
+        "model": os.getenv("ENHANCER_TOOL_CALLING_MODEL", "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"),
+    },
+    "search": {"provider": "together", "model": "meta-llama/Llama-3.3-70B-Instruct-Turbo"},
+    "supervisor": {"provider": "openai", "model": "gpt-4o"},
+}
+
+_lock = threading.RLock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_components: Dict[str, Any] = {}
+
+
+def _memoized(name: str, factory: Callable[[], Any]) -> Any:
+    """Build `name` once (thread-safe) and return the shared instance."""
+    component = _components.get(name)
+    if component is None:
+        with _lock:
+            component = _components.get(name)
+            if component is None:
+                component = factory()
+                _components[name] = component
+    return component
+
+
+# ─── HTTP pools ────────────────────────────────────────────
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+    )
+
+
+def _apply_deadline(request: httpx.Request) -> None:
+    """Request hook: shrink the request's timeouts to what the deadline scope has left."""
+    remaining = client_timeout()
+    if remaining is None:
+        return
+    if remaining <= 0:
+        raise DeadlineExceeded(f"No budget left for {request.method} {request.url.host}")
+    timeout = dict(request.extensions.get("timeout") or httpx.Timeout(HTTP_TIMEOUT_SECONDS).as_dict())
+    request.extensions["timeout"] = {
+        name: remaining if value is None else min(value, remaining) for name, value in timeout.items()
+    }
+
+
+async def _aapply_deadline(request: httpx.Request) -> None:
+    _apply_deadline(request)
+
+
+def get_http_client() -> httpx.Client:
+    """Returns the process-wide pooled sync HTTP client for LLM calls."""
+    global _http_client
+
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits(), timeout=HTTP_TIMEOUT_SECONDS,
+                                        event_hooks={"request": [_apply_deadline]})
+
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide pooled async HTTP client for LLM calls."""
+    global _async_http_client
+
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(limits=_limits(), timeout=HTTP_TIMEOUT_SECONDS,
+                                                   event_hooks={"request": [_aapply_deadline]})
+
+    return _async_http_client
+
+
+# ─── Chat models ───────────────────────────────────────────
+def _build_llm(role: str):
+    spec = LLM_SPECS[role]
+    shared = {
+        "model": spec["model"],
+        "temperature": 0,
+        "timeout": LLM_TIMEOUT_SECONDS,
+        "max_retries": LLM_MAX_RETRIES,
+        "http_client": get_http_client(),
+        "http_async_client": get_async_http_client(),
+        "cache": get_llm_cache(),
+        # Latency + token metrics / spans for direct model calls (runs via invocation_config get them too)
+        "callbacks": [get_metrics_callback(), get_tracing_callback()],
+    }
+    if spec["provider"] == "together":
+        from langchain_together import ChatTogether
+        return ChatTogether(api_key=os.getenv("together_ai_api_key"), **shared)
+    if spec["provider"] == "openai":
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(**shared)
+    raise ValueError(f"Unknown LLM provider for role {role!r}: {spec['provider']}")
+
+
+def get_llm(role: str):
+    """Returns the shared chat model for `role` (see LLM_SPECS)."""
+    return _memoized(f"llm:{role}", lambda: _build_llm(role))
+
+
+# ─── Agents & executors ────────────────────────────────────
+def get_enhancer_agent():
+    from agents.enhancer_agent import build_enhancer_agent
+    return _memoized("agent:enhancer", build_enhancer_agent)
+
+
+def get_qdrant_search_agent():
+    from agents.qdrant_search_agent import build_qdrant_search_agent
+    return _memoized("agent:qdrant_search", build_qdrant_search_agent)
+
+
+def get_enhancer_executor():
+    """Returns the shared enhancer AgentExecutor."""
+    def build():
+        from langchain.agents import AgentExecutor
+        from tools.enhancer_tools_registry import enhancer_tools
+        return AgentExecutor(
+            agent=get_enhancer_agent(),
+            tools=enhancer_tools,
+            verbose=AGENT_VERBOSE,
+            handle_parsing_errors=True,
+            max_iterations=AGENT_MAX_ITERATIONS,
+            max_execution_time=AGENT_MAX_EXECUTION_SECONDS,
+        )
+    return _memoized("executor:enhancer", build)
+
+
+def get_qdrant_executor():
+    """Returns the shared Qdrant search AgentExecutor."""
+    def build():
+        from langchain.agents import AgentExecutor
+        from tools.qdrant_tools_registry import qdrant_tools
+        return AgentExecutor(
+            agent=get_qdrant_search_agent(),
+            tools=qdrant_tools,
+            verbose=AGENT_VERBOSE,
+            handle_parsing_errors=True,
+            max_iterations=AGENT_MAX_ITERATIONS,
+            max_execution_time=AGENT_MAX_EXECUTION_SECONDS,
+        )
+    return _memoized("executor:qdrant_search", build)
+
+
+def warm_up() -> None:
+    """Build every shared component now instead of on the first request."""
+    get_enhancer_executor()
+    get_qdrant_executor()
+    get_llm("supervisor")
+
+
+# ─── Per-request context ───────────────────────────────────
+def invocation_config(request_id: Optional[str] = None, agent: Optional[str] = None,
+                      **metadata: Any) -> RunnableConfig:
+    """
+    Lightweight per-request context passed as `config=` to the shared
+    executors: run name, tags and metadata (request id) for tracing/callbacks.
+    """
+    request_id = request_id or uuid.uuid4().hex
+    config: RunnableConfig = {
+        "metadata": {"request_id": request_id, **metadata},
+        "tags": [f"request:{request_id}"],
+        # Times / traces every LLM and tool call of the run (utils.metrics, utils.tracing)
+        "callbacks": [get_metrics_callback(), get_tracing_callback()],
+    }
+    if agent:
+        config["run_name"] = agent
+        config["tags"].append(f"agent:{agent}")
+    return config
@@ -0,0 +1,302 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/batch_chat.py
+"""
+Bulk chat: thousands of canned questions with shared work instead of one
+`/chat` call each.
+
+Queries are processed in chunks of `BATCH_CHUNK_SIZE`; per chunk:
+
+    1. dedupe       identical queries (normalized text) are answered once
+    2. rules        rule-based enhancement for every unique query
+    3. LLM          the enhancer cache first, then ONE `executor.batch(...)`
+                    call (bounded by `BATCH_LLM_CONCURRENCY`) for the rest
+    4. search       identical (query, filters, k) searches are merged; the
+                    direct ones are embedded in one `embed_documents` call and
+                    sent as `query_batch_points` groups of `BATCH_QDRANT_GROUP`,
+                    `BATCH_SEARCH_CONCURRENCY` groups at a time; compare /
+                    summarise questions go through the search agent's `batch`
+
+With an output file, each finished chunk is appended to it — the file is the
+checkpoint: a re-run skips every query already answered there.
+
+✅ Usage:
+     from agents.batch_chat import run_chat_batch
+     results, report = run_chat_batch(["fintech startups in bengaluru", ...])
+
+✅ CLI:
+     python agents/batch_chat.py questions.jsonl answers.jsonl [--no-resume]
+     # input lines: {"id": ..., "query": "..."} or "plain question"
+"""
+
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from agents.agent_runtime import get_enhancer_executor, get_qdrant_executor, invocation_config
+from agents.enhancer_agent import enhancer_payload
+from agents.enhancer_pipeline import run_rule_enhancer
+from agents.search_pipeline import (
+    needs_post_processing, qdrant_timeout, search_agent_input, search_key, to_qdrant_filter, to_search_input
+)
+from schema.tools_schema import QdrantSearchInput
+from utils.enhancer_cache import cache_key, get_enhancer_cache
+from utils.logger import get_logger
+from utils.metrics import timer
+from utils.tracing import start_trace
+
+
+# ─── Tunables ──────────────────────────────────────────────
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "64"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))
+BATCH_QDRANT_GROUP = int(os.getenv("BATCH_QDRANT_GROUP", "32"))
+BATCH_SEARCH_CONCURRENCY = int(os.getenv("BATCH_SEARCH_CONCURRENCY", "4"))
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "1000"))      # per /chat/batch request
+
+log = get_logger("batch_chat")
+
+
+@dataclass
+class BatchReport:
+    """Throughput and how much work the batch shared."""
+    queries: int = 0             # input lines
+    resumed: int = 0             # already answered in the output file
+    unique: int = 0              # distinct queries processed
+    agent_calls: int = 0         # enhancer agent runs (in batch calls)
+    cache_hits: int = 0          # enhancer cache hits
+    searches: int = 0            # distinct searches sent to Qdrant
+    qdrant_requests: int = 0     # query_batch_points round trips
+    post_processed: int = 0      # searches answered by the search agent
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def queries_per_second(self) -> float:
+        return round((self.queries - self.resumed) / self.elapsed_seconds, 2) if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "queries_per_second": self.queries_per_second}
+
+
+# ─── Input / checkpoint ────────────────────────────────────
+def read_queries(path: str) -> List[Dict[str, Any]]:
+    """JSONL → [{"id", "query"}]; plain-string lines get their line number as id."""
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"query": record}
+            items.append({"id": record.get("id", number), "query": record["query"]})
+    return items
+
+
+def answered_keys(path: Optional[str]) -> Set[str]:
+    """Normalized queries already in the output file (the checkpoint)."""
+    if not path or not os.path.exists(path):
+        return set()
+    keys = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                keys.add(cache_key(json.loads(line)["query"]))
+            except (ValueError, KeyError):
+                continue            # a line cut by a crash: that query runs again
+    return keys
+
+
+# ─── Stages ────────────────────────────────────────────────
+def _enhance(queries: List[str], report: BatchReport) -> Dict[str, Dict[str, Any]]:
+    """Unique query → enhancer payload {query, filters, k}."""
+    rules = {q: run_rule_enhancer(q) for q in queries}
+    payloads = {q: r.output.model_dump() for q, r in rules.items() if not r.needs_agent}
+
+    cache = get_enhancer_cache()
+    pending = []
+    for q, r in rules.items():
+        if not r.needs_agent:
+            continue
+        cached = cache.get(q) if cache else None
+        if cached is not None:
+            report.cache_hits += 1
+            payloads[q] = cached.model_dump()
+        else:
+            pending.append(q)
+
+    if pending:
+        report.agent_calls += len(pending)
+        results = get_enhancer_executor().batch(
+            [{"input": q} for q in pending],
+            config=invocation_config(agent="enhancer", batch=True),
+            return_exceptions=True,
+            max_concurrency=BATCH_LLM_CONCURRENCY,
+        )
+        for q, result in zip(pending, results):
+            if isinstance(result, Exception):
+                log.warning("batch.enhancer_failed", query=q, error=str(result))
+                payloads[q] = rules[q].output.model_dump()
+                continue
+            payloads[q], enhanced = enhancer_payload(result, rules[q].output)
+            if cache and enhanced is not None:
+                cache.put(q, enhanced)
+    return payloads
+
+
+def _qdrant_group(searches: List[QdrantSearchInput], vectors: List[List[float]]) -> List[List[Dict[str, Any]]]:
+    from qdrant_client.http.models import QueryRequest
+    from utils.qdrant_client_loader import get_qdrant_client, get_qdrant_collection_name
+
+    with timer("tool", "qdrant_batch_search"):
+        responses = get_qdrant_client().query_batch_points(
+            collection_name=get_qdrant_collection_name(),
+            requests=[
+                QueryRequest(query=vector, filter=to_qdrant_filter(s.filters), limit=s.k, with_payload=True)
+                for s, vector in zip(searches, vectors)
+            ],
+            timeout=qdrant_timeout(),
+        )
+    return [
+        [{"id": point.id, "score": point.score, "payload": point.payload} for point in response.points]
+        for response in responses
+    ]
+
+
+def _search(searches: Dict[str, QdrantSearchInput], post_process: Dict[str, str],
+            report: BatchReport) -> Dict[str, Any]:
+    """Search key → hits. Direct searches in grouped batch requests, the rest via the search agent."""
+    from utils.embedding_loader import get_embedding_model
+
+    hits: Dict[str, Any] = {}
+    direct = [key for key in searches if key not in post_process]
+    report.searches += len(searches)
+
+    if direct:
+        vectors = get_embedding_model().embed_documents([searches[key].query for key in direct])
+        groups = [
+            (direct[i:i + BATCH_QDRANT_GROUP], vectors[i:i + BATCH_QDRANT_GROUP])
+            for i in range(0, len(direct), BATCH_QDRANT_GROUP)
+        ]
+        report.qdrant_requests += len(groups)
+        with ThreadPoolExecutor(max_workers=BATCH_SEARCH_CONCURRENCY, thread_name_prefix="batch-search") as pool:
+            futures = [
+                (keys, pool.submit(contextvars.copy_context().run, _qdrant_group, [searches[key] for key in keys], group_vectors))
+                for keys, group_vectors in groups
+            ]
+            for keys, future in futures:
+                try:
+                    for key, result in zip(keys, future.result()):
+                        hits[key] = result
+                except Exception as e:
+                    log.error("batch.qdrant_failed", error=str(e), searches=len(keys))
+                    for key in keys:
+                        hits[key] = e
+
+    agent_keys = [key for key in searches if key in post_process]
+    if agent_keys:
+        report.post_processed += len(agent_keys)
+        results = get_qdrant_executor().batch(
+            [{"input": search_agent_input(post_process[key], searches[key])} for key in agent_keys],
+            config=invocation_config(agent="qdrant_search", batch=True),
+            return_exceptions=True,
+            max_concurrency=BATCH_LLM_CONCURRENCY,
+        )
+        for key, result in zip(agent_keys, results):
+            hits[key] = result if isinstance(result, Exception) else result["output"]
+    return hits
+
+
+def _run_chunk(items: List[Dict[str, Any]], report: BatchReport) -> List[Dict[str, Any]]:
+    """Answer one chunk: one output record per input item (duplicates share the work)."""
+    unique: Dict[str, str] = {}                     # normalized → first raw query
+    for item in items:
+        unique.setdefault(cache_key(item["query"]), item["query"])
+    report.unique += len(unique)
+
+    payloads = _enhance(list(unique.values()), report)
+
+    searches: Dict[str, QdrantSearchInput] = {}
+    post_process: Dict[str, str] = {}
+    search_of: Dict[str, str] = {}                  # raw query → search key
+    for raw in unique.values():
+        search = to_search_input(payloads[raw])
+        key = search_key(search)
+        if needs_post_processing(raw):
+            # The agent's answer depends on the request, not only on the search
+            key = f"agent:{key}:{raw}"
+            post_process[key] = raw
+        searches[key] = search
+        search_of[raw] = key
+
+    hits = _search(searches, post_process, report)
+
+    records = []
+    for item in items:
+        result = hits.get(search_of[unique[cache_key(item["query"])]])
+        record = {"id": item["id"], "query": item["query"], "type": "card"}
+        if isinstance(result, Exception):
+            report.errors += 1
+            record.update(payload=[], error=f"{type(result).__name__}: {result}")
+        else:
+            record["payload"] = result or []
+        records.append(record)
+    return records
+
+
+def run_chat_batch(items: Iterable[Any], output_path: Optional[str] = None, resume: bool = True,
+                   chunk_size: int = BATCH_CHUNK_SIZE) -> Tuple[List[Dict[str, Any]], BatchReport]:
+    """
+    Answer every query in `items` (strings or {"id", "query"} dicts). With
+    `output_path`, finished chunks are appended there as JSONL and, when
+    `resume` is set, queries already answered in it are skipped.
+    """
+    items = [
+        {"id": i, "query": item} if isinstance(item, str) else {"id": item.get("id", i), "query": item["query"]}
+        for i, item in enumerate(items)
+    ]
+    report = BatchReport(queries=len(items))
+    done = answered_keys(output_path) if resume else set()
+    todo = [item for item in items if cache_key(item["query"]) not in done]
+    report.resumed = len(items) - len(todo)
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    with start_trace("chat.batch", queries=len(items), resumed=report.resumed):
+        for i in range(0, len(todo), chunk_size):
+            records = _run_chunk(todo[i:i + chunk_size], report)
+            results.extend(records)
+            if output_path:
+                with open(output_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+            report.elapsed_seconds = round(time.perf_counter() - started, 3)
+            log.info("batch.progress", done=report.resumed + len(results), total=report.queries,
+                     queries_per_second=report.queries_per_second)
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return results, report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python agents/batch_chat.py questions.jsonl answers.jsonl [--no-resume]")
+        sys.exit(1)
+    _, report = run_chat_batch(read_queries(sys.argv[1]), output_path=sys.argv[2],
+                               resume="--no-resume" not in sys.argv)
+    print(json.dumps(report.to_dict(), indent=2))
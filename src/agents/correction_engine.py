@@ -0,0 +1,205 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/correction_engine.py
+"""
+Vectorized fuzzy + phonetic correction over a large domain vocabulary.
+
+Used by `query_normalizer` for the stages after SymSpell. Instead of one
+`process.extractOne` per word against the whole vocabulary, every unknown token
+and every n-gram bounded by unknown tokens is scored in ONE
+`rapidfuzz.process.cdist` call (multi-threaded via `workers`) against a pruned
+slice of the vocabulary:
+
+- 📦 Length / first-letter buckets: choices are sorted by the key
+  `ord(first letter) << 8 | len`, so the candidates for a query span are one
+  contiguous slice found with `np.searchsorted`.
+- 🔊 Multi-valued phonetic index: Double Metaphone code → list of choice ids
+  (primary and secondary codes), precomputed at build time. Phonetic candidates
+  bypass the first-letter bucket ("calcutta" ~ "kolkata") and get a lower
+  score threshold, since the matching sound is evidence on its own.
+
+The scorer is `fuzz.ratio` over `utils.default_process`-ed strings: once the
+buckets keep lengths comparable, WRatio's partial / token-set passes add little
+and cost ~50x more per pair. Scores outside each span's candidate set are
+masked with numpy, the best choice per span is an `argmax`, and the longest
+(then highest-scoring) non-overlapping spans win. Scales to ~100k company /
+investor names (~6 ms per query) without Python loops over the vocabulary.
+
+✅ Usage:
+     engine = CorrectionEngine.from_state(build_correction_state(phrases))
+     engine.correct_spans(["calcuta", "fintec", "startups"], [True, True, False])
+     # → [(0, 1, "kolkata"), (1, 2, "fintech")]
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from phonetics import dmetaphone
+from rapidfuzz import fuzz, process, utils
+
+
+# ─── Tunables ──────────────────────────────────────────────
+MAX_NGRAM = 3                      # spans of up to 3 tokens ("sequoa capitl india")
+FUZZY_MIN_SCORE = 81               # ratio for bucket candidates (notebook used WRatio > 80)
+PHONETIC_MIN_SCORE = 60            # ratio for candidates sharing a Metaphone code
+LENGTH_TOLERANCE = 0.25            # ± share of the span length searched in buckets
+CDIST_WORKERS = int(os.getenv("QUERY_NORMALIZER_WORKERS", "-1"))
+
+_UNREACHABLE = 255                 # threshold no uint8 score can reach
+
+
+def _bucket_key(text: str) -> int:
+    return (ord(text[0]) << 8) | min(len(text), 255)
+
+
+@lru_cache(maxsize=65536)
+def _phonetic_codes(text: str) -> Tuple[str, ...]:
+    ascii_text = "".join(c for c in text if c.isascii() and c.isalpha())
+    if not ascii_text:
+        return ()
+    return tuple(code for code in dmetaphone(ascii_text) if code)
+
+
+def build_correction_state(phrases: Iterable[str]) -> Dict:
+    """
+    Precompute the sorted choice list, bucket keys and phonetic index for the
+    vocabulary (phrases are lower-cased; duplicates dropped).
+    """
+    choices = sorted(
+        {" ".join(p.lower().split()) for p in phrases if p and p.strip()},
+        key=lambda c: (_bucket_key(c), c),
+    )
+    bucket_keys = np.array([_bucket_key(c) for c in choices], dtype=np.int64)
+    match_keys = [utils.default_process(c) for c in choices]
+
+    phonetic_index: Dict[str, List[int]] = {}
+    for choice_id, choice in enumerate(choices):
+        for code in set(_phonetic_codes(choice)):
+            phonetic_index.setdefault(code, []).append(choice_id)
+
+    return {
+        "choices": choices,
+        "match_keys": match_keys,
+        "bucket_keys": bucket_keys,
+        "phonetic_index": {code: np.array(ids, dtype=np.int32) for code, ids in phonetic_index.items()},
+    }
+
+
+class CorrectionEngine:
+    """Batch fuzzy / phonetic matcher over a precomputed vocabulary."""
+
+    def __init__(self, choices: List[str], match_keys: List[str], bucket_keys: np.ndarray,
+                 phonetic_index: Dict[str, np.ndarray]):
+        self.choices = choices
+        self.match_keys = match_keys
+        self.bucket_keys = bucket_keys
+        self.phonetic_index = phonetic_index
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "CorrectionEngine":
+        return cls(state["choices"], state["match_keys"], state["bucket_keys"],
+                   state["phonetic_index"])
+
+    # ─── Candidate pruning ─────────────────────────────────
+    def _bucket_candidates(self, span: str) -> np.ndarray:
+        tolerance = max(1, round(len(span) * LENGTH_TOLERANCE))
+        first = ord(span[0]) << 8
+        low = first | max(len(span) - tolerance, 1)
+        high = first | min(len(span) + tolerance, 255)
+        start, end = np.searchsorted(self.bucket_keys, [low, high + 1])
+        return np.arange(start, end, dtype=np.int32)
+
+    def _phonetic_candidates(self, span: str) -> np.ndarray:
+        hits = [self.phonetic_index[c] for c in _phonetic_codes(span) if c in self.phonetic_index]
+        if not hits:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(hits))
+
+    # ─── Matching ──────────────────────────────────────────
+    def best_matches(self, spans: Sequence[str], fuzzy: bool = True,
+                     phonetic: bool = True) -> List[Optional[Tuple[str, int]]]:
+        """
+        Best (choice, score) per span, or None. All spans are scored in a
+        single `cdist` call against the union of their candidates.
+        """
+        if not spans or not self.choices:
+            return [None] * len(spans)
+
+        per_span: List[Tuple[np.ndarray, np.ndarray]] = []
+        for span in spans:
+            bucket = self._bucket_candidates(span) if fuzzy else np.empty(0, dtype=np.int32)
+            sound = self._phonetic_candidates(span) if phonetic else np.empty(0, dtype=np.int32)
+            per_span.append((bucket, sound))
+
+        subset = np.unique(np.concatenate([np.concatenate(pair) for pair in per_span]))
+        if subset.size == 0:
+            return [None] * len(spans)
+
+        # Per-(span, candidate) threshold; unreachable outside each span's candidates
+        thresholds = np.full((len(spans), subset.size), _UNREACHABLE, dtype=np.uint8)
+        for row, (bucket, sound) in enumerate(per_span):
+            thresholds[row, np.searchsorted(subset, bucket)] = FUZZY_MIN_SCORE
+            sound_cols = np.searchsorted(subset, sound)
+            thresholds[row, sound_cols] = np.minimum(thresholds[row, sound_cols], PHONETIC_MIN_SCORE)
+
+        scores = process.cdist(
+            [utils.default_process(span) for span in spans],
+            [self.match_keys[i] for i in subset.tolist()],
+            scorer=fuzz.ratio, dtype=np.uint8, workers=CDIST_WORKERS,
+            score_cutoff=min(FUZZY_MIN_SCORE, PHONETIC_MIN_SCORE),
+        )
+        scores = np.where(scores >= thresholds, scores, 0)
+        best_cols = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(spans)), best_cols]
+
+        return [
+            (self.choices[int(subset[col])], int(score)) if score else None
+            for col, score in zip(best_cols.tolist(), best_scores.tolist())
+        ]
+
+    def correct_spans(self, tokens: List[str], targets: List[bool], fuzzy: bool = True,
+                      phonetic: bool = True) -> List[Tuple[int, int, str]]:
+        """
+        Best non-overlapping (start, end, choice) replacements among the n-gram
+        spans of `tokens` that start and end on a target (unknown) token, so
+        known words at the edges ("in", "by") are never swallowed by a match.
+        """
+        spans: List[Tuple[int, int]] = [
+            (start, start + n)
+            for n in range(1, MAX_NGRAM + 1)
+            for start in range(len(tokens) - n + 1)
+            if targets[start] and targets[start + n - 1]
+        ]
+        if not spans:
+            return []
+
+        texts = [" ".join(tokens[s:e]) for s, e in spans]
+        matches = self.best_matches(texts, fuzzy=fuzzy, phonetic=phonetic)
+
+        # Longest span first (like the keyword extractor), then highest score
+        ranked = sorted(
+            ((e - s, m[1], s, e, m[0]) for (s, e), m in zip(spans, matches) if m),
+            reverse=True,
+        )
+        taken = [False] * len(tokens)
+        replacements: List[Tuple[int, int, str]] = []
+        for _, _, start, end, choice in ranked:
+            if any(taken[start:end]):
+                continue
+            taken[start:end] = [True] * (end - start)
+            replacements.append((start, end, choice))
+        return sorted(replacements)
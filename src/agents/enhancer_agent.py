@@ -39,7 +39,6 @@ from langgraph.prebuilt import ToolNode
 from langgraph.types import Command
 from typing import Literal
 #from langchain_openai import ChatOpenAI
-from langchain_together import ChatTogether
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
 load_dotenv()
@@ -146,32 +145,94 @@ formatted_prompt = enhancer_agent_prompt_template.partial(
     tool_names=", ".join(tool.name for tool in enhancer_tools)
 )
 
-# 🔧 Define the React-style agent
+# 🔧 Chat models, agents and executors are built once per process by
+# agents.agent_runtime (shared HTTP pool) — nothing is constructed on import.
 #llm = ChatOpenAI(model="gpt-4o",temperature=0)  # Or use your preferred model
-
-
-llm_enhancer = ChatTogether(model="mistralai/Mistral-7B-Instruct-v0.2",
-                            temperature=0,
-                            api_key=os.getenv("together_ai_api_key"))
-
-
-#create the agent with the tools and formatted prompt
-from langchain.agents import create_structured_chat_agent, AgentExecutor
+from langchain.agents import create_structured_chat_agent
 from schema.tools_schema import EnhanceInput, EnhanceOutput 
+from agents.agent_runtime import get_enhancer_executor, get_llm, invocation_config
+
+# ─── Parallel tool-calling mode ─────────────────────────────
+# The structured-chat agent above emits ONE action per round trip, so
+# keyword_extractor → numeric_constraint_extractor → filter_composer costs three
+# LLM turns. With native tool calling the model can request both extractors in a
+# single turn (AgentExecutor runs every tool call of that turn; `ainvoke` runs
+# them concurrently) and only the composition needs a second turn.
+# Opt-in with ENHANCER_AGENT_MODE=tool_calling: Mistral-7B has no function
+# calling on Together, so that mode also switches the enhancer model to
+# ENHANCER_TOOL_CALLING_MODEL (Llama-3.1-8B by default). The default
+# "structured" mode keeps the original Mistral agent.
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+from langchain.agents import create_tool_calling_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+ENHANCER_AGENT_MODE = os.getenv("ENHANCER_AGENT_MODE", "structured")
+
+enhancer_tool_calling_prompt = ChatPromptTemplate.from_messages([
+    ("system",
+     "You are the **Query‑Enhancer Agent**.\n"
+     "Tools:\n{tools}\n\n"
+     "1. In your FIRST turn call keyword_extractor AND numeric_constraint_extractor "
+     "together (parallel tool calls) with the user's query.\n"
+     "2. If at least one of them returned filters, call filter_composer once with them.\n"
+     "3. Then answer with ONLY this JSON object, no prose:\n"
+     '{{"query": "<string>", "filters": {{...}} | null, "k": <int>}}'),
+    ("human", "{input}"),
+    MessagesPlaceholder("agent_scratchpad"),
+]).partial(tools=tool_help_text)
+
+
+def build_enhancer_agent():
+    """Agent runnable for ENHANCER_AGENT_MODE (called once by agents.agent_runtime)."""
+    if ENHANCER_AGENT_MODE == "tool_calling":
+        return create_tool_calling_agent(
+            llm=get_llm("enhancer_tools"),
+            tools=enhancer_tools,
+            prompt=enhancer_tool_calling_prompt,
+        )
+    return create_structured_chat_agent(
+        llm=get_llm("enhancer"),
+        tools=enhancer_tools,
+        prompt=formatted_prompt,
+    )
 
-enhancer_agent = create_structured_chat_agent(
-    llm=llm_enhancer,
-    tools=enhancer_tools,
-    prompt=formatted_prompt,
-)
 
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
 
-from langchain.agents import AgentExecutor
 
-enhancer_executor = AgentExecutor(agent=enhancer_agent, 
-                         tools=enhancer_tools, 
-                         verbose=True, 
-                         handle_parsing_errors=True)
+def parse_enhancer_output(output: Any) -> Dict[str, Any] | None:
+    """
+    Final answer of either agent mode as a dict: the structured agent returns
+    the `action_input` dict, the tool-calling agent a JSON string.
+    """
+    if isinstance(output, dict):
+        return output
+    if isinstance(output, str):
+        match = _JSON_OBJECT.search(output)
+        if match:
+            try:
+                parsed = json.loads(match.group(0))
+            except json.JSONDecodeError:
+                return None
+            return parsed if isinstance(parsed, dict) else None
+    return None
+
+
+def enhancer_payload(agent_result: Dict[str, Any], fallback: EnhanceOutput) -> Tuple[Dict[str, Any], Optional[EnhanceOutput]]:
+    """
+    (payload, validated output worth caching) from an enhancer executor result;
+    `fallback` (the rule-based output) when the agent's answer is unusable.
+    """
+    from pydantic import ValidationError
+
+    payload = parse_enhancer_output((agent_result or {}).get("output")) or {}
+    try:
+        enhanced = EnhanceOutput.model_validate(payload)
+    except ValidationError:
+        return fallback.model_dump(), None
+    return enhanced.model_dump(), enhanced
 
 
 # src/nodes/enhancer_node.py
@@ -181,6 +242,16 @@ from langchain_core.agents import AgentAction, AgentFinish
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
 from schema.agent_state import AgentState
+from agents.enhancer_pipeline import run_rule_enhancer
+from agents.request_budget import DeadlineExceeded, plan_degradation, run_with_deadline
+from agents.session_refiner import plan_follow_up
+from utils.enhancer_cache import get_enhancer_cache
+from utils.logger import get_logger
+from utils.tracing import set_attributes
+from pydantic import ValidationError
+
+# Structured debug trace of the node (off unless LOG_LEVEL=DEBUG)
+log = get_logger("enhancer")
 
 def normalize_messages(raw_msgs: List[Any]) -> List[Dict[str, str]]:
     """
@@ -200,40 +271,97 @@ def normalize_messages(raw_msgs: List[Any]) -> List[Dict[str, str]]:
 
 
 def enhancer_node(state: AgentState) -> Command[Literal["supervisor"]]:
-    # 1) Normalize history
-    msgs = normalize_messages(state.get("messages", []))
-
-    # 2) Extract user input
+    # 1) + 2) Latest user input; the history itself is not copied (append-only channel)
     user_input = ""
-    for m in reversed(msgs):
+    for raw in reversed(state.get("messages", [])):
+        m = normalize_messages([raw])[0]
         if m.get("role") == "user":
             user_input = m["content"]
             break
-    print(f"\n[DEBUG] Enhancer Node received user_input: {user_input}")
+    log.debug("enhancer.input", user_input=user_input)
 
-    # 3) Stream the agent
+    # 3) Rule-based fast path first; stream the agent only when it is not confident
     actions: List[str] = []
     observations: List[str] = []
     final_output: Any = None
 
-    payload = {"input": user_input, "intermediate_steps": []}
-    print(f"[DEBUG] Enhancer payload: {payload}")
-
-    for step in enhancer_agent.stream(payload):
-        if isinstance(step, AgentAction):
-            print(f"[DEBUG] AgentAction: {step.log}")
-            actions.append(str(step.log))
-        elif isinstance(step, AgentFinish):
-            print(f"[DEBUG] AgentFinish output: {step.return_values.get('output')}")
-            final_output = step.return_values.get("output")
+    rule_result = run_rule_enhancer(user_input)
+    log.debug("enhancer.rules", confidence=rule_result.confidence,
+              unparsed_constraints=rule_result.unparsed_constraints)
+
+    # Follow-up turn of a session: build on the stored search instead of starting over
+    follow_up = plan_follow_up(state, user_input, rule_result.output)
+    needs_agent = rule_result.needs_agent and follow_up is None
+    session_update: Dict[str, Any] = {}
+
+    # Remaining request budget: too little left → rule-based output only
+    plan = plan_degradation(state)
+    use_agent = needs_agent and not plan.skip_llm_enhancer
+    if needs_agent and not use_agent:
+        log.info("enhancer.degraded", reason="budget low", remaining_seconds=round(plan.remaining, 2))
+        actions.append("Budget degradation: skipped LLM enhancer")
+
+    cache = get_enhancer_cache() if needs_agent else None
+    cached = cache.get(user_input) if cache else None
+
+    if follow_up is not None:
+        actions.append("Session follow-up: merged filters into the previous search")
+        final_output = {"query": follow_up.query, "filters": follow_up.filters, "k": follow_up.k}
+        if follow_up.results is not None:
+            # Narrowing of the stored hits: answered from memory, the supervisor ends the run
+            actions.append(f"Session follow-up: refined {len(follow_up.results)} stored results in memory")
+            session_update = {
+                "retrieved_results": follow_up.results,
+                "session_query":     follow_up.query,
+                "session_filters":   follow_up.filters,
+                "session_results":   follow_up.results,
+            }
+    elif cached is not None:
+        log.debug("enhancer.cache_hit", user_input=user_input)
+        actions.append("Enhancer cache hit")
+        final_output = cached.model_dump()
+    elif use_agent:
+        payload = {"input": user_input}
+        log.debug("enhancer.agent_start", payload=payload)
+
+        def run_agent():
+            # Executor stream: one chunk per turn (all parallel tool calls of a
+            # turn arrive together), then their observations, then the output
+            agent_actions, agent_observations, output = [], [], None
+            config = invocation_config(agent="enhancer")
+            for chunk in get_enhancer_executor().stream(payload, config=config):
+                for action in chunk.get("actions", []):
+                    log.debug("enhancer.agent_action", action=action.log)
+                    agent_actions.append(str(action.log))
+                for step in chunk.get("steps", []):
+                    log.debug("enhancer.observation", observation=step.observation)
+                    agent_observations.append(str(step.observation))
+                if "output" in chunk:
+                    log.debug("enhancer.agent_finish", output=chunk["output"])
+                    output = parse_enhancer_output(chunk["output"]) or chunk["output"]
+            return agent_actions, agent_observations, output
+
+        try:
+            agent_actions, agent_observations, final_output = run_with_deadline(run_agent, state)
+        except DeadlineExceeded:
+            log.info("enhancer.degraded", reason="agent timed out")
+            actions.append("Budget degradation: LLM enhancer timed out")
+            final_output = rule_result.output.model_dump()
         else:
-            print(f"[DEBUG] Observation: {step}")
-            observations.append(str(step))
+            actions.extend(agent_actions)
+            observations.extend(agent_observations)
+            if cache and isinstance(final_output, dict):
+                try:
+                    cache.put(user_input, EnhanceOutput.model_validate(final_output))
+                except ValidationError:
+                    pass
+    else:
+        actions.append("Rule-based enhancer fast path")
+        final_output = rule_result.output.model_dump()
 
     # 4) Parse final_output
-    print(f"[DEBUG] raw final_output: {final_output}")
     if isinstance(final_output, dict):
-        enhanced_query = final_output.get("enhanced_query", "")
+        enhanced_query = final_output.get("enhanced_query") or final_output.get("query", "")
         filters        = final_output.get("filters", {})
         k              = final_output.get("k", None)
         msg_text       = str(final_output)
@@ -243,33 +371,31 @@ def enhancer_node(state: AgentState) -> Command[Literal["supervisor"]]:
         k              = None
         msg_text       = str(final_output) if final_output is not None else ""
 
-    # 5) Log summary
-    new_actions      = state.get("actions", []) + actions + ["Enhancer completed"]
+    # 5) Log summary (only the new entries; the reducers append them)
+    new_actions      = actions + ["Enhancer completed"]
     new_observations = (
-        state.get("observations", [])
-        + observations
+        observations
         + [
             f"Enhanced Query: {enhanced_query}",
             f"Filters: {filters}",
             f"k: {k}",
         ]
     )
-    print(f"[DEBUG] Parsed enhanced_query: {enhanced_query}")
-    print(f"[DEBUG] Parsed filters: {filters}")
-    print(f"[DEBUG] Parsed k: {k}")
+    log.debug("enhancer.output", raw=final_output, enhanced_query=enhanced_query, filters=filters, k=k)
+    set_attributes(enhanced_query=enhanced_query, filters=filters, k=k,
+                   rule_confidence=rule_result.confidence, used_agent=use_agent)
 
     # 6) Append message and return
-    msgs.append({"role": "enhancer", "content": msg_text})
-
     return Command(
         update={
-            "messages":       msgs,
+            "messages":       [{"role": "enhancer", "content": msg_text}],
             "enhanced_query": enhanced_query,
             "filters":        filters,
             "k":              k,
             "actions":        new_actions,
             "observations":   new_observations,
             "agent_name":     "enhancer",
+            **session_update,
         },
         goto="supervisor"
     )
@@ -0,0 +1,224 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/enhancer_pipeline.py
+"""
+Rule-based enhancer fast path.
+
+The enhancer tools (`keyword_extractor`, `numeric_constraint_extractor`,
+`filter_composer`) are deterministic, so there is no need for an LLM to call
+them one ReAct turn at a time. This module runs all three in-process, builds the
+`EnhanceOutput` directly and scores how much of the query the rules explained.
+
+The extractors are independent, so they are fanned out on a shared thread pool
+together with the spelling normalizer (`agents.query_normalizer`); the critical
+path is the slowest of them rather than their sum. Keywords are also matched on
+the normalized text, so "fintec startps in bangalor" still resolves its filters.
+
+The LLM enhancer agent is only needed when `RuleEnhancement.needs_agent` is True:
+the confidence is below `FAST_PATH_MIN_CONFIDENCE` or the query contains
+numeric constraints the extractor could not parse.
+
+✅ Usage:
+     from agents.enhancer_pipeline import run_rule_enhancer
+     result = run_rule_enhancer("fintech startups in bengaluru founded after 2015")
+     if not result.needs_agent:
+         enhanced = result.output          # EnhanceOutput(query, filters, k)
+"""
+
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from schema.tools_schema import EnhanceOutput
+from tools.enhancer_agent_tools.keyword_extractor import (
+    KeywordMatch,
+    extract_keyword_matches,
+    group_keyword_matches,
+)
+from tools.enhancer_agent_tools.numeric_extractor import NUMERIC_CUE_WORDS, parse_numeric_constraints
+from tools.enhancer_agent_tools.filter_composer import compose_filters
+from agents.query_normalizer import normalize_query
+from utils.metrics import timed
+
+
+# ─── Tunables ──────────────────────────────────────────────
+DEFAULT_K = 5
+MAX_K = 50
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("ENHANCER_FAST_PATH_MIN_CONFIDENCE", "0.5"))
+NORMALIZE_QUERIES = os.getenv("ENHANCER_NORMALIZE", "1") != "0"
+POOL_WORKERS = int(os.getenv("ENHANCER_POOL_WORKERS", "4"))
+
+
+# ─── Vocabulary the rules treat as "explained" ─────────────
+# Words that carry no filter information: plain English glue plus the generic
+# nouns/verbs of a company search. They are ignored when scoring coverage.
+_STOPWORDS: Set[str] = {
+    "a", "an", "the", "in", "on", "at", "of", "for", "to", "from", "with", "by",
+    "and", "or", "that", "which", "who", "whose", "are", "is", "be", "have", "has",
+    "me", "my", "i", "we", "us", "our", "all", "any", "some", "their", "its",
+    "please", "can", "you", "give", "show", "find", "list", "get", "search",
+    "tell", "about", "what", "which", "based", "located", "headquartered",
+    "top", "best", "leading", "popular", "biggest", "largest", "good", "great",
+    "startup", "startups", "company", "companies", "firm", "firms", "business",
+    "businesses", "player", "players", "results", "organisations", "organizations",
+    "india", "indian",
+}
+
+# "top 10", "first 3", "5 fintech startups" → k
+_K_PATTERN = re.compile(
+    r"\b(?:top|first|best)\s+(\d{1,3})\b"
+    r"|\b(\d{1,3})\s+(?!(?:cr|crores?|lakhs?|lac|million|mn|billion|bn|k|employees|staff|years?|rounds|%)\b)"
+    r"(?:(?:top|best|leading)\s+)?(?:\w+\s+){0,2}?(?:startups?|compan(?:y|ies)|firms?|results|players)\b",
+    re.IGNORECASE,
+)
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+_CONSTRAINT_CUE_PATTERN = re.compile(
+    r"\b(?:over|above|under|below|more than|less than|fewer than|greater than|"
+    r"between|after|before|since|at least|at most|up to|upto|exceeding)\b",
+    re.IGNORECASE,
+)
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9.+#&-]*")
+
+
+@dataclass
+class RuleEnhancement:
+    """Result of the deterministic enhancer pass."""
+    output: EnhanceOutput
+    confidence: float
+    unparsed_constraints: bool = False
+    keywords: Dict[str, List[str]] = field(default_factory=dict)
+    numeric: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def needs_agent(self) -> bool:
+        """True when the LLM enhancer agent should take over."""
+        return self.unparsed_constraints or self.confidence < FAST_PATH_MIN_CONFIDENCE
+
+
+def _extract_k(query: str) -> tuple[Optional[int], Optional[tuple[int, int]]]:
+    """Return (k, span of the k phrase) for requests like "top 10 ..."."""
+    match = _K_PATTERN.search(query)
+    if not match:
+        return None, None
+    value = int(match.group(1) or match.group(2))
+    if not 0 < value <= MAX_K:
+        return None, None
+    return value, match.span()
+
+
+def _covered_tokens(matches: List[KeywordMatch]) -> Set[str]:
+    # Use the surface text so synonyms ("bangalore" → bengaluru) count as covered
+    covered: Set[str] = set()
+    for m in matches:
+        covered.update(_TOKEN_PATTERN.findall(m.surface))
+    return covered
+
+
+def _score(query: str, matches: List[KeywordMatch], has_numeric: bool) -> float:
+    """
+    Fraction of the informative query tokens that the rules explained.
+    Queries with nothing informative (e.g. "top startups") score 1.0 —
+    a plain semantic search is the right answer for them.
+    """
+    tokens = [t for t in _TOKEN_PATTERN.findall(query.lower()) if t not in _STOPWORDS]
+    if not tokens:
+        return 1.0
+    covered = _covered_tokens(matches)
+    explained = 0
+    for token in tokens:
+        if token in covered:
+            explained += 1
+        elif has_numeric and (token in NUMERIC_CUE_WORDS or _NUMBER_PATTERN.fullmatch(token)):
+            explained += 1
+    return round(explained / len(tokens), 3)
+
+
+def _without_k(text: str) -> tuple[Optional[int], str]:
+    """(k, text with the "top 10" phrase blanked out)."""
+    k, k_span = _extract_k(text)
+    # Blank out the "top 10" phrase so its number is not mistaken for a constraint
+    return k, text if k_span is None else text[:k_span[0]] + " " + text[k_span[1]:]
+
+
+# ⏱️ Timed tool calls (per-tool latency histograms, see utils.metrics)
+_extract_keywords = timed("tool", "keyword_extractor")(extract_keyword_matches)
+_parse_numeric = timed("tool", "numeric_constraint_extractor")(parse_numeric_constraints)
+_normalize = timed("tool", "query_normalizer")(normalize_query)
+_compose = timed("tool", "filter_composer")(compose_filters)
+
+
+# 🔁 Singleton pool shared by every request (threads are created lazily)
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_enhancer_pool() -> ThreadPoolExecutor:
+    """Returns the process-wide thread pool the extractors fan out on."""
+    global _pool
+
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="enhancer")
+
+    return _pool
+
+
+def run_rule_enhancer(query: str) -> RuleEnhancement:
+    """
+    Run keyword extraction, numeric-constraint extraction and spelling
+    normalization concurrently, compose the filters and wrap the result in
+    `EnhanceOutput`.
+    """
+    cleaned = " ".join(query.split())
+    k, constraint_text = _without_k(cleaned)
+
+    # ─── Fan out the independent extractors ────────────────
+    pool = get_enhancer_pool()
+    # Each task runs in a copy of the caller's context, so its span joins the request trace
+    def submit(fn, *args):
+        return pool.submit(contextvars.copy_context().run, fn, *args)
+
+    keyword_future = submit(_extract_keywords, cleaned)
+    numeric_future = submit(_parse_numeric, constraint_text)
+    normalized_future = submit(_normalize, cleaned) if NORMALIZE_QUERIES else None
+
+    matches = keyword_future.result()
+    numeric_parse = numeric_future.result()
+    normalized = normalized_future.result() if normalized_future else cleaned
+
+    score_text = constraint_text
+    if normalized.lower() != cleaned.lower():
+        # Spelling fixes can only add keywords: match the corrected text too (µs)
+        matches = matches + _extract_keywords(normalized)
+        score_text = _without_k(normalized)[1]
+
+    keywords = group_keyword_matches(matches)
+    numeric = numeric_parse.constraints
+    filters = _compose(keywords, numeric)
+
+    # Numeric phrases or comparison words the numeric extractor could not turn into a range
+    unparsed = bool(numeric_parse.unparsed) or (
+        not numeric and bool(_CONSTRAINT_CUE_PATTERN.search(constraint_text))
+    )
+
+    output = EnhanceOutput(query=cleaned, filters=filters or None, k=k or DEFAULT_K)
+    return RuleEnhancement(
+        output=output,
+        confidence=_score(score_text, matches, bool(numeric)),
+        unparsed_constraints=unparsed,
+        keywords=keywords,
+        numeric=numeric,
+    )
@@ -27,10 +27,11 @@ from langgraph.types import Command
 from typing import Literal
 #from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain_together import ChatTogether
-from langchain.agents import create_structured_chat_agent, AgentExecutor
+from langchain.agents import create_structured_chat_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_together import ChatTogether
+from agents.agent_runtime import get_llm, get_qdrant_executor, invocation_config
+from agents.search_pipeline import needs_post_processing, run_direct_search, search_agent_input
+from agents.request_budget import DeadlineExceeded, plan_degradation, run_with_deadline
 import os
 
 # %%
@@ -124,28 +125,15 @@ formatted_prompt = qdrant_agent_prompt_template.partial(
 )
 
 # 🔧 Define the React-style agent
+# The chat model, agent and executor are built once per process by
+# agents.agent_runtime (shared HTTP pool) — nothing is constructed on import.
 #llm = ChatOpenAI(model="gpt-4o",temperature=0.0) 
-llm_search = ChatTogether(model="meta-llama/Llama-3.3-70B-Instruct-Turbo", 
-                            temperature=0,
-                            api_key=os.getenv("together_ai_api_key"))
-
-
-
-# Define the structured agent
-qdrant_search_agent = create_structured_chat_agent(
-    llm=llm_search,
-    tools=qdrant_agent_tools,
-    prompt=formatted_prompt,
-    )
-
-    # Define the agent executor
-qdrant_agent_executor = AgentExecutor(
-        agent=qdrant_search_agent,
+def build_qdrant_search_agent():
+    """Structured-chat search agent (called once by agents.agent_runtime)."""
+    return create_structured_chat_agent(
+        llm=get_llm("search"),
         tools=qdrant_agent_tools,
-        verbose=True,
-        handle_parsing_errors=True,
-        return_only_outputs=True,
-        max_iterations=3
+        prompt=formatted_prompt,
     )
 
 
@@ -159,7 +147,8 @@ from langchain_core.agents import AgentAction, AgentFinish
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
 from schema.agent_state import AgentState
-# Use the existing qdrant_agent defined in previous cells
+from graph.chat_stream import card_event, emit_event
+from utils.tracing import set_attributes
 
 def normalize_messages(raw_msgs: List[Any]) -> List[Dict[str, str]]:
     """
@@ -179,70 +168,125 @@ def normalize_messages(raw_msgs: List[Any]) -> List[Dict[str, str]]:
 def quadrant_search_node(state: AgentState) -> Command[Literal["__end__"]]:
     """
     1) Normalize history
-    2) Build a single-string search_input from enhanced_query, filters, k
-    3) Stream qdrant_search_agent over {"input":search_input, "intermediate_steps":[]}
+    2) Read the search parameters (enhanced_query, filters, k)
+    3) Search Qdrant directly (no LLM) unless the user asked for comparison /
+       summarisation, which still goes through the search agent — both bounded
+       by the request deadline (shrinking k / skipping the agent when it is close)
     4) Parse results & reasoning
     5) Append a new dict message and update state
     6) Route to "__end__"
     """
-    # ─── 1) Normalize chat history ────────────────────────
-    msgs = normalize_messages(state.get("messages", []))
+    # ─── 1) Latest user turn (history is append-only: never copied) ─
+    msgs = state.get("messages", [])
 
     # ─── 2) Extract search parameters ────────────────────
     q = state.get("enhanced_query", "")
     f = state.get("filters", {})
     k = state.get("k", 5)
 
-    search_input = (
-        f"QUERY:\n{q}\n\n"
-        f"FILTERS:\n{f}\n\n"
-        f"K:\n{k}"
-    )
-
-    # ─── 3) Stream the agent ──────────────────────────────
+    # ─── 3) Direct search, or the search agent for compare / summarise requests
     actions: List[str] = []
     observations: List[str] = []
-    final_output: Any = None
-
-    payload = {"input": search_input, "intermediate_steps": []}
-    for step in qdrant_search_agent.stream(payload):
-        if isinstance(step, AgentAction):
-            actions.append(str(step.log))
-        elif isinstance(step, AgentFinish):
-            final_output = step.return_values.get("output")
-        else:
-            observations.append(str(step))
-
-    # ─── 4) Parse the final output ───────────────────────
-    if isinstance(final_output, dict):
-        results   = final_output.get("results", [])
-        reasoning = final_output.get("reasoning", "")
-        msg_text  = str(final_output)
+    results: List[Any] = []
+    reasoning = ""
+
+    question = ""
+    for raw in reversed(msgs):
+        m = normalize_messages([raw])[0]
+        if isinstance(m, dict) and m.get("role") == "user":
+            question = m.get("content", "")
+            break
+
+    # Remaining request budget decides how much of the search still runs
+    plan = plan_degradation(state)
+    if plan.shrink_k and k != plan.cap_k(k):
+        actions.append(f"Budget degradation: k {k} → {plan.cap_k(k)}")
+        k = plan.cap_k(k)
+
+    def direct_search():
+        hits = run_direct_search({"query": q, "filters": f, "k": k})
+        # Cards go out now (streamed runs), not when the node returns
+        for rank, hit in enumerate(hits):
+            event = card_event(hit, rank)
+            if event:
+                emit_event(event)
+        return hits
+
+    def agent_search():
+        # ─── 4) Stream the agent executor and parse its final output
+        agent_actions, agent_observations, hits, output = [], [], [], None
+        payload = {"input": search_agent_input(question, {"query": q, "filters": f, "k": k})}
+        config = invocation_config(agent="qdrant_search")
+        for chunk in get_qdrant_executor().stream(payload, config=config):
+            for action in chunk.get("actions", []):
+                agent_actions.append(str(action.log))
+            for step in chunk.get("steps", []):
+                agent_observations.append(str(step.observation))
+                if isinstance(step.observation, list):
+                    hits = step.observation
+            if "output" in chunk:
+                output = chunk["output"]
+        return agent_actions, agent_observations, hits, output
+
+    if plan.partial:
+        results   = state.get("retrieved_results") or []
+        reasoning = "Request deadline exceeded; returning partial results."
+        msg_text  = reasoning
+        actions.append("Budget degradation: search skipped")
+    elif not needs_post_processing(question) or plan.skip_post_processing:
+        if plan.skip_post_processing and needs_post_processing(question):
+            actions.append("Budget degradation: skipped search-agent post-processing")
+        try:
+            results = run_with_deadline(direct_search, state)
+            reasoning = f"Found {len(results)} matching companies."
+        except DeadlineExceeded:
+            reasoning = "Qdrant search ran out of budget; no results."
+        actions.append("Direct Qdrant search")
+        msg_text  = reasoning
     else:
-        results, reasoning = [], ""
-        msg_text = str(final_output) if final_output is not None else ""
+        final_output: Any = None
+        try:
+            agent_actions, agent_observations, results, final_output = run_with_deadline(agent_search, state)
+            actions.extend(agent_actions)
+            observations.extend(agent_observations)
+        except DeadlineExceeded:
+            reasoning = "Search agent ran out of budget; no results."
+
+        if isinstance(final_output, list):
+            results = final_output
+        elif isinstance(final_output, dict):
+            results   = final_output.get("results", results)
+            reasoning = final_output.get("reasoning", "")
+        elif final_output is not None:
+            reasoning = str(final_output)
+        msg_text = str(final_output) if final_output is not None else reasoning
+
+    # Attributes of this node's span (utils.tracing)
+    set_attributes(filters=f, k=k, hits=len(results), degradation=plan.describe())
 
     # ─── 5) Build logs & append new message ──────────────
-    new_actions      = state.get("actions", []) + actions + ["Qdrant search completed"]
+    new_actions      = actions + ["Qdrant search completed"]
     new_observations = (
-        state.get("observations", [])
-        + observations
+        observations
         + [
             f"Results count: {len(results)}",
             f"Reasoning: {reasoning}"
         ]
     )
-    msgs.append({"role": "qdrant_search", "content": msg_text})
 
     # ─── 6) Return update & end the graph ───────────────
     return Command(
         update={
-            "messages":          msgs,
+            "messages":          [{"role": "qdrant_search", "content": msg_text}],
             "retrieved_results": results,
             "final_response":    reasoning,
             "actions":           new_actions,
             "observations":      new_observations,
             "agent_name":        "qdrant_search",
+            # Remembered for follow-up turns of a session
+            "session_query":     q,
+            "session_filters":   f,
+            "session_results":   results,
         },
         goto="__end__"
     )
@@ -0,0 +1,481 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/query_normalizer.py
+"""
+Query normalizer: SymSpell → phonetic → fuzzy spelling correction.
+
+Production version of the pipeline prototyped in `query_normalizer.ipynb`.
+Instead of rebuilding SymSpell from the 82,765-line frequency dictionary on
+every start, a build step runs SymSpell once (dictionary + domain vocabulary
+mined from the dataset) and exports its deletes index as flat numpy arrays:
+
+    delete_hashes.npy   sorted 64-bit hashes of every prefix delete
+    delete_offsets.npy  CSR offsets into postings.npy
+    postings.npy        word ids reachable from each delete
+    words_blob.npy      utf-8 bytes of all words (+ word_offsets.npy)
+    word_counts.npy     frequency per word id
+    word_hashes.npy     sorted word hashes (+ word_hash_ids.npy) for exact hits
+    bucket_keys.npy     length / first-letter keys of the correction vocabulary
+    meta.pkl            settings, domain terms, vocabulary and phonetic index
+
+The arrays are opened with `np.load(mmap_mode="r")`, so a cold start only maps
+the files (milliseconds) and pages are faulted in on demand. Token corrections
+are memoized, so repeated words cost a dict lookup.
+
+The phonetic and fuzzy stages run on `correction_engine.CorrectionEngine`,
+which scores all unknown tokens and n-grams against the domain vocabulary
+(company names, investors, cities, …) in one batched `cdist` call.
+
+✅ Build (run once per ingest, also done lazily on first use):
+     python agents/query_normalizer.py --build
+
+✅ Usage:
+     from agents.query_normalizer import normalize_query
+     normalize_query("fintec compnies in benguluru")
+     # → "fintech companies in bengaluru"
+"""
+
+import hashlib
+import pickle
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from rapidfuzz.distance import OSA
+
+from agents.correction_engine import CorrectionEngine, build_correction_state
+from tools.enhancer_agent_tools.keyword_extractor import KEYWORD_FIELDS, SYNONYMS
+from tools.enhancer_agent_tools.numeric_extractor import NUMERIC_CUE_WORDS
+from utils.path_config import get_data_path, get_dictionary_path, get_normalizer_artifact_dir
+
+
+# ─── Tunables ──────────────────────────────────────────────
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+DOMAIN_TERM_COUNT = 99999          # domain words outrank common English words
+TOKEN_CACHE_SIZE = 65536
+QUERY_CACHE_SIZE = 4096
+MIN_CORRECTABLE_LENGTH = 4         # "ai", "cr", "iot" … are too short to correct safely
+
+# ✅ Extensive filterable fields (flattened set for priority)
+FILTERABLE_FIELDS: Set[str] = {
+    # 🌍 Locations
+    "bengaluru", "bangalore", "mumbai", "delhi", "noida", "gurgaon", "hyderabad", "chennai", "pune", "kolkata",
+    "india", "remote", "usa", "new york", "london", "singapore", "dubai",
+
+    # 🏭 Industries
+    "fintech", "saas", "healthtech", "edtech", "agritech", "cleantech", "ecommerce", "logistics", "traveltech",
+    "retailtech", "cybersecurity", "medtech", "insurtech", "govtech", "spacetech", "web3", "blockchain", "crm",
+    "proptech", "legaltech", "foodtech", "hrtech", "martech", "adtech", "deeptech", "climatetech", "biotech",
+    "regtech", "wealthtech", "gaming", "mobility", "ev",
+
+    # 📦 Tech & Products
+    "mobile app", "web app", "api", "platform", "software", "cloud", "dashboard", "plugin", "extension", "erp",
+    "analytics", "microservices", "serverless", "paas", "open source",
+
+    # 👥 People
+    "founder", "cofounder", "ceo", "cto", "cxo", "team", "employees", "staff", "leadership",
+
+    # 💼 Company Activity
+    "hiring", "layoffs", "ipo", "acquisition", "merger", "pivot", "shutdown", "exit",
+
+    # 💰 Finance
+    "funding", "valuation", "revenue", "profit", "loss", "ebitda", "runway", "investors", "bootstrap", "unicorn",
+    "series a", "series b", "seed", "angel", "growth",
+
+    # 🔖 Tags
+    "high growth", "market leader", "top startup", "soonicorn", "early stage", "late stage", "yc backed",
+
+    # 📈 Metrics
+    "users", "downloads", "retention", "engagement", "mrr", "arr", "ltv", "cac", "churn", "arpu",
+}
+
+# Never rewritten (and part of the domain vocabulary): acronyms, generic search
+# nouns, every unit / currency / comparator word of a numeric constraint and
+# every word of the sector / keyword vocabulary above and in the keyword
+# extractor. SymSpell would otherwise turn "ai" into "a", "mn" into "mg",
+# "proptech" into "protect".
+PROTECTED_TERMS: Set[str] = {
+    "ai", "ml", "iot", "saas", "paas", "iaas", "b2b", "b2c", "d2c", "dtc", "api", "apis",
+    "ar", "vr", "ev", "hr", "crm", "erp", "llm", "nlp", "ott", "upi", "nbfc", "fmcg",
+    "smb", "smbs", "sme", "smes", "msme", "yoy", "arr", "mrr", "ipo", "vc",
+    "startup", "startups", "company", "companies", "firm", "firms",
+} | NUMERIC_CUE_WORDS | {
+    word
+    for phrase in (*FILTERABLE_FIELDS, *(term for (_, value), aliases in SYNONYMS.items() for term in (value, *aliases)))
+    for word in re.findall(r"[a-z]+", phrase)
+}
+
+# Dataset columns merged into the domain vocabulary → multi-valued separator:
+# every keyword-extractor column (sectors, cities, markets, …) plus names
+DOMAIN_COLUMNS: Dict[str, Optional[str]] = {
+    **{column: separator for column, (_, separator) in KEYWORD_FIELDS.items()},
+    "Company Name": None,
+    "Competitors": ",",
+}
+
+_ARTIFACT_VERSION = 4
+_ARRAY_NAMES = [
+    "delete_hashes", "delete_offsets", "postings", "words_blob", "word_offsets",
+    "word_counts", "word_hashes", "word_hash_ids", "bucket_keys",
+]
+_WORD_PATTERN = re.compile(r"[a-z]+")
+_EDGE_PUNCT = re.compile(r"^(\W*)(.*?)(\W*)$", re.UNICODE)
+
+
+def _hash(text: str) -> int:
+    """Stable 64-bit hash shared by the build and lookup sides."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _prefix_deletes(word: str, max_distance: int, prefix_length: int) -> Set[str]:
+    """All deletes of `word[:prefix_length]` up to `max_distance` (incl. itself)."""
+    prefix = word[:prefix_length]
+    deletes = {prefix}
+    frontier = {prefix}
+    for _ in range(max_distance):
+        nxt = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                nxt.add(item[:i] + item[i + 1:])
+        nxt -= deletes
+        deletes |= nxt
+        frontier = nxt
+    if len(word) <= max_distance:
+        deletes.add("")
+    return deletes
+
+
+# ─── Domain vocabulary ─────────────────────────────────────
+def _iter_domain_phrases(df) -> Iterable[str]:
+    """Lower-cased phrases from FILTERABLE_FIELDS, dataset values and synonyms."""
+    yield from FILTERABLE_FIELDS
+    yield from PROTECTED_TERMS
+    for column, separator in DOMAIN_COLUMNS.items():
+        if column not in df.columns:
+            continue
+        for raw in df[column].dropna().unique():
+            parts = str(raw).split(separator) if separator else [str(raw)]
+            for part in parts:
+                if part.strip():
+                    yield " ".join(part.lower().split())
+    for (_, value), aliases in SYNONYMS.items():
+        yield value
+        yield from aliases
+
+
+def _domain_words(phrases: Iterable[str]) -> List[str]:
+    return sorted({w for phrase in phrases for w in _WORD_PATTERN.findall(phrase)})
+
+
+# ─── Build ─────────────────────────────────────────────────
+def build_normalizer_artifact(df=None, save: bool = True) -> "SymSpellIndex":
+    """
+    Load the frequency dictionary into SymSpell, merge the domain vocabulary and
+    export the deletes index as mmap-able arrays (pass the ingest DataFrame to
+    reuse it).
+    """
+    from symspellpy import SymSpell
+
+    if df is None:
+        import pandas as pd
+        df = pd.read_csv(get_data_path())
+
+    started = time.perf_counter()
+    sym_spell = SymSpell(max_dictionary_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH)
+    if not sym_spell.load_dictionary(get_dictionary_path(), term_index=0, count_index=1,
+                                     encoding="utf-8-sig"):
+        raise RuntimeError("❌ Could not load main dictionary")
+
+    phrases = sorted(set(_iter_domain_phrases(df)))
+    domain_terms = _domain_words(phrases)
+    for word in domain_terms:
+        if word not in sym_spell.words:
+            sym_spell.create_dictionary_entry(word, DOMAIN_TERM_COUNT)
+
+    # 📦 Words → ids
+    words = list(sym_spell.words.keys())
+    word_ids = {w: i for i, w in enumerate(words)}
+    encoded = [w.encode("utf-8") for w in words]
+    word_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=word_offsets[1:])
+    words_blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    word_counts = np.array([sym_spell.words[w] for w in words], dtype=np.int64)
+
+    raw_word_hashes = np.array([_hash(w) for w in words], dtype=np.uint64)
+    order = np.argsort(raw_word_hashes, kind="stable")
+    word_hashes = raw_word_hashes[order]
+    word_hash_ids = order.astype(np.uint32)
+
+    # 📦 Deletes → CSR postings sorted by hash
+    deletes = sym_spell._deletes
+    delete_keys = list(deletes.keys())
+    raw_delete_hashes = np.array([_hash(d) for d in delete_keys], dtype=np.uint64)
+    order = np.argsort(raw_delete_hashes, kind="stable")
+    delete_hashes = raw_delete_hashes[order]
+    lengths = np.array([len(deletes[delete_keys[i]]) for i in order], dtype=np.int64)
+    delete_offsets = np.zeros(len(delete_keys) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=delete_offsets[1:])
+    postings = np.fromiter(
+        (word_ids[w] for i in order for w in deletes[delete_keys[i]]),
+        dtype=np.uint32, count=int(delete_offsets[-1]),
+    )
+
+    # 📦 Correction vocabulary: full phrases + their single words
+    correction = build_correction_state(phrases + domain_terms)
+
+    arrays = {
+        "delete_hashes": delete_hashes, "delete_offsets": delete_offsets, "postings": postings,
+        "words_blob": words_blob, "word_offsets": word_offsets, "word_counts": word_counts,
+        "word_hashes": word_hashes, "word_hash_ids": word_hash_ids,
+        "bucket_keys": correction["bucket_keys"],
+    }
+    meta = {
+        "version": _ARTIFACT_VERSION,
+        "max_edit_distance": MAX_EDIT_DISTANCE,
+        "prefix_length": PREFIX_LENGTH,
+        "domain_terms": domain_terms,
+        "choices": correction["choices"],
+        "match_keys": correction["match_keys"],
+        "phonetic_index": correction["phonetic_index"],
+    }
+
+    if save:
+        out_dir = get_normalizer_artifact_dir()
+        for name, array in arrays.items():
+            np.save(os.path.join(out_dir, f"{name}.npy"), array)
+        # meta.pkl is written last: its presence marks a complete artifact
+        with open(os.path.join(out_dir, "meta.pkl"), "wb") as fh:
+            pickle.dump(meta, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"✅ Query normalizer saved: {len(words)} words, {len(delete_keys)} deletes, "
+              f"{len(correction['choices'])} vocabulary entries in {time.perf_counter() - started:.1f}s → {out_dir}")
+    return SymSpellIndex(arrays, meta)
+
+
+# ─── Lookup ────────────────────────────────────────────────
+class SymSpellIndex:
+    """
+    Read-only SymSpell (Verbosity.CLOSEST) lookup over the exported arrays,
+    plus the correction engine for the phonetic / fuzzy stages.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        for name in _ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.max_edit_distance: int = meta["max_edit_distance"]
+        self.prefix_length: int = meta["prefix_length"]
+        self.domain_terms: Set[str] = set(meta["domain_terms"])
+        self.engine = CorrectionEngine(meta["choices"], meta["match_keys"], arrays["bucket_keys"],
+                                       meta["phonetic_index"])
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["SymSpellIndex"]:
+        """Map a saved artifact; None when it is missing or stale."""
+        meta_path = os.path.join(directory, "meta.pkl")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "rb") as fh:
+            meta = pickle.load(fh)
+        if meta.get("version") != _ARTIFACT_VERSION:
+            return None
+        arrays = {}
+        for name in _ARRAY_NAMES:
+            path = os.path.join(directory, f"{name}.npy")
+            if not os.path.exists(path):
+                return None
+            arrays[name] = np.load(path, mmap_mode="r")
+        return cls(arrays, meta)
+
+    def word(self, word_id: int) -> str:
+        start, end = self.word_offsets[word_id], self.word_offsets[word_id + 1]
+        return bytes(self.words_blob[start:end]).decode("utf-8")
+
+    def contains(self, word: str) -> bool:
+        key = np.uint64(_hash(word))
+        pos = int(np.searchsorted(self.word_hashes, key))
+        return pos < len(self.word_hashes) and self.word_hashes[pos] == key and \
+            self.word(int(self.word_hash_ids[pos])) == word
+
+    def lookup(self, word: str) -> Optional[str]:
+        """
+        Closest dictionary word; ties go to domain terms, then to the highest
+        count. None when nothing is within `max_edit_distance`.
+        """
+        if self.contains(word):
+            return word
+
+        keys = np.array([_hash(d) for d in _prefix_deletes(word, self.max_edit_distance,
+                                                             self.prefix_length)], dtype=np.uint64)
+        positions = np.searchsorted(self.delete_hashes, keys)
+        valid = positions < len(self.delete_hashes)
+        positions = positions[valid]
+        positions = positions[self.delete_hashes[positions] == keys[valid]]
+        if positions.size == 0:
+            return None
+
+        candidate_ids: Set[int] = set()
+        for pos in positions.tolist():
+            start, end = self.delete_offsets[pos], self.delete_offsets[pos + 1]
+            candidate_ids.update(self.postings[start:end].tolist())
+
+        best: Optional[str] = None
+        best_key = (self.max_edit_distance + 1, True, 0)
+        for word_id in candidate_ids:
+            candidate = self.word(word_id)
+            if abs(len(candidate) - len(word)) > self.max_edit_distance:
+                continue
+            distance = OSA.distance(word, candidate, score_cutoff=self.max_edit_distance)
+            if distance > self.max_edit_distance:
+                continue
+            key = (distance, candidate not in self.domain_terms, -int(self.word_counts[word_id]))
+            if key < best_key:
+                best, best_key = candidate, key
+        return best
+
+
+# 🔁 Singleton index instance (the lock keeps concurrent first requests from each building it)
+_index: Optional[SymSpellIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_normalizer_index() -> SymSpellIndex:
+    """
+    Returns the cached index, mapping the persisted artifact or building it
+    from the dictionary + dataset when the artifact is missing / stale.
+    """
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SymSpellIndex.load(get_normalizer_artifact_dir()) or build_normalizer_artifact()
+
+    return _index
+
+
+# ─── Token-level corrections (memoized) ────────────────────
+def _is_correctable(core: str) -> bool:
+    # Numbers, amounts, "node.js", "web3", short tokens and protected terms are passed through untouched
+    return (core.isalpha() and core.isascii() and len(core) >= MIN_CORRECTABLE_LENGTH
+            and core not in PROTECTED_TERMS)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _is_target(core: str) -> bool:
+    """Correctable word that is neither a domain term nor in the dictionary."""
+    if not _is_correctable(core):
+        return False
+    index = get_normalizer_index()
+    return core not in index.domain_terms and not index.contains(core)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _symspell_token(core: str) -> str:
+    index = get_normalizer_index()
+    if core in index.domain_terms:
+        return core
+    return index.lookup(core) or core
+
+
+def _split(query: str) -> List[Tuple[str, str, str]]:
+    """(leading punctuation, lower-cased core, trailing punctuation) per token."""
+    parts = []
+    for token in query.split():
+        lead, core, trail = _EDGE_PUNCT.match(token).groups()
+        parts.append((lead, core.lower(), trail))
+    return parts
+
+
+def _join(parts: List[Tuple[str, str, str]]) -> str:
+    return " ".join(f"{lead}{core}{trail}" for lead, core, trail in parts)
+
+
+# ─── Pipeline stages (same names as the notebook) ──────────
+def symspell_correct(query: str) -> str:
+    parts = [
+        (lead, _symspell_token(core) if _is_correctable(core) else core, trail)
+        for lead, core, trail in _split(query)
+    ]
+    return _join(parts)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _engine_stage(query: str, fuzzy: bool, phonetic: bool) -> str:
+    parts = _split(query)
+    cores = [core for _, core, _ in parts]
+    targets = [_is_target(core) for core in cores]
+    if not any(targets):
+        return _join(parts)
+
+    engine = get_normalizer_index().engine
+    replacements = engine.correct_spans(cores, targets, fuzzy=fuzzy, phonetic=phonetic)
+    # A replaced span keeps the punctuation around its first / last token
+    for start, end, choice in reversed(replacements):
+        parts[start:end] = [(parts[start][0], choice, parts[end - 1][2])]
+    return _join(parts)
+
+
+def phonetic_correction(query: str) -> str:
+    return _engine_stage(query, fuzzy=False, phonetic=True)
+
+
+def fuzzy_correction(query: str) -> str:
+    return _engine_stage(query, fuzzy=True, phonetic=False)
+
+
+def run_pipeline(query: str) -> Dict[str, str]:
+    """Run every correction stage and return the intermediate results."""
+    corrected_symspell = symspell_correct(query)
+    corrected_phonetic = phonetic_correction(corrected_symspell)
+    corrected_fuzzy = fuzzy_correction(corrected_phonetic)
+    return {
+        "raw_query": query,
+        "symspell_corrected": corrected_symspell,
+        "phonetic_corrected": corrected_phonetic,
+        "fuzzy_corrected": corrected_fuzzy,
+    }
+
+
+def normalize_query(query: str) -> str:
+    """Spelling-corrected query (final stage of `run_pipeline`)."""
+    return run_pipeline(query)["fuzzy_corrected"]
+
+
+# %%
+if __name__ == "__main__":
+    if "--build" in sys.argv:
+        build_normalizer_artifact()
+        sys.exit(0)
+
+    started = time.perf_counter()
+    get_normalizer_index()
+    print(f"✅ Index ready in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    test_query = "fnd sars compny byjuz in benguluru"
+    for stage, result in run_pipeline(test_query).items():
+        print(f"{stage.upper():<25}: {result}")
+
+    queries = [test_query, "healtytech startps in mumbia", "fintec compnies in bangalor with 50 employes"]
+    runs = 2000
+    started = time.perf_counter()
+    for i in range(runs):
+        normalize_query(queries[i % len(queries)])
+    print(f"⏱️ {(time.perf_counter() - started) / runs * 1e6:.1f} µs / query (warm token cache)")
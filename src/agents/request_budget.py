@@ -0,0 +1,189 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/request_budget.py
+"""
+Per-request latency budget and graceful degradation.
+
+Every request gets an absolute `deadline` (epoch seconds, so it survives state
+checkpoints) carried in `AgentState`. Nodes ask `plan_degradation()` what they
+can still afford and degrade in a fixed order as the budget runs out:
+
+    remaining ≥ ENHANCER_LLM_MIN_SECONDS   → full pipeline
+    remaining <  ENHANCER_LLM_MIN_SECONDS   → 1. skip LLM enhancement (rule-based output)
+    remaining <  POST_PROCESS_MIN_SECONDS   → 2. skip the search agent's rerank / summary
+    remaining <  SHRINK_K_SECONDS           → 3. shrink k to DEGRADED_K
+    remaining ≤  0                          → 4. return partial results, no further calls
+
+Blocking calls run through `run_with_deadline()` (coroutines through
+`arun_with_deadline()`). The call runs on the caller's own thread inside a
+deadline scope: the pooled LLM HTTP clients read `client_timeout()` for every
+request they send (see agents.agent_runtime), so the socket itself gives up
+when the budget (optionally capped) runs out — nothing is left running in the
+background. Scopes nest: an inner call never gets more time than the outer
+one has left.
+
+✅ Usage:
+     state = {"deadline": new_deadline(), ...}
+     plan = plan_degradation(state)
+     if not plan.skip_llm_enhancer:
+         output = run_with_deadline(executor.invoke, state, {"input": query})
+"""
+
+import asyncio
+import contextvars
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, Mapping, Optional, Union
+
+
+# ─── Tunables ──────────────────────────────────────────────
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "12"))
+ENHANCER_LLM_MIN_SECONDS = float(os.getenv("ENHANCER_LLM_MIN_SECONDS", "5"))
+POST_PROCESS_MIN_SECONDS = float(os.getenv("POST_PROCESS_MIN_SECONDS", "4"))
+SHRINK_K_SECONDS = float(os.getenv("SHRINK_K_SECONDS", "1"))
+DEGRADED_K = int(os.getenv("DEGRADED_K", "3"))
+
+# Absolute deadline of the innermost `run_with_deadline` scope (None outside any)
+_call_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("call_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's budget ran out before the call finished."""
+
+
+@dataclass(frozen=True)
+class Degradation:
+    """What a node may still do with the remaining budget."""
+    remaining: float
+    skip_llm_enhancer: bool
+    skip_post_processing: bool
+    shrink_k: bool
+    partial: bool
+
+    def cap_k(self, k: Optional[int]) -> Optional[int]:
+        if not self.shrink_k:
+            return k
+        return min(k, DEGRADED_K) if k else DEGRADED_K
+
+    def describe(self) -> str:
+        steps = [name for name, on in (
+            ("skip LLM enhancer", self.skip_llm_enhancer),
+            ("skip post-processing", self.skip_post_processing),
+            ("shrink k", self.shrink_k),
+            ("partial results", self.partial),
+        ) if on]
+        return ", ".join(steps) or "none"
+
+
+DeadlineSource = Union[Mapping[str, Any], float, None]
+
+
+def new_deadline(budget_seconds: Optional[float] = None) -> float:
+    """Absolute deadline `budget_seconds` (default REQUEST_BUDGET_SECONDS) from now."""
+    return time.time() + (REQUEST_BUDGET_SECONDS if budget_seconds is None else budget_seconds)
+
+
+def remaining_seconds(source: DeadlineSource) -> float:
+    """Seconds left before the deadline of a state / deadline value (inf if none)."""
+    deadline = source.get("deadline") if isinstance(source, Mapping) else source
+    if deadline is None:
+        return math.inf
+    return deadline - time.time()
+
+
+def plan_degradation(source: DeadlineSource) -> Degradation:
+    remaining = remaining_seconds(source)
+    return Degradation(
+        remaining=remaining,
+        skip_llm_enhancer=remaining < ENHANCER_LLM_MIN_SECONDS,
+        skip_post_processing=remaining < POST_PROCESS_MIN_SECONDS,
+        shrink_k=remaining < SHRINK_K_SECONDS,
+        partial=remaining <= 0,
+    )
+
+
+def call_timeout(source: DeadlineSource, cap: Optional[float] = None) -> Optional[float]:
+    """Timeout for the next blocking call: what is left of the budget, optionally capped."""
+    remaining = remaining_seconds(source)
+    if math.isinf(remaining):
+        return cap
+    remaining = max(remaining, 0.0)
+    return remaining if cap is None else min(remaining, cap)
+
+
+def client_timeout() -> Optional[float]:
+    """Seconds the current deadline scope leaves for one HTTP request (None outside any scope)."""
+    return call_timeout(_call_deadline.get())
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[float]:
+    """Bound every client call in the block by `timeout` (never beyond an enclosing scope)."""
+    deadline = time.time() + timeout
+    outer = _call_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _call_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _call_deadline.reset(token)
+
+
+def run_with_deadline(fn: Callable[..., Any], source: DeadlineSource, *args: Any,
+                      cap: Optional[float] = None, **kwargs: Any) -> Any:
+    """
+    `fn(*args, **kwargs)` on the caller's thread, its client calls bounded by
+    the remaining budget; raises DeadlineExceeded when a call fails because
+    the budget ran out.
+    """
+    name = getattr(fn, "__name__", "call")
+    timeout = call_timeout(source, cap)
+    if timeout is None:
+        return fn(*args, **kwargs)
+    if timeout <= 0:
+        raise DeadlineExceeded(f"No budget left for {name}")
+
+    with deadline_scope(timeout) as deadline:
+        try:
+            return fn(*args, **kwargs)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            # Client timeouts surface as provider-specific errors; past the deadline they all mean the same
+            if remaining_seconds(deadline) <= 0:
+                raise DeadlineExceeded(f"{name} exceeded its {timeout:.2f}s budget") from e
+            raise
+
+
+async def arun_with_deadline(fn: Callable[..., Awaitable[Any]], source: DeadlineSource, *args: Any,
+                             cap: Optional[float] = None, **kwargs: Any) -> Any:
+    """Async twin of `run_with_deadline`: awaits `fn(*args, **kwargs)`, cancelled when the budget runs out."""
+    name = getattr(fn, "__name__", "call")
+    timeout = call_timeout(source, cap)
+    if timeout is None:
+        return await fn(*args, **kwargs)
+    if timeout <= 0:
+        raise DeadlineExceeded(f"No budget left for {name}")
+
+    # The scope is copied into the task wait_for creates, so its client calls are bounded too
+    with deadline_scope(timeout):
+        try:
+            return await asyncio.wait_for(fn(*args, **kwargs), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"{name} exceeded its {timeout:.2f}s budget")
@@ -0,0 +1,187 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/search_pipeline.py
+"""
+Direct search path: enhancer output → Qdrant, without the search-agent LLM hop.
+
+The Llama-3.3-70B search agent mostly just calls `qdrant_search` with the
+query, filters and k it was handed. Here the `EnhanceOutput` is validated
+against `QdrantSearchInput`, the query embedded and the shared `QdrantClient`
+queried directly, each request bounded by `qdrant_timeout()` (what the
+request's deadline scope has left).
+
+The agent is only needed when the user asks for post-processing of the hits
+(comparison, summary, explanation …) — see `needs_post_processing()`.
+
+`arun_direct_search()` is the async twin for the event loop: the query is
+embedded on the embedding pool and searched with `AsyncQdrantClient`, with the
+filter dialect translated by `to_qdrant_filter()`.
+
+Both are single-flight on `search_key()`: identical searches in flight at the
+same time (a popular query, a speculation equal to the enhanced search) share
+one embedding + Qdrant round trip (utils.single_flight).
+
+✅ Usage:
+     from agents.search_pipeline import run_direct_search, needs_post_processing
+     if not needs_post_processing(user_question):
+         hits = run_direct_search(enhance_output)     # [{id, score, payload}, ...]
+         hits = await arun_direct_search(enhance_output)
+"""
+
+import json
+import math
+import re
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+from agents.request_budget import client_timeout
+from schema.tools_schema import EnhanceOutput, QdrantSearchInput
+from utils.metrics import timer
+from utils.single_flight import get_single_flight
+from utils.tracing import set_attributes
+
+
+# ─── Tunables ──────────────────────────────────────────────
+DIRECT_SEARCH = os.getenv("DIRECT_SEARCH", "1") != "0"
+
+# Requests the search agent (LLM) has to handle: anything beyond "find me …"
+_POST_PROCESSING_PATTERN = re.compile(
+    r"\b(compar\w*|vs\.?|versus|differen\w*|contrast|summar\w*|overview|explain\w*|"
+    r"analy[sz]\w*|pros\s+and\s+cons|which\s+(?:one\s+)?is\s+better|recommend\w*|why)\b",
+    re.IGNORECASE,
+)
+
+
+def needs_post_processing(question: str) -> bool:
+    """True when the user wants the hits compared / summarised, not just listed."""
+    return not DIRECT_SEARCH or bool(_POST_PROCESSING_PATTERN.search(question or ""))
+
+
+def search_agent_input(question: str, search: Union[QdrantSearchInput, Mapping[str, Any]]) -> str:
+    """
+    The search agent's `{input}`: the user's request (what to compare /
+    summarise) plus the query, filters and k it should search with.
+    """
+    search_input = search if isinstance(search, QdrantSearchInput) else to_search_input(search)
+    return (
+        f"REQUEST:\n{question}\n\n"
+        f"QUERY:\n{search_input.query}\n\n"
+        f"FILTERS:\n{search_input.filters}\n\n"
+        f"K:\n{search_input.k}"
+    )
+
+
+def to_search_input(enhanced: Union[EnhanceOutput, Mapping[str, Any]]) -> QdrantSearchInput:
+    """Validate an enhancer output (model or dict) as `QdrantSearchInput`."""
+    data = enhanced.model_dump() if isinstance(enhanced, EnhanceOutput) else dict(enhanced)
+    if "query" not in data and data.get("enhanced_query"):
+        data["query"] = data["enhanced_query"]
+    # None means "not specified": let the schema defaults apply
+    data = {key: value for key, value in data.items() if value is not None}
+    return QdrantSearchInput.model_validate(data)
+
+
+def search_key(enhanced: Union[QdrantSearchInput, EnhanceOutput, Mapping[str, Any]]) -> str:
+    """Canonical key of a search: identical (query, filters, k) → identical key."""
+    search_input = enhanced if isinstance(enhanced, QdrantSearchInput) else to_search_input(enhanced)
+    return json.dumps([search_input.query, search_input.filters, search_input.k], sort_keys=True, default=str)
+
+
+def qdrant_timeout() -> int:
+    """
+    Timeout for the next Qdrant request: what the current deadline scope leaves
+    (agents.request_budget), in whole seconds as qdrant-client expects, never
+    above the client's default QDRANT_TIMEOUT_SECONDS.
+    """
+    from utils.qdrant_client_loader import QDRANT_TIMEOUT_SECONDS
+
+    remaining = client_timeout()
+    if remaining is None:
+        return QDRANT_TIMEOUT_SECONDS
+    return max(1, min(QDRANT_TIMEOUT_SECONDS, math.ceil(remaining)))
+
+
+def _hits(response) -> List[Dict[str, Any]]:
+    return [{"id": point.id, "score": point.score, "payload": point.payload} for point in response.points]
+
+
+def _direct_search(search_input: QdrantSearchInput) -> List[Dict[str, Any]]:
+    from utils.embedding_loader import get_embedding_model
+    from utils.qdrant_client_loader import get_qdrant_client, get_qdrant_collection_name
+
+    with timer("tool", "qdrant_search"):
+        set_attributes(filters=search_input.filters, k=search_input.k)
+        vector = get_embedding_model().embed_query(search_input.query)
+        response = get_qdrant_client().query_points(
+            collection_name=get_qdrant_collection_name(),
+            query=vector,
+            query_filter=to_qdrant_filter(search_input.filters),
+            limit=search_input.k,
+            with_payload=True,
+            timeout=qdrant_timeout(),
+        )
+        hits = _hits(response)
+        set_attributes(hits=len(hits))
+        return hits
+
+
+def run_direct_search(enhanced: Union[EnhanceOutput, Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Search Qdrant with the validated enhancer output: [{id, score, payload}, ...]."""
+    search_input = to_search_input(enhanced)
+    return get_single_flight("search").do(search_key(search_input), _direct_search, search_input)
+
+
+def to_qdrant_filter(filters: Optional[Mapping[str, Any]]):
+    """
+    Search-filter dialect → Qdrant `Filter` (all conditions must hold):
+    {"gte", "lte"} → Range, a list of keywords → MatchAny, a single value → MatchValue.
+    """
+    from qdrant_client.http.models import FieldCondition, Filter, MatchAny, MatchValue, Range
+
+    conditions = []
+    for key, value in (filters or {}).items():
+        if isinstance(value, dict):
+            conditions.append(FieldCondition(key=key, range=Range(gte=value.get("gte"), lte=value.get("lte"))))
+        elif isinstance(value, list):
+            conditions.append(FieldCondition(key=key, match=MatchAny(any=value)))
+        elif value is not None:
+            conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+    return Filter(must=conditions) if conditions else None
+
+
+async def _adirect_search(search_input: QdrantSearchInput) -> List[Dict[str, Any]]:
+    from utils.embedding_loader import aembed_query
+    from utils.qdrant_client_loader import get_async_qdrant_client, get_qdrant_collection_name
+
+    with timer("tool", "qdrant_search"):
+        set_attributes(filters=search_input.filters, k=search_input.k)
+        vector = await aembed_query(search_input.query)
+        response = await get_async_qdrant_client().query_points(
+            collection_name=get_qdrant_collection_name(),
+            query=vector,
+            query_filter=to_qdrant_filter(search_input.filters),
+            limit=search_input.k,
+            with_payload=True,
+            timeout=qdrant_timeout(),
+        )
+        hits = _hits(response)
+        set_attributes(hits=len(hits))
+        return hits
+
+
+async def arun_direct_search(enhanced: Union[EnhanceOutput, Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Async direct search: embedding on the bounded pool, AsyncQdrantClient for the query."""
+    search_input = to_search_input(enhanced)
+    return await get_single_flight("search").ado(search_key(search_input), _adirect_search, search_input)
@@ -0,0 +1,191 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/session_refiner.py
+"""
+Follow-up turns of a chat session: merge filters, refine results in memory.
+
+"now only those founded after 2020" should not start over. When the session
+already holds a search (`session_query`, `session_filters`, `session_results`
+in the checkpointed AgentState) and the new turn reads like a follow-up — it
+OPENS with a reference to the previous answer ("those", "of them", "filter
+…"), or with "now" / "also" / "only" / "just" / "instead" and names no new
+keyword entity ("now only after 2020", but not "now fintech in pune"):
+
+- 📝 the rest of the turn is appended to the stored query
+  ("fintech startups" + "founded after 2020")
+- 🔗 its filters are merged into the stored ones (ranges tighten, a keyword
+  field named again replaces the old values)
+- 🧠 if the merge only NARROWS the previous search and every hit's payload can
+  be checked, the stored hits are filtered in memory — no Qdrant call
+- 🔁 otherwise the previous query is searched again with the merged filters
+
+✅ Usage:
+     follow_up = plan_follow_up(state, user_input, rule_result.output)
+     if follow_up and follow_up.results:
+         ...  # answered from memory
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from schema.tools_schema import EnhanceOutput
+from tools.enhancer_agent_tools.filter_composer import compose_filters
+from tools.enhancer_agent_tools.keyword_extractor import KEYWORD_FIELDS, normalize_text
+from utils.currency import parse_inr_amount
+
+
+# Opening of a follow-up turn: filler / weak markers, then an optional reference
+# to the previous answer. Only the START of the turn is considered.
+_FOLLOW_UP_PATTERN = re.compile(
+    r"^\s*(?P<lead>(?:(?:ok(?:ay)?|and|but|so|then|please|(?:what|how)\s+about|show|give|list|keep|me|"
+    r"now|also|only|just|instead)\b[\s,]*)*)"
+    r"(?P<reference>(?:(?:filter|narrow|refine)(?:\s+(?:down|it|them|those|these))*"
+    r"|(?:of|among|from)\s+(?:them|those|these)|those|these|them|the\s+(?:same|ones)|same|ones)\b)?",
+    re.IGNORECASE,
+)
+# Lead words that mark a follow-up only when the turn names no new entity
+_WEAK_MARKERS = {"now", "also", "only", "just", "instead"}
+
+# Multi-valued payload fields and their separators ("python, react")
+_SEPARATORS: Dict[str, Optional[str]] = {field: sep for field, sep in KEYWORD_FIELDS.values()}
+
+
+@dataclass(frozen=True)
+class FollowUp:
+    """How a follow-up turn is answered."""
+    query: str
+    filters: Optional[Dict[str, Any]]
+    k: int
+    results: Optional[List[Dict[str, Any]]]     # refined in memory, or None → search again
+
+
+def _new_entities(previous: Mapping[str, Any], new: Optional[Mapping[str, Any]]) -> bool:
+    """True when the turn names a keyword value the stored filters do not already hold."""
+    for field, value in (new or {}).items():
+        if isinstance(value, dict):
+            continue                      # numeric constraints refine, they are not entities
+        old = previous.get(field)
+        old_values = set(map(str, old if isinstance(old, list) else [old] if old is not None else []))
+        if not set(map(str, value if isinstance(value, list) else [value])) <= old_values:
+            return True
+    return False
+
+
+def is_follow_up(text: str, new_entities: bool = False) -> bool:
+    """A reference to the previous answer at the start of the turn, or a weak marker without new entities."""
+    match = _FOLLOW_UP_PATTERN.match(text or "")
+    if match.group("reference"):
+        return True
+    lead = set(match.group("lead").lower().replace(",", " ").split())
+    return bool(lead & _WEAK_MARKERS) and not new_entities
+
+
+def follow_up_text(text: str) -> str:
+    """The turn without its follow-up opening: "now only those founded after 2020" → "founded after 2020"."""
+    return text[_FOLLOW_UP_PATTERN.match(text).end():].strip(" ,.?!")
+
+
+def merge_session_filters(previous: Optional[Mapping[str, Any]],
+                          new: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Stored filters + this turn's: ranges tighten, re-mentioned keyword fields are replaced."""
+    merged: Dict[str, Any] = dict(previous or {})
+    for field, value in (new or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(field), dict):
+            merged[field] = compose_filters({field: merged[field]}, {field: value})[field]
+        else:
+            merged[field] = value
+    return merged
+
+
+def _narrows(previous: Mapping[str, Any], merged: Mapping[str, Any]) -> bool:
+    """True when every hit of `merged` was already allowed by `previous`."""
+    for field, old in previous.items():
+        new = merged.get(field)
+        if isinstance(old, dict):
+            continue                      # ranges only ever tighten
+        if not set(map(str, new or [])) <= set(map(str, old if isinstance(old, list) else [old])):
+            return False
+    return True
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = parse_inr_amount(value)
+    return None if parsed is None else float(parsed)
+
+
+def payload_matches(payload: Mapping[str, Any], filters: Mapping[str, Any]) -> Optional[bool]:
+    """Evaluate the search-filter dialect on one payload; None if it cannot be decided."""
+    for field, condition in filters.items():
+        value = payload.get(field)
+        if value is None:
+            return None
+        if isinstance(condition, dict):
+            number = _number(value)
+            if number is None:
+                return None
+            if condition.get("gte") is not None and number < condition["gte"]:
+                return False
+            if condition.get("lte") is not None and number > condition["lte"]:
+                return False
+        else:
+            separator = _SEPARATORS.get(field)
+            raw_values = value if isinstance(value, list) else (
+                str(value).split(separator) if separator else [value]
+            )
+            have = {normalize_text(v) for v in raw_values}
+            wanted = {normalize_text(v) for v in (condition if isinstance(condition, list) else [condition])}
+            if not have & wanted:
+                return False
+    return True
+
+
+def refine_results(results: List[Dict[str, Any]], filters: Mapping[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Stored hits that satisfy `filters`; None if any hit cannot be evaluated."""
+    refined = []
+    for hit in results:
+        verdict = payload_matches(hit.get("payload") or {}, filters)
+        if verdict is None:
+            return None
+        if verdict:
+            refined.append(hit)
+    return refined
+
+
+def plan_follow_up(state: Mapping[str, Any], user_input: str, rule_output: EnhanceOutput) -> Optional[FollowUp]:
+    """FollowUp for a refinement turn of a session with a previous search, else None."""
+    session_query = state.get("session_query")
+    if not session_query:
+        return None
+    previous = state.get("session_filters") or {}
+    if not is_follow_up(user_input, _new_entities(previous, rule_output.filters)):
+        return None
+
+    rest = follow_up_text(user_input)
+    query = f"{session_query} {rest}" if rest else session_query
+    merged = merge_session_filters(previous, rule_output.filters)
+    k = rule_output.k
+
+    results = None
+    session_results = state.get("session_results") or []
+    if session_results and _narrows(previous, merged):
+        refined = refine_results(session_results, merged)
+        # An empty refinement may just mean the old top-k was too small: search again
+        results = refined[:k] if refined else None
+
+    return FollowUp(query=query, filters=merged or None, k=k, results=results)
@@ -0,0 +1,207 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/speculative_search.py
+"""
+Speculative raw-query search, run while the enhancer agent is still thinking.
+
+The enhancer agent spends seconds on LLM calls while Qdrant sits idle. When a
+request needs the agent, a semantic search on the raw query — pre-filtered only
+with the filters the rule enhancer already found — starts at once on a
+background pool. When the enhancement is done:
+
+- 🏆 win       → the enhanced filters equal the speculative ones, k is covered
+                and either there are no filters or the query is unchanged: the
+                speculative hits are returned, no second search
+- 🗑️ discarded → the enhanced search is run and its hits returned
+- 🛟 fallback  → the enhanced search failed or exceeded
+                `SPECULATIVE_ENHANCED_TIMEOUT_SECONDS`: the speculative hits are
+                returned instead of nothing
+
+Outcome counters (`get_speculation_stats()`) show whether speculation pays off.
+
+✅ Usage:
+     speculation = SpeculativeSearch(raw_query, rule_filters, k)   # starts now
+     ... run the enhancer ...
+     hits, outcome = speculation.resolve(query, filters, k, run_enhanced_search)
+
+     # Event loop: the speculative search is an asyncio task instead
+     speculation = AsyncSpeculativeSearch(raw_query, rule_filters, k)
+     hits, outcome = await speculation.aresolve(query, filters, k, arun_enhanced_search)
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from tools.enhancer_agent_tools.keyword_extractor import normalize_text
+from utils.logger import get_logger
+from utils.tracing import set_attributes
+
+
+# ─── Tunables ──────────────────────────────────────────────
+SPECULATIVE_SEARCH = os.getenv("SPECULATIVE_SEARCH", "1") != "0"
+SPECULATIVE_POOL_WORKERS = int(os.getenv("SPECULATIVE_POOL_WORKERS", "4"))
+SPECULATIVE_ENHANCED_TIMEOUT_SECONDS = float(os.getenv("SPECULATIVE_ENHANCED_TIMEOUT_SECONDS", "20"))
+
+_OUTCOMES = ("win", "discarded", "fallback", "failed")
+
+_stats: Dict[str, int] = {outcome: 0 for outcome in _OUTCOMES}
+_stats_lock = threading.Lock()
+
+log = get_logger("speculative_search")
+
+# 🔁 Singleton pool shared by every request (threads are created lazily)
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_search_pool() -> ThreadPoolExecutor:
+    """Returns the process-wide pool speculative / enhanced searches run on."""
+    global _pool
+
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=SPECULATIVE_POOL_WORKERS, thread_name_prefix="speculative")
+
+    return _pool
+
+
+def _default_search(query: str, filters: Optional[dict], k: int) -> Any:
+    # Same single-flight key space as the enhanced search (agents.search_pipeline)
+    from agents.search_pipeline import run_direct_search
+    set_attributes(speculative=True)
+    return run_direct_search({"query": query, "filters": filters, "k": k})
+
+
+def _record(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+        total = sum(_stats.values())
+        wins = _stats["win"]
+    log.debug("speculation.outcome", outcome=outcome, wins=wins, total=total)
+
+
+def get_speculation_stats() -> Dict[str, float]:
+    """Outcome counters and win rate for this process."""
+    with _stats_lock:
+        stats: Dict[str, float] = dict(_stats)
+    total = sum(stats.values())
+    stats["requests"] = total
+    stats["win_rate"] = round(stats["win"] / total, 4) if total else 0.0
+    return stats
+
+
+class SpeculativeSearch:
+    """A search on the raw query started immediately on the shared pool."""
+
+    def __init__(self, query: str, filters: Optional[dict], k: int,
+                 search_fn: Callable[[str, Optional[dict], int], Any] = _default_search):
+        self.query = query
+        self.filters = filters or None
+        self.k = k
+        self.future: Future = get_search_pool().submit(
+            contextvars.copy_context().run, search_fn, query, self.filters, k
+        )
+
+    def matches(self, query: str, filters: Optional[dict], k: Optional[int]) -> bool:
+        """True when the speculative hits answer the enhanced request."""
+        if (filters or None) != self.filters or (k or self.k) > self.k:
+            return False
+        # Without filters a reworded query retrieves (nearly) the same companies
+        return not self.filters or normalize_text(query or self.query) == normalize_text(self.query)
+
+    def _speculative_hits(self, timeout: Optional[float]) -> Tuple[bool, Any]:
+        try:
+            return True, self.future.result(timeout=timeout)
+        except Exception:
+            return False, None
+
+    def resolve(self, query: str, filters: Optional[dict], k: Optional[int],
+                enhanced_search: Callable[[], Any],
+                timeout: float = SPECULATIVE_ENHANCED_TIMEOUT_SECONDS) -> Tuple[Any, str]:
+        """
+        Returns (hits, outcome). `enhanced_search` runs only when the speculation
+        does not already answer the enhanced request.
+        """
+        if self.matches(query, filters, k):
+            ok, hits = self._speculative_hits(timeout)
+            if ok:
+                _record("win")
+                return (hits[:k] if k and isinstance(hits, list) else hits), "win"
+
+        enhanced_future = get_search_pool().submit(contextvars.copy_context().run, enhanced_search)
+        try:
+            hits = enhanced_future.result(timeout=timeout)
+        except Exception as e:
+            log.warning("speculation.enhanced_failed", error=type(e).__name__)
+            ok, hits = self._speculative_hits(timeout=0)
+            if ok:
+                _record("fallback")
+                return hits, "fallback"
+            _record("failed")
+            raise
+
+        self.future.cancel()
+        _record("discarded")
+        return hits, "discarded"
+
+
+async def _default_asearch(query: str, filters: Optional[dict], k: int) -> Any:
+    from agents.search_pipeline import arun_direct_search
+    return await arun_direct_search({"query": query, "filters": filters, "k": k})
+
+
+class AsyncSpeculativeSearch(SpeculativeSearch):
+    """Same speculation for the async path: the raw-query search is an asyncio task."""
+
+    def __init__(self, query: str, filters: Optional[dict], k: int,
+                 search_fn: Callable[[str, Optional[dict], int], Awaitable[Any]] = _default_asearch):
+        self.query = query
+        self.filters = filters or None
+        self.k = k
+        self.task: asyncio.Task = asyncio.create_task(search_fn(query, self.filters, k))
+
+    async def _aspeculative_hits(self, timeout: Optional[float]) -> Tuple[bool, Any]:
+        try:
+            # Shielded: timing out here must not cancel the search for a later fallback
+            return True, await asyncio.wait_for(asyncio.shield(self.task), timeout=timeout)
+        except Exception:
+            return False, None
+
+    async def aresolve(self, query: str, filters: Optional[dict], k: Optional[int],
+                       enhanced_search: Callable[[], Awaitable[Any]],
+                       timeout: float = SPECULATIVE_ENHANCED_TIMEOUT_SECONDS) -> Tuple[Any, str]:
+        """Async `resolve`: (hits, outcome)."""
+        if self.matches(query, filters, k):
+            ok, hits = await self._aspeculative_hits(timeout)
+            if ok:
+                _record("win")
+                return (hits[:k] if k and isinstance(hits, list) else hits), "win"
+
+        try:
+            hits = await asyncio.wait_for(enhanced_search(), timeout=timeout)
+        except Exception as e:
+            log.warning("speculation.enhanced_failed", error=type(e).__name__)
+            if self.task.done() and not self.task.cancelled() and self.task.exception() is None:
+                _record("fallback")
+                return self.task.result(), "fallback"
+            self.task.cancel()
+            _record("failed")
+            raise
+
+        self.task.cancel()
+        _record("discarded")
+        return hits, "discarded"
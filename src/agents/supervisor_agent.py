@@ -18,14 +18,34 @@ else:
 
 
 # src/agents/supervisor_agent.py
+"""
+Supervisor: decides which node runs next.
+
+Almost every hop follows directly from `AgentState`, so a deterministic policy
+(`rule_based_route`) is evaluated first and gpt-4o is only asked when the state
+is genuinely ambiguous:
 
-from typing import Literal, List, Optional
+    results retrieved                         → __end__
+    no enhanced query, enhancer not run yet   → enhancer
+    enhanced query, search not run yet        → qdrant_search
+    anything else (empty enhancement, empty search, …) → LLM router
+
+`get_route_stats()` reports how often each path was taken ("rule:enhancer",
+"llm:__end__", …). SUPERVISOR_LLM_FALLBACK=0 ends ambiguous runs instead, and
+a run whose request deadline has passed ends with its partial results.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Literal, List, Optional
 from pydantic import BaseModel, Field
 from langchain import PromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
 from schema.agent_state import AgentState
+from agents.agent_runtime import get_llm
+from agents.supervisor_context import build_supervisor_context
+from agents.request_budget import DeadlineExceeded, plan_degradation, run_with_deadline
 
 
 # 1️⃣ Define the structured output schema for the Supervisor Agent
@@ -43,53 +63,97 @@ supervisor_prompt = PromptTemplate.from_template(
 1) enhancer — improves and structures the user's query
 2) qdrant_search — retrieves results from the Qdrant database
 
-Based on the conversation history and the current state, choose which agent should run next.
+Based on the current state, choose which agent should run next.
 
 State summary:
-- enhanced_query   : {enhanced_query}
-- filters          : {filters}
-- retrieved_results: {retrieved_results}
+{state_summary}
 
 Provide a JSON object matching this schema:
 {{ 
   "next": "<enhancer|qdrant_search|__end__>", 
   "reason": "Why you chose that node" 
 }}
-
-Conversation history:
-{messages}
 """
 )
 
 
 
-# 3️⃣ Instantiate the chat model (zero temperature for deterministic routing)
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
+# 3️⃣ Shared chat model (zero temperature for deterministic routing), built once
+#    per process by agents.agent_runtime and bound to the output schema lazily
+_supervisor_llm = None
+
+
+def get_supervisor_llm():
+    global _supervisor_llm
+
+    if _supervisor_llm is None:
+        _supervisor_llm = get_llm("supervisor").with_structured_output(SupervisorOutput)
+
+    return _supervisor_llm
+
+# ─── Tunables ──────────────────────────────────────────────
+SUPERVISOR_LLM_FALLBACK = os.getenv("SUPERVISOR_LLM_FALLBACK", "1") != "0"
+
+# 📊 Routing path counters ("rule:<node>" / "llm:<node>" / "deadline:<node>" / "fallback_disabled:<node>")
+_route_counts: Counter = Counter()
+_route_lock = threading.Lock()
+
+
+def _record_route(path: str, node: str) -> None:
+    with _route_lock:
+        _route_counts[f"{path}:{node}"] += 1
+
+
+def get_route_stats() -> Dict[str, int]:
+    """How often each routing path was taken in this process."""
+    with _route_lock:
+        return dict(_route_counts)
+
+
+def rule_based_route(state: AgentState) -> Optional[SupervisorOutput]:
+    """
+    Deterministic routing straight from AgentState; None when the state is
+    ambiguous and the LLM router has to decide.
+    """
+    last_agent        = state.get("agent_name")
+    enhanced_query    = state.get("enhanced_query")
+    retrieved_results = state.get("retrieved_results")
+
+    if retrieved_results:
+        return SupervisorOutput(next="__end__", reason="Results retrieved; nothing left to do.")
+    if not enhanced_query and last_agent is None:
+        return SupervisorOutput(next="enhancer", reason="No enhanced query yet; enhancing the user query.")
+    if enhanced_query and last_agent != "qdrant_search":
+        return SupervisorOutput(next="qdrant_search", reason="Enhanced query ready; searching Qdrant.")
+    return None
+
 
 def run_supervisor_agent(
     messages: List[dict],
     enhanced_query: Optional[str],
     filters: Optional[dict],
-    retrieved_results: Optional[list]
+    retrieved_results: Optional[list],
+    k: Optional[int] = None,
+    last_agent: Optional[str] = None
 ) -> SupervisorOutput:
     """
     Calls the Supervisor LLM with structured output, returning a SupervisorOutput.
+    The prompt carries a token-budgeted state summary, not the full history.
     """
     prompt = supervisor_prompt.format(
-        messages="\n".join(f"{m['role']}: {m['content']}" for m in messages),
-        enhanced_query=enhanced_query or "",
-        filters=filters or {},
-        retrieved_results=retrieved_results or []
+        state_summary=build_supervisor_context(
+            messages, enhanced_query, filters, retrieved_results, k=k, last_agent=last_agent
+        )
     )
     # The LLM will return an object matching SupervisorOutput
-    return llm.with_structured_output(SupervisorOutput).invoke([{"role": "system", "content": prompt}])
+    return get_supervisor_llm().invoke([{"role": "system", "content": prompt}])
 
 # 4️⃣ Wrap it all in a LangGraph node
 def supervisor_node(state: AgentState) -> Command[Literal["enhancer", "qdrant_search", "__end__"]]:
     """
     LangGraph node that:
     1. Extracts state fields.
-    2. Invokes the Supervisor agent.
+    2. Routes by rule, invoking the Supervisor agent only if the state is ambiguous.
     3. Appends the agent's reason to state.messages.
     4. Returns a Command routing to the chosen next node.
     """
@@ -100,23 +164,48 @@ def supervisor_node(state: AgentState) -> Command[Literal["enhancer", "qdrant_se
     filters           = state.get("filters")
     retrieved_results = state.get("retrieved_results")
 
-    # Invoke the Supervisor LLM
-    supervisor_out = run_supervisor_agent(
-        messages,
-        enhanced_query,
-        filters,
-        retrieved_results
-    )
-
-    # Append the supervisor's rationale to the conversation trace
-    updated_messages = messages + [
+    # Out of budget: stop with whatever has been gathered so far
+    if plan_degradation(state).partial:
+        supervisor_out = SupervisorOutput(next="__end__", reason="Request deadline exceeded; returning partial results.")
+        _record_route("deadline", supervisor_out.next)
+        return Command(
+            update={"messages": [HumanMessage(content=supervisor_out.reason, name="supervisor")]},
+            goto=supervisor_out.next
+        )
+
+    # Deterministic policy first; the Supervisor LLM only for ambiguous states
+    supervisor_out = rule_based_route(state)
+    if supervisor_out is not None:
+        _record_route("rule", supervisor_out.next)
+    elif SUPERVISOR_LLM_FALLBACK:
+        try:
+            supervisor_out = run_with_deadline(
+                run_supervisor_agent,
+                state,
+                messages,
+                enhanced_query,
+                filters,
+                retrieved_results,
+                k=state.get("k"),
+                last_agent=state.get("agent_name")
+            )
+            _record_route("llm", supervisor_out.next)
+        except DeadlineExceeded:
+            supervisor_out = SupervisorOutput(next="__end__", reason="Supervisor LLM ran out of budget.")
+            _record_route("deadline", supervisor_out.next)
+    else:
+        supervisor_out = SupervisorOutput(next="__end__", reason="Ambiguous state and LLM fallback disabled.")
+        _record_route("fallback_disabled", supervisor_out.next)
+
+    # Append the supervisor's rationale to the conversation trace (reducer appends)
+    new_messages = [
         HumanMessage(content=supervisor_out.reason, name="supervisor")
     ]
 
     # Return the updated state and route to the chosen node
     return Command(
         update={
-            "messages": updated_messages
+            "messages": new_messages
         },
         goto=supervisor_out.next
     )
@@ -0,0 +1,166 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/agents/supervisor_context.py
+"""
+Token-budgeted state summary for the Supervisor prompt.
+
+Formatting the whole `messages` history and every raw Qdrant payload into the
+prompt makes supervisor latency and cost grow with each hop. The supervisor
+only needs to know where the run stands, so this builds a compact summary
+that always fits `SUPERVISOR_TOKEN_BUDGET` tokens of the supervisor model's
+tokenizer:
+
+- 🗣️ latest user turn (at most half of the budget)
+- 🤖 last node that ran
+- 📦 result count + top-N company names (never full payloads)
+- 🔍 enhanced query, k, filters
+- 📜 rolling summary of the turns evicted from the message window, if room is left
+
+Sections are added in priority order; whatever does not fit is cut or dropped.
+
+✅ Usage:
+     from agents.supervisor_context import build_supervisor_context
+     summary = build_supervisor_context(messages, enhanced_query, filters, results)
+"""
+
+import json
+from typing import Any, List, Optional
+
+import tiktoken
+
+from agents.agent_runtime import LLM_SPECS
+from schema.agent_state import history_summary
+
+
+# ─── Tunables ──────────────────────────────────────────────
+SUPERVISOR_TOKEN_BUDGET = int(os.getenv("SUPERVISOR_TOKEN_BUDGET", "400"))
+SUPERVISOR_TOP_N = int(os.getenv("SUPERVISOR_TOP_N", "5"))
+
+_NAME_FIELDS = ("company_name", "Company Name", "name")
+_ELLIPSIS = " …"
+
+# 🔁 Singleton tokenizer
+_encoding = None
+
+
+def get_encoding():
+    """Tokenizer of the supervisor model (o200k_base if tiktoken does not know it)."""
+    global _encoding
+
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(LLM_SPECS["supervisor"]["model"])
+        except KeyError:
+            _encoding = tiktoken.get_encoding("o200k_base")
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """`text` cut to at most `max_tokens` tokens (ellipsis included)."""
+    encoding = get_encoding()
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    keep = max(max_tokens - len(encoding.encode(_ELLIPSIS)), 0)
+    return encoding.decode(tokens[:keep]) + _ELLIPSIS
+
+
+def _message_field(message: Any, field: str) -> Optional[str]:
+    if isinstance(message, dict):
+        return message.get(field)
+    # HumanMessage(name=...) as appended by the supervisor node
+    return getattr(message, "name" if field == "role" else field, None)
+
+
+def latest_user_turn(messages: List[Any]) -> str:
+    for message in reversed(messages or []):
+        if _message_field(message, "role") == "user":
+            return str(_message_field(message, "content") or "")
+    return ""
+
+
+def _result_name(result: Any) -> Optional[str]:
+    if not isinstance(result, dict):
+        return None
+    payload = result.get("payload") or result
+    if isinstance(payload.get("metadata"), dict):
+        payload = {**payload["metadata"], **payload}
+    for field in _NAME_FIELDS:
+        if payload.get(field):
+            return str(payload[field])
+    return None
+
+
+def build_supervisor_context(
+    messages: List[Any],
+    enhanced_query: Optional[str],
+    filters: Optional[dict],
+    retrieved_results: Optional[list],
+    k: Optional[int] = None,
+    last_agent: Optional[str] = None,
+    budget: int = SUPERVISOR_TOKEN_BUDGET,
+    top_n: int = SUPERVISOR_TOP_N,
+) -> str:
+    """Compact state summary that fits within `budget` tokens."""
+    results = retrieved_results or []
+    names = [name for name in map(_result_name, results) if name][:top_n]
+
+    # (label, value) in priority order; lines that do not fit are cut, then dropped
+    sections: List[tuple] = [
+        ("latest_user_turn", truncate_to_tokens(latest_user_turn(messages), budget // 2)),
+        ("last_agent", last_agent or "none"),
+        ("result_count", str(len(results))),
+        ("enhanced_query", enhanced_query or ""),
+        ("k", "" if k is None else str(k)),
+        ("filters", json.dumps(filters or {}, ensure_ascii=False, default=str)),
+    ]
+
+    lines: List[str] = []
+    used = 0
+    for label, value in sections:
+        line = f"- {label}: {value}"
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            room = budget - used - count_tokens(f"- {label}: ") - 1
+            if room <= 0:
+                break
+            line = f"- {label}: {truncate_to_tokens(value, room)}"
+            cost = count_tokens(line) + 1
+        lines.append(line)
+        used += cost
+
+    # Top-N names: as many as still fit
+    shown: List[str] = []
+    for name in names:
+        line = f"- top_results: {', '.join(shown + [name])}"
+        if used + count_tokens(line) + 1 > budget:
+            break
+        shown.append(name)
+    if shown:
+        lines.append(f"- top_results: {', '.join(shown)}")
+        used += count_tokens(lines[-1]) + 1
+
+    earlier = history_summary(messages)
+    room = budget - used - count_tokens("- earlier_turns: ") - 1
+    if earlier and room > 0:
+        lines.append(f"- earlier_turns: {truncate_to_tokens(earlier, room)}")
+
+    return "\n".join(lines)
@@ -2,11 +2,20 @@ import os
 from langchain_openai import ChatOpenAI
 from langchain.callbacks.base import BaseCallbackHandler
 from typing import Any, Dict, List
+from utils.llm_cache import get_llm_cache
+from utils.metrics import get_metrics_callback
+from utils.tracing import get_tracing_callback
+from utils.logger import get_logger
+
+# Debug trace of LangChain events: DEBUG-level, queued and truncated (utils.logger)
+log = get_logger("langchain")
 
 class Handler(BaseCallbackHandler):
     """
     Custom debug handler for tracing all major LangChain events during execution.
-    Logs chain calls, tool usage, LLM prompts/responses, agent actions, and errors.
+    Logs chain calls, tool usage, LLM prompts/responses, agent actions, and errors
+    as structured records (DEBUG for the trace, ERROR for failures); nothing is
+    formatted unless the level is enabled.
     """
 
     def on_chain_start(self, serialized: Dict[str, Any], inputs: Dict[str, Any], **kwargs):
@@ -14,83 +23,77 @@ class Handler(BaseCallbackHandler):
         🔗 Triggered when a Chain starts.
         Shows the chain name and input arguments.
         """
-        print(f"\n🔗 [Chain Start] {serialized.get('name', 'Unnamed Chain')} with inputs:")
-        print(inputs)
+        log.debug("chain.start", name=(serialized or {}).get("name", "Unnamed Chain"), inputs=inputs)
 
     def on_chain_end(self, outputs: Dict[str, Any], **kwargs):
         """
         ✅ Triggered when a Chain successfully ends.
         Shows the output returned by the chain.
         """
-        print(f"\n✅ [Chain End] Output:")
-        print(outputs)
+        log.debug("chain.end", outputs=outputs)
 
     def on_chain_error(self, error: Exception, **kwargs):
         """
         ❌ Triggered when a Chain fails.
         Shows the raised exception.
         """
-        print(f"\n❌ [Chain Error] {str(error)}")
+        log.error("chain.error", error=str(error))
 
     def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs):
         """
         🛠️ Triggered when a Tool is called.
         Shows tool name and input.
         """
-        print(f"\n🛠️ [Tool Start] {serialized.get('name', 'Unnamed Tool')} with input: {input_str}")
+        log.debug("tool.start", name=(serialized or {}).get("name", "Unnamed Tool"), input=input_str)
 
     def on_tool_end(self, output: str, **kwargs):
         """
         ✅ Triggered when a Tool finishes.
         Shows the tool's output.
         """
-        print(f"\n✅ [Tool End] Output: {output}")
+        log.debug("tool.end", output=output)
 
     def on_tool_error(self, error: Exception, **kwargs):
         """
         ❌ Triggered when a Tool throws an error.
         Logs the exception.
         """
-        print(f"\n❌ [Tool Error] {str(error)}")
+        log.error("tool.error", error=str(error))
 
     def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs):
         """
         📤 Triggered before sending a prompt to the LLM.
         Shows the exact prompt(s) being passed.
         """
-        print(f"\n📤 [LLM Start] Prompt:")
-        for prompt in prompts:
-            print(prompt)
+        log.debug("llm.start", prompts=prompts)
 
     def on_llm_end(self, response: Any, **kwargs):
         """
         ✅ Triggered when the LLM returns a response.
         Shows the LLM output.
         """
-        print(f"\n✅ [LLM End] Response:")
-        print(response)
+        log.debug("llm.end", response=response)
 
     def on_llm_error(self, error: Exception, **kwargs):
         """
         ❌ Triggered if the LLM call fails.
         Shows the exception.
         """
-        print(f"\n❌ [LLM Error] {str(error)}")
+        log.error("llm.error", error=str(error))
 
     def on_agent_action(self, action: Any, **kwargs):
         """
         🤖 Triggered when an agent selects a tool.
         Shows the chosen tool and its input.
         """
-        print(f"\n🤖 [Agent Action] Tool: {action.tool}, Input: {action.tool_input}")
+        log.debug("agent.action", tool=action.tool, input=action.tool_input)
 
     def on_agent_finish(self, finish: Any, **kwargs):
         """
         🏁 Triggered when an agent finishes execution.
         Logs final return values.
         """
-        print(f"\n🏁 [Agent Finish] Return values:")
-        print(finish.return_values)
+        log.debug("agent.finish", return_values=finish.return_values)
 
 
 def init_env():
@@ -103,5 +106,6 @@ def get_llm():
         model="gpt-4",
         temperature=0,
         api_key=os.getenv("OPENAI_API_KEY"),
-        callbacks=[Handler()]
+        cache=get_llm_cache(),
+        callbacks=[Handler(), get_metrics_callback(), get_tracing_callback()]
     )
\ No newline at end of file
@@ -0,0 +1,138 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/database/migrate_payloads.py
+"""
+Payload layout shared by the ingest notebook and an in-place migration of an
+existing collection.
+
+Filters are exact (`MatchAny` / `MatchValue`), so the payload has to hold the
+same values the keyword extractor produces:
+
+- multi-valued keyword fields (`tech_stack`, `product_categories`) are lists
+  of lower-cased values: "Node.js, MongoDB, Azure" → ["node.js", "mongodb", "azure"]
+- every other keyword field is one lower-cased string
+- keys are the snake_case `PAYLOAD_SCHEMA` names (`payload_key`), e.g.
+  "Employee Growth (YoY %)" → `employee_growth_yoy`
+- range-indexed fields are numbers: money in whole rupees ("₹457 Cr" →
+  4570000000), counts / years as ints, growth as a float ("3%" → 3.0)
+
+`to_payload()` is what `build_qdrant_native.ipynb` stores. `migrate()` rewrites
+the payloads of a collection ingested with an older layout — no re-embedding,
+the vectors are untouched.
+
+✅ Usage:
+     from database.migrate_payloads import to_payload
+     payload = to_payload(row.to_dict())
+
+✅ CLI (against the Qdrant server from utils.qdrant_client_loader):
+     python database/migrate_payloads.py [--dry-run]
+"""
+
+from typing import Any, Dict, Mapping
+
+from schema.company_schema import payload_key
+from tools.enhancer_agent_tools.keyword_extractor import KEYWORD_FIELDS
+from tools.enhancer_agent_tools.numeric_extractor import GROWTH, INTEGER_FIELDS, MONEY_FIELDS
+from utils.currency import parse_inr_amount
+
+
+# Payload field → separator of its multi-valued dataset column
+MULTI_VALUED_FIELDS: Dict[str, str] = {
+    field: separator for field, separator in KEYWORD_FIELDS.values() if separator
+}
+
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "256"))
+
+
+def normalize_field_name(field: str) -> str:
+    """Dataset column or older stored key → `PAYLOAD_SCHEMA` key."""
+    return payload_key(field)
+
+
+def _to_number(value: Any) -> Any:
+    try:
+        return float(str(value).strip().rstrip("%").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def to_payload_value(field: str, value: Any) -> Any:
+    """One dataset / stored value → the value filters are matched against."""
+    if field in MONEY_FIELDS:
+        return parse_inr_amount(value)
+    if field in INTEGER_FIELDS:
+        number = _to_number(value)
+        return None if number is None else int(number)
+    if field == GROWTH:
+        return _to_number(value)
+    if field in MULTI_VALUED_FIELDS:
+        parts = value if isinstance(value, list) else str(value).split(MULTI_VALUED_FIELDS[field])
+        return [str(part).strip().lower() for part in parts if str(part).strip()]
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def to_payload(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Dataset row or stored payload (either key style) → payload; missing values are dropped."""
+    payload = {}
+    for key, value in row.items():
+        if value is None or value != value:          # None / NaN
+            continue
+        field = normalize_field_name(str(key))
+        value = to_payload_value(field, value)
+        if value is not None:
+            payload[field] = value
+    return payload
+
+
+def migrate(dry_run: bool = False) -> int:
+    """
+    Rewrite every payload of the collection with `to_payload` and (re)create the
+    `PAYLOAD_SCHEMA` indexes on the new keys; returns the number of points changed.
+    """
+    from schema.qdrant_schema import PAYLOAD_SCHEMA
+    from utils.qdrant_client_loader import get_qdrant_client, get_qdrant_collection_name
+
+    client = get_qdrant_client()
+    collection = get_qdrant_collection_name()
+    changed = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection, limit=MIGRATION_BATCH_SIZE, offset=offset,
+            with_payload=True, with_vectors=False,
+        )
+        for point in points:
+            payload = to_payload(point.payload or {})
+            if payload != point.payload:
+                changed += 1
+                if not dry_run:
+                    client.overwrite_payload(collection_name=collection, payload=payload, points=[point.id])
+        if offset is None:
+            break
+
+    if not dry_run:
+        for field, schema in PAYLOAD_SCHEMA.items():
+            field_schema = schema["type"] if isinstance(schema, dict) else schema
+            client.create_payload_index(collection_name=collection, field_name=field, field_schema=field_schema)
+    return changed
+
+
+if __name__ == "__main__":
+    dry_run = "--dry-run" in sys.argv
+    count = migrate(dry_run=dry_run)
+    print(f"✅ {'Would rewrite' if dry_run else 'Rewrote'} {count} payloads")
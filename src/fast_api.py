@@ -1,14 +1,28 @@
 # fastapi_app.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+import asyncio
+import json
 
 # Optional: import your actual enhancer agent
-from .main import run_enhancer_agent
+from .main import arun_enhancer_agent
+from agents.batch_chat import BATCH_MAX_QUERIES, run_chat_batch
+# .main puts src/ on sys.path, so the graph modules resolve like everywhere else
+from graph.chat_stream import sse_stream, stream_chat
+from graph.sessions import run_session_turn
+from graph.lifecycle import lifespan, readiness_response
+from utils.company_index import COMPANIES_PAGE_SIZE, get_company_index
+from utils.enhancer_cache import cache_key
+from utils.metrics import get_metrics
+from utils.single_flight import CoalesceTimeout, get_single_flight
+from utils.tracing import start_trace
 
-app = FastAPI()
+# Graph, embeddings, Qdrant and LLM pools are warmed up at startup (see graph.lifecycle)
+app = FastAPI(lifespan=lifespan)
 
 # Allow frontend (Flutter web or emulator) to connect
 app.add_middleware(
@@ -24,34 +38,97 @@ def read_root():
     return {"message": "Backend is alive!"}
 
 
-# ✅ This supports your current Flutter UI
+# ✅ Readiness probe: 503 until the warm-up and canary query have succeeded
+@app.get("/ready")
+def ready():
+    return readiness_response()
+
+
+# ✅ Prometheus scrape endpoint: node / tool / embedding / LLM latency histograms + token counters
+@app.get("/metrics")
+def metrics():
+    body, content_type = get_metrics().render_prometheus()
+    return Response(content=body, media_type=content_type)
+
+
+# ✅ This supports your current Flutter UI: browse the catalogue from the in-memory
+# columnar index (no LLM / vector path). Body stays a list of cards; paging via headers.
 @app.get("/get_companies")
-async def get_companies():
-    return [
-        {
-            "name": "Zyphra AI",
-            "location": "Bangalore, India",
-            "sector": "B2B SaaS",
-            "funding": "10M USD",
-            "founded_year": 2021,
-            "description": "AI-powered document intelligence platform."
-        },
-        {
-            "name": "ClariPay",
-            "location": "Delhi, India",
-            "sector": "Cross-border Payments",
-            "funding": "5M USD",
-            "founded_year": 2020,
-            "description": "Simplifies global vendor payments for exporters."
-        }
-    ]
+async def get_companies(
+    filters: Optional[str] = None,      # JSON, search-filter dialect: {"state": ["karnataka"], "year_founded": {"gte": 2016}}
+    sort: Optional[str] = None,         # numeric field or company_name; "-" prefix = descending
+    limit: int = COMPANIES_PAGE_SIZE,
+    cursor: Optional[str] = None,       # X-Next-Cursor of the previous page
+    fields: Optional[str] = None,       # comma-separated Company fields
+):
+    try:
+        page = get_company_index().page(
+            filters=json.loads(filters) if filters else None,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        )
+    except ValueError as e:         # also json.JSONDecodeError
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Total-Count": str(page.total)}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return JSONResponse(content=page.items, headers=headers)
 
 
 # ✅ This is future-facing (for chat input / enhanced search)
 class QueryRequest(BaseModel):
     query: str
+    # Multi-turn: follow-up turns of the same session build on its previous search
+    session_id: Optional[str] = None
 
 @app.post("/chat")
 async def chat(request: QueryRequest):
-    result = run_enhancer_agent(request.query)
-    return result
+    # One trace per request: node / tool / embedding / LLM spans nest under it (utils.tracing)
+    with start_trace("POST /chat", query=request.query, session_id=request.session_id):
+        if request.session_id:
+            # The SQLite checkpointer is sync-only: the session turn runs on a worker thread
+            return await asyncio.to_thread(run_session_turn, request.query, request.session_id)
+        # Async end to end (ainvoke, AsyncQdrantClient, embedding pool): the event loop never blocks.
+        # Identical queries in flight share one pipeline run (utils.single_flight)
+        try:
+            return await get_single_flight("chat").ado(cache_key(request.query), arun_enhancer_agent, request.query)
+        except CoalesceTimeout:
+            # Same partial answer as a request that ran out of budget
+            return {"type": "card", "payload": []}
+
+
+# ✅ Bulk chat: deduped, batched LLM / Qdrant calls for many canned questions at once
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+
+@app.post("/chat/batch")
+async def chat_batch(request: BatchQueryRequest):
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_QUERIES} queries per batch")
+    results, report = await asyncio.to_thread(run_chat_batch, request.queries)
+    return {"results": results, "report": report.to_dict()}
+
+
+# ✅ Streaming chat: typed events (query, filters, cards, answer tokens) as they happen
+@app.post("/chat/stream")
+async def chat_stream(request: QueryRequest):
+    return StreamingResponse(
+        sse_stream(request.query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Same events over a WebSocket: send {"query": "..."} per turn
+@app.websocket("/chat/ws")
+async def chat_ws(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            async for event in stream_chat(message.get("query", "")):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
@@ -1,12 +1,12 @@
 # %%
 from fastapi import FastAPI
 from pydantic import BaseModel
-from typing import List, Union, Literal
+from typing import Union, Literal
 
 app = FastAPI()
 
 # Import your agent logic from main.py
-from .main import run_enhancer_agent
+from .main import arun_enhancer_agent
 
 # %%
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,18 +21,8 @@ app.add_middleware(
 )
 
 # %%
-# ✅ Pydantic models for structured responses
-class Company(BaseModel):
-    name: str
-    location: str
-    sector: str
-    funding: str
-    founded_year: int
-    description: str
-
-class CompanyCardResponse(BaseModel):
-    type: str  # should be "company_cards"
-    payload: List[Company]
+# ✅ Pydantic models for structured responses (company cards: schema.company_schema)
+from .schema.company_schema import CompanyCardResponse
 
 class MessageResponse(BaseModel):
     type: str  # should be "message"
@@ -52,7 +42,7 @@ def read_root():
 # ✅ Main dynamic chat endpoint
 @app.post("/chat", response_model=Union[CompanyCardResponse, MessageResponse])
 async def chat(request: QueryRequest):
-    result = run_enhancer_agent(request.query)
+    result = await arun_enhancer_agent(request.query)
 
     # 🎯 If result is a list of company-like dicts
     if isinstance(result, list) and all("name" in r for r in result):
@@ -0,0 +1,183 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/graph/chat_stream.py
+"""
+Typed chat events streamed from the compiled graph as they happen.
+
+`/chat` only answers once enhancer + search are both done. This drives the
+shared compiled graph with `astream(stream_mode=["updates", "messages", "custom"])`
+and turns what comes out into small typed events, so the client can render
+the first company cards while the LLM is still writing its answer:
+
+    {"type": "start",            "request_id": ...}
+    {"type": "node",             "node": "enhancer"}             ← a node finished
+    {"type": "normalized_query", "query": ...}
+    {"type": "filters",          "filters": {...}, "k": 5}
+    {"type": "card",             "rank": 0, "id": ..., "score": ..., "company": {...}}
+    {"type": "token",            "node": "qdrant_search", "text": ...}
+    {"type": "done",             "result_count": 5, "first_card_ms": ..., "elapsed_ms": ...}
+    {"type": "error",            "message": ...}
+
+Nodes may push events early with `emit_event(...)` (e.g. cards straight after
+the vector search); cards already sent that way are not repeated.
+
+✅ Usage:
+     async for event in stream_chat("fintech startups in bengaluru"):
+         ...
+     # SSE:  StreamingResponse(sse_stream(query), media_type="text/event-stream")
+
+✅ CLI (prints the events; exits 1 unless the stream ends with `done` and no `error`):
+     python src/graph/chat_stream.py "fintech startups in bengaluru"
+"""
+
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langgraph.config import get_stream_writer
+
+from agents.request_budget import new_deadline
+from schema.company_schema import Company
+from utils.tracing import start_trace
+
+
+# Nodes whose LLM tokens are forwarded to the client as the answer
+ANSWER_NODES = {"qdrant_search"}
+
+
+def emit_event(event: Dict[str, Any]) -> None:
+    """Push a typed event to the stream from inside a node (no-op outside a streamed run)."""
+    try:
+        get_stream_writer()(event)
+    except (RuntimeError, KeyError):
+        pass
+
+
+def card_event(hit: Any, rank: int) -> Optional[Dict[str, Any]]:
+    """Qdrant hit {id, score, payload} → card event (None if it carries no payload)."""
+    if not isinstance(hit, dict):
+        return None
+    payload = hit.get("payload") or {}
+    if not payload:
+        return None
+    return {
+        "type": "card",
+        "rank": rank,
+        "id": hit.get("id"),
+        "score": hit.get("score"),
+        "company": Company.from_payload(payload).model_dump(),
+    }
+
+
+async def stream_chat(query: str, request_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Run the graph for `query`, yielding typed events as they happen."""
+    # Imported here: the graph's nodes import emit_event / card_event from this module
+    from graph.workflow import get_graph, graph_config
+
+    request_id = request_id or uuid.uuid4().hex
+    started = time.perf_counter()
+    first_card_ms: Optional[float] = None
+    sent_cards: set = set()
+    result_count = 0
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    def mark_card(event: Dict[str, Any]) -> bool:
+        nonlocal first_card_ms
+        key = event.get("id", event.get("rank"))
+        if key in sent_cards:
+            return False
+        sent_cards.add(key)
+        if first_card_ms is None:
+            first_card_ms = elapsed_ms()
+        return True
+
+    yield {"type": "start", "request_id": request_id}
+
+    state = {
+        "input_query": query,
+        "messages": [{"role": "user", "content": query}],
+        "deadline": new_deadline(),
+    }
+    config = graph_config(request_id)
+    try:
+        with start_trace("chat.stream", request_id=request_id, query=query):
+            async for mode, chunk in get_graph().astream(
+                state, config=config, stream_mode=["updates", "messages", "custom"]
+            ):
+                if mode == "custom":
+                    if isinstance(chunk, dict) and "type" in chunk:
+                        if chunk["type"] != "card" or mark_card(chunk):
+                            yield chunk
+
+                elif mode == "messages":
+                    message, metadata = chunk
+                    node = metadata.get("langgraph_node")
+                    text = getattr(message, "content", "")
+                    if node in ANSWER_NODES and isinstance(text, str) and text:
+                        yield {"type": "token", "node": node, "text": text}
+
+                else:
+                    for node, update in chunk.items():
+                        yield {"type": "node", "node": node}
+                        if not isinstance(update, dict):
+                            continue
+                        if node == "enhancer":
+                            yield {"type": "normalized_query", "query": update.get("enhanced_query", "")}
+                            yield {"type": "filters", "filters": update.get("filters") or {}, "k": update.get("k")}
+                        results = update.get("retrieved_results") or []
+                        if results:
+                            result_count = len(results)
+                        for rank, hit in enumerate(results):
+                            event = card_event(hit, rank)
+                            if event and mark_card(event):
+                                yield event
+    except Exception as e:
+        yield {"type": "error", "message": str(e)}
+
+    yield {
+        "type": "done",
+        "request_id": request_id,
+        "result_count": result_count,
+        "first_card_ms": first_card_ms,
+        "elapsed_ms": elapsed_ms(),
+    }
+
+
+def sse_format(event: Dict[str, Any]) -> str:
+    """One Server-Sent Event frame (`event:` = the event type)."""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+async def sse_stream(query: str, request_id: Optional[str] = None) -> AsyncIterator[str]:
+    async for event in stream_chat(query, request_id):
+        yield sse_format(event)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    async def _main(query: str) -> int:
+        events = [event async for event in stream_chat(query)]
+        for event in events:
+            print(json.dumps(event, ensure_ascii=False, default=str))
+        failed = any(e["type"] == "error" for e in events) or events[-1]["type"] != "done"
+        return 1 if failed else 0
+
+    sys.exit(asyncio.run(_main(" ".join(sys.argv[1:]) or "fintech startups in bengaluru founded after 2015")))
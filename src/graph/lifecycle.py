@@ -0,0 +1,219 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/graph/lifecycle.py
+"""
+Application lifecycle: everything a worker needs is built BEFORE it takes traffic.
+
+Without this the first request after a deploy compiles the graph, loads MiniLM,
+connects to Qdrant and opens the LLM pools — seconds of cold start. The FastAPI
+lifespan hook starts `warm_up_until_ready()` in the background; `/ready` answers
+503 until every step below has succeeded (the load balancer keeps the worker
+out of rotation meanwhile), then 200:
+
+    1. graph       compile the shared graph once (`get_graph()`)
+    2. embeddings  load MiniLM and embed a dummy batch (first batch pays the kernel warm-up)
+    3. qdrant      connect and check the collection exists
+    4. llm         build the chat models / executors and their keep-alive pools
+    5. sessions    open the SQLite checkpointer and compile the session graph
+    6. companies   load the columnar company index behind `/get_companies`
+    7. canary      run a rule-answerable query through the graph; it must return hits
+
+A failed step is retried every `READINESS_RETRY_SECONDS` until it succeeds.
+
+✅ Usage:
+     app = FastAPI(lifespan=lifespan)
+     @app.get("/ready")
+     def ready(): return readiness_response()
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+
+# ─── Tunables ──────────────────────────────────────────────
+STARTUP_WARM_UP = os.getenv("STARTUP_WARM_UP", "1") != "0"
+CANARY_QUERY = os.getenv("CANARY_QUERY", "fintech startups in bengaluru founded after 2015")
+CANARY_MIN_RESULTS = int(os.getenv("CANARY_MIN_RESULTS", "1"))
+READINESS_RETRY_SECONDS = float(os.getenv("READINESS_RETRY_SECONDS", "10"))
+
+log = get_logger("lifecycle")
+
+_WARM_UP_TEXTS = ["warm-up", "fintech startups in bengaluru", "saas companies founded after 2015"]
+
+
+# ─── Warm-up steps ─────────────────────────────────────────
+def _compile_graph() -> None:
+    from graph.workflow import get_graph
+    get_graph()
+
+
+def _warm_embeddings() -> None:
+    from utils.embedding_loader import get_embedding_model, get_embedding_pool
+    model = get_embedding_model()
+    model.embed_documents(_WARM_UP_TEXTS)
+    model.embed_query(_WARM_UP_TEXTS[0])
+    # Start the async path's embedding pool threads too
+    get_embedding_pool().submit(model.embed_query, _WARM_UP_TEXTS[0]).result()
+
+
+def _open_qdrant() -> None:
+    from utils.qdrant_client_loader import get_async_qdrant_client, get_qdrant_client, get_qdrant_collection_name
+    get_qdrant_client().get_collection(get_qdrant_collection_name())
+    get_async_qdrant_client()
+    # Builds the shared QdrantSearchTool (and its client) used by the search agent
+    import tools.qdrant_tools_registry  # noqa: F401
+
+
+def _open_llm_pools() -> None:
+    from agents.agent_runtime import get_async_http_client, get_http_client, warm_up
+    get_http_client()
+    get_async_http_client()
+    warm_up()
+
+
+def _open_sessions() -> None:
+    from graph.sessions import get_session_store
+    get_session_store()
+
+
+def _load_companies() -> None:
+    from utils.company_index import get_company_index
+    get_company_index()
+
+
+def _run_canary() -> None:
+    from graph.workflow import check_graph
+
+    # Fails on a graph that does not terminate or never reaches the search node
+    state = check_graph(CANARY_QUERY, canary=True)
+    hits = state.get("retrieved_results") or []
+    if len(hits) < CANARY_MIN_RESULTS:
+        raise RuntimeError(f"Canary query returned {len(hits)} results (need {CANARY_MIN_RESULTS})")
+
+
+WARM_UP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("graph", _compile_graph),
+    ("embeddings", _warm_embeddings),
+    ("qdrant", _open_qdrant),
+    ("llm", _open_llm_pools),
+    ("sessions", _open_sessions),
+    ("companies", _load_companies),
+    ("canary", _run_canary),
+]
+
+
+# ─── Readiness ─────────────────────────────────────────────
+_DONE = ("ok", "skipped")
+
+
+class Readiness:
+    """Which warm-up steps have succeeded; ready once all of them have."""
+
+    def __init__(self, steps: List[str]):
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in steps}
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def mark(self, step: str, status: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._steps[step] = {"status": status, "seconds": round(seconds, 3)}
+            if error:
+                self._steps[step]["error"] = error
+            if all(s["status"] in _DONE for s in self._steps.values()):
+                self.ready_at = time.time()
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return [name for name, s in self._steps.items() if s["status"] not in _DONE]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "warm_up_seconds": round(self.ready_at - self.started_at, 3) if self.ready else None,
+                "steps": {name: dict(s) for name, s in self._steps.items()},
+            }
+
+
+# 🔁 Singleton readiness state
+_readiness: Optional[Readiness] = None
+
+
+def get_readiness() -> Readiness:
+    global _readiness
+
+    if _readiness is None:
+        _readiness = Readiness([name for name, _ in WARM_UP_STEPS])
+
+    return _readiness
+
+
+def warm_up_once() -> bool:
+    """Run every step that has not succeeded yet, in order; True once all are ok."""
+    readiness = get_readiness()
+    steps = dict(WARM_UP_STEPS)
+    for name in readiness.pending():
+        started = time.perf_counter()
+        try:
+            steps[name]()
+        except Exception as e:
+            readiness.mark(name, "failed", time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+            log.error("warm_up.failed", step=name, error=f"{type(e).__name__}: {e}")
+            # Later steps depend on the earlier ones (the canary needs all of them)
+            return False
+        readiness.mark(name, "ok", time.perf_counter() - started)
+        log.info("warm_up.ok", step=name, seconds=round(time.perf_counter() - started, 3))
+    return readiness.ready
+
+
+async def warm_up_until_ready() -> None:
+    """Warm up off the event loop, retrying failed steps until the worker is ready."""
+    while not await asyncio.to_thread(warm_up_once):
+        await asyncio.sleep(READINESS_RETRY_SECONDS)
+
+
+def readiness_response():
+    """`/ready`: 200 with the step report once warm, 503 before."""
+    from fastapi.responses import JSONResponse
+
+    snapshot = get_readiness().snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """FastAPI lifespan: warm up in the background, cancel it on shutdown."""
+    task = None
+    if STARTUP_WARM_UP:
+        task = asyncio.create_task(warm_up_until_ready())
+    else:
+        for name, _ in WARM_UP_STEPS:
+            get_readiness().mark(name, "skipped", 0.0)
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,176 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/graph/sessions.py
+"""
+Multi-turn chat sessions on a SQLite LangGraph checkpointer.
+
+Each `session_id` is a LangGraph thread: its AgentState (filters, last search,
+retained history) is checkpointed to `Data/artifacts/sessions.sqlite`, so a
+follow-up turn ("now only those founded after 2020") continues from it instead
+of starting empty — see `agents.session_refiner` for the merge / in-memory
+refinement.
+
+✅ Bounded:
+- TTL: sessions idle for `SESSION_TTL_SECONDS` are deleted
+- LRU: at most `SESSION_MAX_SESSIONS` sessions are kept, least recently used go first
+- Retention windows of the history channels (`schema.agent_state`)
+
+✅ Usage:
+     from graph.sessions import run_session_turn
+     run_session_turn("fintech startups in bengaluru", session_id="abc")
+     run_session_turn("now only those founded after 2020", session_id="abc")
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from agents.request_budget import new_deadline
+from graph.workflow import build_graph, graph_config
+from utils.logger import get_logger
+from utils.path_config import get_session_db_path
+
+
+# ─── Tunables ──────────────────────────────────────────────
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(24 * 3600)))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+
+log = get_logger("sessions")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    turns      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used);
+"""
+
+
+class SessionStore:
+    """SQLite checkpointer + session registry with TTL / LRU eviction."""
+
+    def __init__(self, path: str, ttl_seconds: float = SESSION_TTL_SECONDS,
+                 max_sessions: int = SESSION_MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.checkpointer = SqliteSaver(self._conn)
+        self.checkpointer.setup()
+        self.graph = build_graph(checkpointer=self.checkpointer)
+
+    def touch(self, session_id: str) -> None:
+        """Register a turn of `session_id`, then evict expired / least recently used sessions."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, created_at, last_used, turns) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_used = excluded.last_used, turns = turns + 1",
+                (session_id, now, now),
+            )
+        self.evict()
+
+    def evict(self) -> List[str]:
+        """Delete sessions past their TTL and the least recently used beyond the limit."""
+        with self._lock, self._conn:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE last_used < ?", (time.time() - self.ttl_seconds,)
+            )]
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            overflow = count - len(expired) - self.max_sessions
+            if overflow > 0:
+                expired += [row[0] for row in self._conn.execute(
+                    "SELECT session_id FROM sessions WHERE last_used >= ? ORDER BY last_used ASC LIMIT ?",
+                    (time.time() - self.ttl_seconds, overflow),
+                )]
+            self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in expired])
+        for session_id in expired:
+            self.checkpointer.delete_thread(session_id)
+        return expired
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self.checkpointer.delete_thread(session_id)
+
+
+# 🔁 Singleton session store
+_session_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    global _session_store
+
+    with _store_lock:
+        if _session_store is None:
+            _session_store = SessionStore(get_session_db_path())
+
+    return _session_store
+
+
+def turn_input(query: str) -> Dict[str, Any]:
+    """
+    State update that opens a new turn: the user message plus a reset of the
+    per-turn fields. Filters and the `session_*` fields of the previous search
+    stay in the checkpoint.
+    """
+    return {
+        "input_query": query,
+        "messages": [{"role": "user", "content": query}],
+        "deadline": new_deadline(),
+        "agent_name": None,
+        "enhanced_query": None,
+        "filters": None,
+        "k": None,
+        "retrieved_results": None,
+        "final_response": None,
+    }
+
+
+def session_config(session_id: str, request_id: Optional[str] = None):
+    """Graph config addressing the session's thread."""
+    config = graph_config(request_id, session_id=session_id)
+    config["configurable"] = {"thread_id": session_id}
+    return config
+
+
+def run_session_turn(query: str, session_id: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run one chat turn inside `session_id` and return the /chat response shape.
+    A failed graph run answers with an empty card list, like a /chat timeout.
+    """
+    store = get_session_store()
+    store.touch(session_id)
+    try:
+        state = store.graph.invoke(turn_input(query), config=session_config(session_id, request_id))
+    except Exception as e:
+        log.error("sessions.turn_failed", session_id=session_id, error=f"{type(e).__name__}: {e}")
+        return {"type": "card", "session_id": session_id, "payload": []}
+    return {
+        "type": "card",
+        "session_id": session_id,
+        "payload": state.get("retrieved_results") or [],
+        "filters": state.get("session_filters"),
+    }
@@ -23,8 +23,13 @@ from agents.supervisor_agent import supervisor_node
 from agents.enhancer_agent import enhancer_node
 from agents.qdrant_search_agent import quadrant_search_node
 from schema.agent_state import AgentState
+from agents.agent_runtime import invocation_config
+from utils.metrics import timed
 
-def build_graph():
+# Hard cap on node executions per run (supervisor ↔ enhancer cannot loop forever)
+GRAPH_RECURSION_LIMIT = int(os.getenv("GRAPH_RECURSION_LIMIT", "10"))
+
+def build_graph(checkpointer=None):
     """
     Constructs and compiles the LangGraph workflow:
 
@@ -36,27 +41,83 @@ def build_graph():
         │       └─────────────┘
         └──> quadrant_search_node -> END
 
+    Args:
+        checkpointer: optional LangGraph checkpointer (multi-turn sessions,
+            see graph.sessions); state is then persisted per thread_id.
+
     Returns:
         A compiled graph ready to invoke or stream.
     """
     builder = StateGraph(state_schema=AgentState)
 
-    # Register each node
-    builder.add_node("supervisor", supervisor_node)
-    builder.add_node("enhancer", enhancer_node)
-    builder.add_node("qdrant_search", quadrant_search_node)
+    # Register each node (timed: per-node latency histograms, see utils.metrics)
+    builder.add_node("supervisor", timed("node", "supervisor")(supervisor_node))
+    builder.add_node("enhancer", timed("node", "enhancer")(enhancer_node))
+    builder.add_node("qdrant_search", timed("node", "qdrant_search")(quadrant_search_node))
 
     # Define where execution begins
     builder.set_entry_point("supervisor")
 
-    # Static edges for validation (dynamic goto inside supervisor handles actual flow)
+    # No static edges between the nodes: LangGraph follows them IN ADDITION to
+    # Command(goto=...), so supervisor ↔ enhancer would trigger each other until
+    # the recursion limit. The nodes' Command[Literal[...]] annotations declare
+    # the possible hops.
     builder.add_edge(START, "supervisor")
-    builder.add_edge("supervisor", "enhancer")
-    builder.add_edge("enhancer", "supervisor")
-    #builder.add_edge("supervisor", "qdrant_search")
 
     # Mark the end node
     builder.set_finish_point("qdrant_search")
 
     # Compile into an executable graph
-    return builder.compile()
\ No newline at end of file
+    return builder.compile(checkpointer=checkpointer)
+
+
+# 🔁 Singleton compiled graph
+_graph = None
+
+
+def get_graph():
+    """
+    Returns the compiled workflow, built on first use and shared by every
+    request (compiled graphs keep no per-run state).
+    """
+    global _graph
+
+    if _graph is None:
+        _graph = build_graph()
+
+    return _graph
+
+
+def graph_config(request_id=None, **metadata):
+    """Per-run config for the compiled graph: request metadata + recursion limit."""
+    config = invocation_config(request_id, agent="graph", **metadata)
+    config["recursion_limit"] = GRAPH_RECURSION_LIMIT
+    return config
+
+
+def check_graph(query: str, **metadata):
+    """
+    Run `query` through `get_graph().invoke` and verify the run terminated in
+    the search node (raises RuntimeError otherwise); returns the final state.
+    Used by the startup canary (graph.lifecycle) and the CLI below.
+    """
+    from agents.request_budget import new_deadline
+
+    state = get_graph().invoke(
+        {
+            "input_query": query,
+            "messages": [{"role": "user", "content": query}],
+            "deadline": new_deadline(),
+        },
+        config=graph_config(**metadata),
+    )
+    if state.get("agent_name") != "qdrant_search":
+        raise RuntimeError(f"Graph run ended in {state.get('agent_name')!r} without searching")
+    return state
+
+
+# For CLI testing: a rule-answerable query must finish (no recursion-limit error)
+if __name__ == "__main__":
+    query = " ".join(sys.argv[1:]) or "fintech startups in bengaluru founded after 2015"
+    final = check_graph(query, check=True)
+    print(f"✅ Graph finished: {len(final.get('retrieved_results') or [])} results")
@@ -16,51 +16,214 @@ else:
     print(f"🔁 SRC path already in sys.path: {SRC_PATH}")
 
 # main.py
-from agents.enhancer_agent import enhancer_agent
-from agents.qdrant_search_agent import qdrant_search_agent
-from tools.enhancer_tools_registry import enhancer_tools
-from tools.qdrant_tools_registry import qdrant_tools
-from langchain.agents import AgentExecutor
-from typing import Dict, Any
-
-def run_enhancer_agent(query: str) -> Dict[str, Any]:
-    # Enhancer agent setup
-    enhancer_executor = AgentExecutor(
-        agent=enhancer_agent,
-        tools=enhancer_tools,
-        verbose=False,
-        handle_parsing_errors=True,
-    )
-
-    enhanced_query = enhancer_executor.invoke({"input": query})
-    payload = enhanced_query.get("output", {})
-
-    # Extract field
-    
-    query   = payload.get("query", query)
-    filters = payload.get("filters", None)
-    k       = payload.get("k", 5)
-
-    # Qdrant agent setup
-    qdrant_executor = AgentExecutor(
-        agent=qdrant_search_agent,
-        tools=qdrant_tools,
-        verbose=False,
-        handle_parsing_errors=True,
-        max_iterations=3
-    )
-
-    result = qdrant_executor.invoke({
-        "input": query,
-        "filters": filters,
-        "k": k,
-    })
+from agents.enhancer_agent import enhancer_payload
+from agents.agent_runtime import get_enhancer_executor, get_qdrant_executor, invocation_config
+from agents.enhancer_pipeline import RuleEnhancement, run_rule_enhancer
+from agents.speculative_search import SPECULATIVE_SEARCH, AsyncSpeculativeSearch, SpeculativeSearch
+from agents.search_pipeline import (
+    arun_direct_search, needs_post_processing, run_direct_search, search_agent_input, search_key
+)
+from agents.request_budget import (
+    DeadlineExceeded, arun_with_deadline, call_timeout, new_deadline, plan_degradation, run_with_deadline
+)
+from utils.enhancer_cache import cache_key, get_enhancer_cache
+from utils.single_flight import CoalesceTimeout, get_single_flight
+from utils.tracing import set_attributes
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import uuid
+from functools import partial
 
+# ─── Shared steps ──────────────────────────────────────────
+# The sync and async pipelines below differ only in how they wait (threads vs
+# the event loop); every decision is made by these helpers.
+
+def _start_request(request_id: Optional[str], deadline: Optional[float]) -> Tuple[str, float]:
+    """Request id (tagged on the trace) and the latency budget every stage degrades against."""
+    request_id = request_id or uuid.uuid4().hex
+    set_attributes(request_id=request_id)
+    return request_id, deadline or new_deadline()
+
+
+def _speculation(factory, query: str, rule_result: RuleEnhancement):
+    """Search the raw query (with the rule filters) while the agent thinks."""
+    if not SPECULATIVE_SEARCH:
+        return None
+    return factory(query, rule_result.output.filters, rule_result.output.k)
+
+
+def _payload_without_agent(rule_result: RuleEnhancement, cached, deadline: float) -> Optional[Dict[str, Any]]:
+    """Cached enhancement, or the rule output when the budget cannot afford the agent; None → run it."""
+    if cached is not None:
+        return cached.model_dump()
+    if plan_degradation(deadline).skip_llm_enhancer:
+        return rule_result.output.model_dump()
+    return None
+
+
+def _enhancer_request(query: str, request_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Input and kwargs of the enhancer executor call."""
+    return {"input": query}, {"config": invocation_config(request_id, agent="enhancer")}
+
+
+def _search_request(payload: Dict[str, Any], query: str, deadline: float) -> Dict[str, Any]:
+    """Enhancer payload → {query, filters, k}, k capped when the budget is short."""
+    return {
+        "query":   payload.get("query", query),
+        "filters": payload.get("filters", None),
+        "k":       plan_degradation(deadline).cap_k(payload.get("k", 5)),
+    }
+
+
+def _wants_search_agent(question: str, deadline: float) -> bool:
+    """The search agent (LLM) only for compare / summarise requests the budget can afford."""
+    return needs_post_processing(question) and not plan_degradation(deadline).skip_post_processing
+
+
+def _search_agent_request(search: Dict[str, Any], question: str,
+                          request_id: str) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """Single-flight key, input and kwargs of the search agent call (direct searches coalesce in run_direct_search)."""
+    agent_input = {"input": search_agent_input(question, search)}
+    key = f"agent:{search_key(search)}:{question}"
+    return key, agent_input, {"config": invocation_config(request_id, agent="qdrant_search")}
+
+
+def _card(output: Any) -> Dict[str, Any]:
     return {
         "type": "card",
-        "payload": result["output"]
+        "payload": output
     }
 
+
+# ─── Sync pipeline ─────────────────────────────────────────
+def run_enhancer_agent(query: str, request_id: Optional[str] = None,
+                       deadline: Optional[float] = None) -> Dict[str, Any]:
+    # Shared executors (built once per process); only the config is per request
+    request_id, deadline = _start_request(request_id, deadline)
+    question = query
+
+    # Rule-based fast path: extract + compose filters in-process, no LLM round trips
+    rule_result = run_rule_enhancer(query)
+    payload = rule_result.output.model_dump()
+    speculation = None
+
+    if rule_result.needs_agent:
+        speculation = _speculation(SpeculativeSearch, query, rule_result)
+        # Persistent exact / semantic cache in front of the (slow) agent run
+        cache = get_enhancer_cache()
+
+        def enhance() -> Dict[str, Any]:
+            shortcut = _payload_without_agent(rule_result, cache.get(query) if cache else None, deadline)
+            if shortcut is not None:
+                return shortcut
+            agent_input, kwargs = _enhancer_request(query, request_id)
+            try:
+                enhanced_query = run_with_deadline(get_enhancer_executor().invoke, deadline, agent_input, **kwargs)
+            except DeadlineExceeded:
+                enhanced_query = {}
+            agent_payload, enhanced = enhancer_payload(enhanced_query, rule_result.output)
+            if cache and enhanced is not None:
+                cache.put(query, enhanced)
+            return agent_payload
+
+        # Identical queries in flight share one cache lookup / agent run
+        try:
+            payload = get_single_flight("enhancer").do(cache_key(query), enhance, timeout=call_timeout(deadline))
+        except CoalesceTimeout:
+            pass
+
+    search = _search_request(payload, query, deadline)
+
+    def run_search():
+        if not _wants_search_agent(question, deadline):
+            return run_direct_search(search)
+        key, agent_input, kwargs = _search_agent_request(search, question, request_id)
+
+        def post_process():
+            return get_qdrant_executor().invoke(agent_input, **kwargs)["output"]
+
+        return get_single_flight("search").do(key, post_process, timeout=call_timeout(deadline))
+
+    try:
+        if speculation is not None:
+            # The callback runs on the search pool: it needs its own deadline scope
+            output, _ = speculation.resolve(search["query"], search["filters"], search["k"],
+                                            partial(run_with_deadline, run_search, deadline),
+                                            timeout=call_timeout(deadline))
+        else:
+            output = run_with_deadline(run_search, deadline)
+    except TimeoutError:
+        # Partial result: nothing found within the budget (DeadlineExceeded included)
+        output = []
+
+    return _card(output)
+
+
+# ─── Async pipeline ────────────────────────────────────────
+async def arun_enhancer_agent(query: str, request_id: Optional[str] = None,
+                              deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Async twin of `run_enhancer_agent` for the API: nothing blocks the event
+    loop. LLM agents run with `ainvoke` (pooled async HTTP client), Qdrant via
+    `AsyncQdrantClient`, embedding on its bounded pool and the rule extractors /
+    SQLite cache on worker threads — one worker serves many chats at once.
+    """
+    request_id, deadline = _start_request(request_id, deadline)
+    question = query
+
+    # CPU-bound extractors: off the loop
+    rule_result = await asyncio.to_thread(run_rule_enhancer, query)
+    payload = rule_result.output.model_dump()
+    speculation = None
+
+    if rule_result.needs_agent:
+        speculation = _speculation(AsyncSpeculativeSearch, query, rule_result)
+        cache = get_enhancer_cache()
+
+        async def enhance() -> Dict[str, Any]:
+            cached = await asyncio.to_thread(cache.get, query) if cache else None
+            shortcut = _payload_without_agent(rule_result, cached, deadline)
+            if shortcut is not None:
+                return shortcut
+            agent_input, kwargs = _enhancer_request(query, request_id)
+            try:
+                enhanced_query = await arun_with_deadline(get_enhancer_executor().ainvoke, deadline, agent_input, **kwargs)
+            except DeadlineExceeded:
+                enhanced_query = {}
+            agent_payload, enhanced = enhancer_payload(enhanced_query, rule_result.output)
+            if cache and enhanced is not None:
+                await asyncio.to_thread(cache.put, query, enhanced)
+            return agent_payload
+
+        try:
+            payload = await get_single_flight("enhancer").ado(cache_key(query), enhance, timeout=call_timeout(deadline))
+        except CoalesceTimeout:
+            pass
+
+    search = _search_request(payload, query, deadline)
+
+    async def run_search():
+        if not _wants_search_agent(question, deadline):
+            return await arun_direct_search(search)
+        key, agent_input, kwargs = _search_agent_request(search, question, request_id)
+
+        async def post_process():
+            return (await get_qdrant_executor().ainvoke(agent_input, **kwargs))["output"]
+
+        return await get_single_flight("search").ado(key, post_process, timeout=call_timeout(deadline))
+
+    try:
+        if speculation is not None:
+            output, _ = await speculation.aresolve(search["query"], search["filters"], search["k"],
+                                                   partial(arun_with_deadline, run_search, deadline),
+                                                   timeout=call_timeout(deadline))
+        else:
+            output = await arun_with_deadline(run_search, deadline)
+    except TimeoutError:
+        output = []
+
+    return _card(output)
+
 # For CLI testing
 if __name__ == "__main__":
     import sys, json
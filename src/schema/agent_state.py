@@ -1,16 +1,111 @@
-from typing import TypedDict, List, Dict, Optional
+import os
+from collections import deque
+from typing import Annotated, Any, Callable, Deque, Iterable, TypedDict, List, Dict, Optional
+
+# Retention windows of the append-only channels (newest entries kept)
+MESSAGE_RETENTION = int(os.getenv("AGENT_MESSAGE_RETENTION", "40"))
+LOG_RETENTION = int(os.getenv("AGENT_LOG_RETENTION", "100"))
+# Rolling summary of the entries that fell out of a window
+SUMMARY_MAX_CHARS = int(os.getenv("AGENT_SUMMARY_MAX_CHARS", "1500"))
+SUMMARY_ENTRY_CHARS = 120
+
+SUMMARY_ROLE = "summary"
+_LOG_SUMMARY_PREFIX = "summary: "
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _entry_text(entry: Any) -> str:
+    if isinstance(entry, dict):
+        role, content = entry.get("role"), entry.get("content")
+    else:
+        # HumanMessage(name=...) as appended by the supervisor node
+        role, content = getattr(entry, "name", None), getattr(entry, "content", entry)
+    text = _clip(content or "", SUMMARY_ENTRY_CHARS)
+    return f"{role}: {text}" if role else text
+
+
+def _fold(previous: str, evicted: Iterable[Any]) -> str:
+    """Previous summary + one clipped line per evicted entry, oldest text dropped beyond SUMMARY_MAX_CHARS."""
+    text = " | ".join(part for part in [previous, *map(_entry_text, evicted)] if part)
+    return text if len(text) <= SUMMARY_MAX_CHARS else "…" + text[-(SUMMARY_MAX_CHARS - 1):]
+
+
+def _message_summary(previous: Optional[Any], evicted: List[Any]) -> Dict[str, str]:
+    return {"role": SUMMARY_ROLE, "content": _fold(previous["content"] if previous else "", evicted)}
+
+
+def _log_summary(previous: Optional[Any], evicted: List[Any]) -> str:
+    return _LOG_SUMMARY_PREFIX + _fold(previous[len(_LOG_SUMMARY_PREFIX):] if previous else "", evicted)
+
+
+def _is_summary(entry: Any) -> bool:
+    if isinstance(entry, dict):
+        return entry.get("role") == SUMMARY_ROLE
+    return isinstance(entry, str) and entry.startswith(_LOG_SUMMARY_PREFIX)
+
+
+def history_summary(entries: Optional[Iterable[Any]]) -> str:
+    """Rolling summary of what a channel has evicted so far ("" when nothing was)."""
+    for entry in entries or ():
+        if _is_summary(entry):
+            return entry["content"] if isinstance(entry, dict) else entry[len(_LOG_SUMMARY_PREFIX):]
+        break
+    return ""
+
+
+def _append(existing: Optional[Iterable[Any]], new: Any, limit: int,
+            summarize: Callable[[Optional[Any], List[Any]], Any]) -> Deque[Any]:
+    if new is None:
+        return existing if isinstance(existing, deque) else deque(existing or ())
+    # Always a new deque: the channel's current value may still be referenced by
+    # a checkpoint the saver has not serialized yet (checkpoints copy channel
+    # values shallowly), so it is never mutated. The copy is bounded by `limit`.
+    window = deque(existing or ())
+    window.extend(new if isinstance(new, list) else [new])
+    if limit > 0 and len(window) > limit:
+        # Oldest entries beyond the window are folded into a summary kept in slot 0
+        previous = window.popleft() if _is_summary(window[0]) else None
+        evicted = [window.popleft() for _ in range(len(window) - (limit - 1))]
+        window.appendleft(summarize(previous, evicted))
+    return window
+
+
+def append_messages(existing: Optional[Iterable[Any]], new: Any) -> Deque[Any]:
+    """Reducer: nodes return only their NEW messages; keeps a summary + the last MESSAGE_RETENTION - 1."""
+    return _append(existing, new, MESSAGE_RETENTION, _message_summary)
+
+
+def append_log(existing: Optional[Iterable[Any]], new: Any) -> Deque[Any]:
+    """Reducer for actions / observations; keeps a summary + the last LOG_RETENTION - 1 entries."""
+    return _append(existing, new, LOG_RETENTION, _log_summary)
+
 
 class AgentState(TypedDict, total=False):
-    """Shared memory state for LangGraph agents."""
+    """Shared memory state for LangGraph agents.
+
+    `messages`, `actions` and `observations` are append-only channels: a node
+    returns just the entries it adds and the reducer appends them, keeping a
+    bounded retention window whose first entry summarizes what was evicted.
+    """
 
     input_query: str
     enhanced_query: Optional[str]
     filters: Optional[dict]
     k: Optional[int]
-    actions: Optional[List[str]]
-    observations: Optional[List[str]]
-    messages: List[dict] 
+    actions: Annotated[List[str], append_log]
+    observations: Annotated[List[str], append_log]
+    messages: Annotated[List[Any], append_messages]
     final_response: Optional[str]
     agent_name: Optional[str]
     tools_Calls: Optional[List[Dict[str, str]]]
-    tools_results: Optional[List[Dict[str, str]]]
\ No newline at end of file
+    tools_results: Optional[List[Dict[str, str]]]
+    retrieved_results: Optional[List[dict]]
+    deadline: Optional[float]
+    # Last search of a multi-turn session (kept across turns by the checkpointer)
+    session_query: Optional[str]
+    session_filters: Optional[dict]
+    session_results: Optional[List[dict]]
\ No newline at end of file
@@ -0,0 +1,49 @@
+# src/schema/company_schema.py
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+from utils.currency import format_inr_amount
+
+
+def payload_key(field: str) -> str:
+    """Dataset column / payload field → snake_case payload key
+    ("Company Description (Short)" → "company_description_short")."""
+    return re.sub(r"[^a-z0-9]+", "_", field.lower()).strip("_")
+
+
+# ────────────────────────────────────
+# Company card (Flutter UI)
+# ────────────────────────────────────
+class Company(BaseModel):
+    """One company card as rendered by the Flutter client."""
+    name: str = Field(..., description="Company name")
+    location: str | None = Field(None, description="'<city>, <state>'")
+    sector: str | None = Field(None, description="Industry sector")
+    funding: str | None = Field(None, description="Total funding raised, as in the dataset (e.g. '₹457 Cr')")
+    founded_year: int | None = Field(None, description="Year founded")
+    description: str | None = Field(None, description="Short company description")
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "Company":
+        """Project a Qdrant payload / dataset row (either key style) onto the card."""
+        row = {payload_key(key): value for key, value in payload.items() if value is not None}
+        location = ", ".join(str(row[key]) for key in ("headquarters_city", "state") if row.get(key))
+        year = row.get("year_founded")
+        return cls(
+            name=str(row.get("company_name", "")),
+            location=location or None,
+            sector=row.get("industry_sector"),
+            funding=format_inr_amount(row.get("total_funding_raised_inr")),
+            founded_year=int(year) if isinstance(year, (int, float)) or str(year).isdigit() else None,
+            description=row.get("company_description_short"),
+        )
+
+
+class CompanyCardResponse(BaseModel):
+    """Chat reply carrying company cards."""
+    type: str = Field("company_cards", description="Response kind")
+    payload: List[Company] = Field(default_factory=list)
@@ -0,0 +1 @@
+# Enhancer agent tools: keyword, numeric and filter helpers
\ No newline at end of file
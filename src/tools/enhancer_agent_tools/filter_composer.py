@@ -0,0 +1,49 @@
+# src/tools/enhancer_agent_tools/filter_composer.py
+
+"""
+Filter composer: merge the outputs of the enhancer extractors into one filter dict.
+
+✅ Merge rules:
+- Keyword fields  → union of the matched values (order preserved, no duplicates)
+- Range fields    → tightest bound wins (max of `gte`, min of `lte`)
+- Anything else   → the last tool to set the field wins
+
+✅ Usage:
+     from tools.enhancer_agent_tools.filter_composer import compose_filters
+     compose_filters({"state": ["karnataka"]}, {"year_founded": {"gte": 2015}})
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def _merge_ranges(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(old)
+    if new.get("gte") is not None:
+        merged["gte"] = new["gte"] if merged.get("gte") is None else max(merged["gte"], new["gte"])
+    if new.get("lte") is not None:
+        merged["lte"] = new["lte"] if merged.get("lte") is None else min(merged["lte"], new["lte"])
+    return merged
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def compose_filters(*filter_dicts: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge any number of `{field: value}` dicts into a single filters object.
+    `None` / empty dicts are skipped so tools that found nothing can be passed as-is.
+    """
+    merged: Dict[str, Any] = {}
+    for filters in filter_dicts:
+        for field, value in (filters or {}).items():
+            if value is None or value == [] or value == {}:
+                continue
+            current = merged.get(field)
+            if isinstance(value, dict):
+                merged[field] = _merge_ranges(current, value) if isinstance(current, dict) else dict(value)
+            elif current is None or isinstance(current, dict):
+                merged[field] = _as_list(value)
+            else:
+                merged[field] = current + [v for v in _as_list(value) if v not in current]
+    return merged
@@ -0,0 +1,349 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), "..", ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/tools/enhancer_agent_tools/keyword_extractor.py
+"""
+Keyword extractor backed by an Aho-Corasick automaton.
+
+The vocabulary is mined at ingest time from the distinct values of the keyword
+fields in `PAYLOAD_SCHEMA` (cities, states, sectors, tech stack, investors,
+product categories, …) plus a table of synonyms that map to the canonical,
+lower-cased value stored in the Qdrant payload (e.g. "bangalore" → "bengaluru").
+
+Every field is matched in ONE left-to-right pass over the query, so extraction
+stays O(len(query) + matches) no matter how many investor / company names the
+vocabulary grows to.
+
+✅ Build (run once per ingest, also done lazily on first use):
+     python tools/enhancer_agent_tools/keyword_extractor.py --build
+
+✅ Usage:
+     from tools.enhancer_agent_tools.keyword_extractor import keyword_extractor_fn
+     keyword_extractor_fn("fintech startups in bangalore using aws")
+     # → {"headquarters_city": ["bengaluru"], "industry_sector": ["fintech"], "tech_stack": ["aws"]}
+"""
+
+import pickle
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.path_config import get_data_path, get_keyword_automaton_path
+
+
+# ─── Fields mined from the dataset ─────────────────────────
+# CSV column → (payload field, multi-valued separator or None)
+# Lead investors keep their commas ("Garcia, White and Andrews" is one firm).
+KEYWORD_FIELDS: Dict[str, Tuple[str, Optional[str]]] = {
+    "Headquarters City": ("headquarters_city", None),
+    "State": ("state", None),
+    "Industry Sector": ("industry_sector", None),
+    "Product Categories": ("product_categories", ","),
+    "Tech Stack": ("tech_stack", ","),
+    "Target Market": ("target_market", None),
+    "Latest Funding Round Type": ("latest_funding_round_type", None),
+    "Hiring Status": ("hiring_status", None),
+    "Lead Investors": ("lead_investors", None),
+}
+
+# When one surface form is a value of several fields ("delhi" is a city and a
+# state, "saas" a sector and a product category) only the first field wins.
+FIELD_PRIORITY: List[str] = [
+    "headquarters_city", "state", "industry_sector", "product_categories",
+    "tech_stack", "target_market", "latest_funding_round_type", "hiring_status",
+    "lead_investors",
+]
+
+# ─── Synonyms → canonical payload value ───────────────────
+# Only aliases that mean the value on their own: plain English words that merely
+# relate to it ("payments", "delivery", "hiring", "node") would add filters to
+# ordinary queries.
+SYNONYMS: Dict[Tuple[str, str], List[str]] = {
+    # 🌍 Locations
+    ("headquarters_city", "bengaluru"): ["bangalore", "blr", "bengaluru city", "bangaluru"],
+    ("headquarters_city", "mumbai"): ["bombay"],
+    ("headquarters_city", "chennai"): ["madras"],
+    ("headquarters_city", "kolkata"): ["calcutta"],
+    ("headquarters_city", "delhi"): ["new delhi", "delhi ncr"],
+    ("headquarters_city", "hyderabad"): ["hyd", "cyberabad"],
+    ("headquarters_city", "ahmedabad"): ["amdavad"],
+    ("state", "tamil nadu"): ["tamilnadu"],
+    ("state", "west bengal"): ["westbengal"],
+    ("state", "uttar pradesh"): ["uttarpradesh"],
+    # 🏭 Industries
+    ("industry_sector", "fintech"): ["fin tech", "financial technology", "neobank", "neobanks"],
+    ("industry_sector", "healthtech"): ["health tech", "healthcare", "health care", "medtech", "healthtech"],
+    ("industry_sector", "edtech"): ["ed tech", "education", "edutech", "e-learning", "elearning"],
+    ("industry_sector", "agritech"): ["agri tech", "agtech", "agriculture", "farming"],
+    ("industry_sector", "e-commerce"): ["ecommerce", "e commerce", "online retail", "online shopping"],
+    ("industry_sector", "saas"): ["software as a service"],
+    ("industry_sector", "logistics"): ["supply chain", "logistics tech"],
+    # 📦 Products & markets
+    ("product_categories", "d2c"): ["dtc", "direct to consumer"],
+    ("product_categories", "b2b"): ["business to business"],
+    ("target_market", "smbs"): ["smb", "sme", "smes", "msme", "msmes", "small businesses"],
+    ("target_market", "enterprises"): ["enterprise", "large enterprises"],
+    ("target_market", "consumers"): ["consumer", "b2c"],
+    # 🧰 Tech stack
+    ("tech_stack", "node.js"): ["nodejs", "node js"],
+    ("tech_stack", "spring boot"): ["springboot"],
+    ("tech_stack", "aws"): ["amazon web services"],
+    ("tech_stack", "gcp"): ["google cloud", "google cloud platform"],
+    ("tech_stack", "azure"): ["microsoft azure"],
+    ("tech_stack", "mongodb"): ["mongo"],
+    ("tech_stack", "react"): ["reactjs", "react.js"],
+    # 💰 Funding stage
+    ("latest_funding_round_type", "pre-seed"): ["preseed", "pre seed"],
+    ("latest_funding_round_type", "series a"): ["series-a"],
+    ("latest_funding_round_type", "series b"): ["series-b"],
+    ("latest_funding_round_type", "series c"): ["series-c"],
+    # 👥 Hiring
+    ("hiring_status", "actively hiring"): ["currently hiring", "open roles"],
+    ("hiring_status", "hiring freeze"): ["not hiring"],
+}
+
+_ARTIFACT_VERSION = 2
+_NON_TEXT = re.compile(r"[^a-z0-9.+#&\- ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case, drop punctuation the vocabulary never uses, collapse spaces."""
+    return _SPACES.sub(" ", _NON_TEXT.sub(" ", str(text).lower())).strip()
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """One vocabulary hit inside the (normalized) query."""
+    field: str
+    value: str      # canonical payload value
+    surface: str    # text as it appeared in the query
+    start: int
+    end: int
+
+
+class KeywordAutomaton:
+    """
+    Minimal Aho-Corasick automaton over characters.
+
+    State is kept in plain lists/dicts so the whole automaton pickles to a
+    compact artifact and loads with a single `pickle.load`.
+    """
+
+    def __init__(self) -> None:
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[int, ...]] = [()]
+        # pattern id → (length, field, canonical value)
+        self.patterns: List[Tuple[int, str, str]] = []
+        self._index: Dict[str, int] = {}
+
+    # ── Build ───────────────────────────────────────────────
+    def add(self, surface: str, field: str, value: str) -> None:
+        surface = normalize_text(surface)
+        if not surface:
+            return
+        if surface in self._index:
+            # Keep the higher-priority field for ambiguous surface forms
+            _, old_field, _ = self.patterns[self._index[surface]]
+            if FIELD_PRIORITY.index(field) >= FIELD_PRIORITY.index(old_field):
+                return
+            self.patterns[self._index[surface]] = (len(surface), field, value)
+            return
+
+        node = 0
+        for ch in surface:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        self._index[surface] = len(self.patterns)
+        self.out[node] = (len(self.patterns),)
+        self.patterns.append((len(surface), field, value))
+
+    def finalize(self) -> "KeywordAutomaton":
+        """Compute failure links (BFS) and merge outputs along them."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+        return self
+
+    # ── Match ───────────────────────────────────────────────
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """Yield (start, end, pattern_id) for every hit, in one pass over `text`."""
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                end = i + 1
+                yield end - patterns[pid][0], end, pid
+
+    # ── Persistence ─────────────────────────────────────────
+    def to_state(self) -> dict:
+        return {
+            "version": _ARTIFACT_VERSION,
+            "goto": self.goto,
+            "fail": self.fail,
+            "out": self.out,
+            "patterns": self.patterns,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "KeywordAutomaton":
+        automaton = cls()
+        automaton.goto = state["goto"]
+        automaton.fail = state["fail"]
+        automaton.out = state["out"]
+        automaton.patterns = state["patterns"]
+        return automaton
+
+
+def _is_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+def _iter_vocabulary(df) -> Iterable[Tuple[str, str, str]]:
+    """Yield (surface, field, canonical value) from the dataset + synonyms."""
+    for column, (field, separator) in KEYWORD_FIELDS.items():
+        if column not in df.columns:
+            continue
+        for raw in df[column].dropna().unique():
+            parts = str(raw).split(separator) if separator else [str(raw)]
+            for part in parts:
+                value = part.strip().lower()
+                if value:
+                    yield value, field, value
+    for (field, value), aliases in SYNONYMS.items():
+        for alias in aliases:
+            yield alias, field, value
+
+
+def build_keyword_automaton(df=None, save: bool = True) -> KeywordAutomaton:
+    """
+    Build the automaton from the dataset (pass the ingest DataFrame to reuse it)
+    and persist it next to the other build artifacts.
+    """
+    if df is None:
+        import pandas as pd
+        df = pd.read_csv(get_data_path())
+
+    automaton = KeywordAutomaton()
+    for surface, field, value in _iter_vocabulary(df):
+        automaton.add(surface, field, value)
+    automaton.finalize()
+
+    if save:
+        path = get_keyword_automaton_path()
+        with open(path, "wb") as fh:
+            pickle.dump(automaton.to_state(), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"✅ Keyword automaton saved: {len(automaton.patterns)} patterns → {path}")
+    return automaton
+
+
+# 🔁 Singleton automaton instance
+_automaton: Optional[KeywordAutomaton] = None
+
+
+def get_keyword_automaton() -> KeywordAutomaton:
+    """
+    Returns the cached automaton, loading the persisted artifact or building
+    it from the dataset when the artifact is missing / stale.
+    """
+    global _automaton
+
+    if _automaton is None:
+        path = get_keyword_automaton_path()
+        state = None
+        if os.path.exists(path):
+            with open(path, "rb") as fh:
+                state = pickle.load(fh)
+        if state and state.get("version") == _ARTIFACT_VERSION:
+            _automaton = KeywordAutomaton.from_state(state)
+        else:
+            _automaton = build_keyword_automaton()
+
+    return _automaton
+
+
+def extract_keyword_matches(query: str) -> List[KeywordMatch]:
+    """
+    Leftmost-longest, non-overlapping, whole-word vocabulary hits in `query`.
+    Offsets refer to `normalize_text(query)`.
+    """
+    automaton = get_keyword_automaton()
+    text = normalize_text(query)
+
+    hits = [
+        (start, end, pid)
+        for start, end, pid in automaton.iter_matches(text)
+        if _is_boundary(text, start, end)
+    ]
+    hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+
+    matches: List[KeywordMatch] = []
+    last_end = 0
+    for start, end, pid in hits:
+        if start < last_end:
+            continue
+        _, field, value = automaton.patterns[pid]
+        matches.append(KeywordMatch(field, value, text[start:end], start, end))
+        last_end = end
+    return matches
+
+
+def group_keyword_matches(matches: Iterable[KeywordMatch]) -> Dict[str, List[str]]:
+    """Collapse matches into the `{field: [values]}` shape of `KeywordExtractOutput`."""
+    grouped: Dict[str, List[str]] = {}
+    for m in matches:
+        values = grouped.setdefault(m.field, [])
+        if m.value not in values:
+            values.append(m.value)
+    return grouped
+
+
+def keyword_extractor_fn(query: str) -> Dict[str, List[str]]:
+    """
+    Extract payload-field keywords from a user query.
+    Returns a dict mapping each detected field to its canonical values.
+    """
+    return group_keyword_matches(extract_keyword_matches(query))
+
+
+# For CLI testing / ingest
+if __name__ == "__main__":
+    import json
+    if "--build" in sys.argv:
+        build_keyword_automaton()
+    else:
+        query = " ".join(sys.argv[1:]) or "fintech startups in bangalore using aws with series a funding"
+        print(json.dumps(keyword_extractor_fn(query), indent=2))
@@ -0,0 +1,397 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), "..", ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/tools/enhancer_agent_tools/numeric_extractor.py
+"""
+Numeric-constraint extractor: one precompiled grammar, no LLM.
+
+Turns phrases like "raised over 50 cr", "between 2015 and 2020",
+"less than 100 employees" or "$5 million" into `{field: {gte, lte}}`
+(the shape of `NumericConstraintOutput`).
+
+✅ How it works:
+- `_PHRASE` (a single compiled regex) finds every constraint phrase:
+  ranges, comparator + amount, amount + trailing comparator, bare amounts
+- Amounts are normalized to the integer units stored at ingest: whole rupees
+  for money fields (crore / lakh / million / billion, ₹ / $ with `USD_TO_INR`),
+  plain integers for counts and years, percent for growth
+- The field is resolved from the nearest compatible cue word ("raised",
+  "revenue", "employees", "founded", …) on the left, then on the right,
+  without crossing another constraint phrase
+- Strict comparators on integer fields are made inclusive
+  ("more than 100 employees" → gte 101, "after 2015" → gte 2016)
+
+✅ Usage:
+     from tools.enhancer_agent_tools.numeric_extractor import extract_numeric_constraints
+     extract_numeric_constraints("fintechs that raised over 50 cr founded after 2015")
+     # → {"total_funding_raised_inr": {"gte": 500000000}, "year_founded": {"gte": 2016}}
+
+✅ Corpus + micro-benchmark:
+     python tools/enhancer_agent_tools/numeric_extractor.py --check
+     python tools/enhancer_agent_tools/numeric_extractor.py --bench
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from utils.currency import UNIT_MULTIPLIERS, to_inr
+
+
+# ─── Payload fields ────────────────────────────────────────
+FUNDING = "total_funding_raised_inr"
+REVENUE = "revenue_estimate_annual"
+VALUATION = "valuation_estimate_if_available"
+EMPLOYEES = "number_of_employees_current"
+ROUNDS = "number_of_funding_rounds"
+YEAR = "year_founded"
+GROWTH = "employee_growth_yoy"
+
+MONEY_FIELDS = {FUNDING, REVENUE, VALUATION}
+INTEGER_FIELDS = {EMPLOYEES, ROUNDS, YEAR}
+
+# Bare money amounts ("funding above 100") are read as crores
+DEFAULT_MONEY_UNIT = "cr"
+YEAR_RANGE = (1900, 2100)
+
+# ─── Lexicon ───────────────────────────────────────────────
+# comparator → (bound, strict)
+_COMPARATORS: Dict[str, Tuple[str, bool]] = {
+    "over": ("gte", True), "above": ("gte", True), "more than": ("gte", True),
+    "greater than": ("gte", True), "exceeding": ("gte", True), "upwards of": ("gte", True),
+    "after": ("gte", True), "post": ("gte", True), ">": ("gte", True),
+    "at least": ("gte", False), "atleast": ("gte", False), "minimum": ("gte", False),
+    "min": ("gte", False), "since": ("gte", False), "starting": ("gte", False),
+    ">=": ("gte", False), "≥": ("gte", False),
+    "under": ("lte", True), "below": ("lte", True), "less than": ("lte", True),
+    "fewer than": ("lte", True), "before": ("lte", True), "pre": ("lte", True),
+    "<": ("lte", True),
+    "at most": ("lte", False), "up to": ("lte", False), "upto": ("lte", False),
+    "maximum": ("lte", False), "max": ("lte", False), "within": ("lte", False),
+    "until": ("lte", False), "till": ("lte", False), "<=": ("lte", False), "≤": ("lte", False),
+    "in": ("eq", False), "founded in": ("eq", False),
+}
+_TRAILING: Dict[str, Tuple[str, bool]] = {
+    "+": ("gte", False), "plus": ("gte", False), "or more": ("gte", False),
+    "or above": ("gte", False), "and above": ("gte", False), "or higher": ("gte", False),
+    "or less": ("lte", False), "or below": ("lte", False), "and below": ("lte", False),
+    "or fewer": ("lte", False),
+}
+
+# Words that only make sense as part of a numeric constraint (comparators, field
+# cues, units, currencies): the rule enhancer counts them as explained and the
+# query normalizer never "corrects" them.
+NUMERIC_CUE_WORDS = {
+    "over", "above", "under", "below", "more", "less", "than", "between", "after",
+    "before", "since", "least", "most", "within", "upto", "up", "greater", "fewer",
+    "minimum", "maximum", "min", "max", "atleast", "exceeding", "raised", "raising",
+    "funding", "funded", "revenue", "valuation", "valued", "employees", "employee",
+    "staff", "headcount", "founded", "established", "year", "years", "rounds",
+    "growth", "cr", "crore", "crores", "lakh", "lakhs", "lac", "million", "mn",
+    "billion", "bn", "k", "inr", "rs", "usd", "dollars", "rupees",
+} | set(UNIT_MULTIPLIERS)
+
+# Cue words → field. "funding rounds" is listed before "funding" so it wins.
+_CUES: List[Tuple[str, str]] = [
+    (ROUNDS, r"funding rounds?|rounds?"),
+    (FUNDING, r"raised|raising|raise|funding|funded|investment|invested|capital"),
+    (REVENUE, r"revenues?|turnover|sales|arr|earnings?"),
+    (VALUATION, r"valuations?|valued|worth"),
+    (EMPLOYEES, r"employees?|staff|headcount|team size|people|workforce"),
+    (YEAR, r"founded|established|incorporated|started|launched|inception"),
+    (GROWTH, r"growth|grew|growing"),
+]
+
+# Which fields an amount kind may be assigned to
+_COMPATIBLE = {
+    "money": MONEY_FIELDS,
+    "percent": {GROWTH},
+    "bare": MONEY_FIELDS | INTEGER_FIELDS | {GROWTH},
+}
+
+# ─── Grammar ───────────────────────────────────────────────
+def _alternation(words) -> str:
+    return "|".join(re.escape(w).replace(r"\ ", r"\s+") for w in sorted(words, key=len, reverse=True))
+
+
+_NUM = r"\d+(?:,\d+)*(?:\.\d+)?"
+_UNIT = r"(?:crores?|cr|lakhs?|lacs?|lac|k|thousand|millions?|mn|m|billions?|bn)(?![a-z])"
+_AMOUNT = (
+    rf"(?:(?:₹|rs\.?|inr|us\$|\$|usd)\s*)?{_NUM}(?:\s*{_UNIT}\.?)?"
+    r"(?:\s*(?:rupees|inr|dollars|usd|%|percent|pct)(?![a-z]))?(?![a-z\d])"
+)
+_CMP_WORDS = _alternation(_COMPARATORS)
+_TRAIL_WORDS = _alternation(_TRAILING)
+
+_PHRASE = re.compile(
+    r"(?P<date>\b\d{4}-\d{1,2}-\d{1,2}\b)"
+    rf"|(?:\bbetween|\bfrom)\s+(?P<lo>{_AMOUNT})\s+(?:and|to|-|–)\s+(?P<hi>{_AMOUNT})"
+    rf"|(?P<r_lo>{_AMOUNT})\s*(?:-|–|\bto\b)\s*(?P<r_hi>{_AMOUNT})"
+    rf"|(?P<cmp>(?<![a-z]){_CMP_WORDS})\s*(?P<c_amt>{_AMOUNT})"
+    rf"|(?<![\w.]){'(?P<amt>' + _AMOUNT + ')'}(?:\s*(?P<trail>{_TRAIL_WORDS})(?![a-z]))?",
+    re.IGNORECASE,
+)
+_AMOUNT_PARTS = re.compile(
+    r"(?P<cur_pre>₹|rs\.?|inr|us\$|\$|usd)?\s*(?P<num>" + _NUM + r")"
+    r"(?:\s*(?P<unit>" + _UNIT + r")\.?)?"
+    r"(?:\s*(?P<suffix>rupees|inr|dollars|usd|%|percent|pct))?",
+    re.IGNORECASE,
+)
+_CUE_PATTERN = re.compile(
+    "|".join(rf"(?P<f{i}>\b(?:{pattern})\b)" for i, (_, pattern) in enumerate(_CUES)),
+    re.IGNORECASE,
+)
+_CUE_FIELDS = {f"f{i}": fld for i, (fld, _) in enumerate(_CUES)}
+
+# Max characters between a cue word and the phrase it describes
+CUE_WINDOW = 40
+
+
+@dataclass
+class Amount:
+    value: float
+    kind: str          # "money" | "percent" | "bare"
+    unit: Optional[str]
+    currency: Optional[str]
+    text: str
+
+
+@dataclass
+class NumericParse:
+    """Constraints plus the numeric phrases that could not be assigned a field."""
+    constraints: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    unparsed: List[str] = field(default_factory=list)
+
+
+def _parse_amount(text: str) -> Amount:
+    m = _AMOUNT_PARTS.search(text)
+    value = float(m.group("num").replace(",", ""))
+    unit = (m.group("unit") or "").lower() or None
+    suffix = (m.group("suffix") or "").lower()
+    currency = (m.group("cur_pre") or "").lower().rstrip(".") or (
+        suffix if suffix in {"rupees", "inr", "dollars", "usd"} else None
+    )
+    if suffix in {"%", "percent", "pct"}:
+        kind = "percent"
+    elif currency or (unit and unit not in {"k", "thousand"}):
+        kind = "money"
+    else:
+        kind = "bare"
+    return Amount(value, kind, unit, currency, text)
+
+
+def _is_year(amount: Amount) -> bool:
+    return (
+        amount.kind == "bare" and amount.unit is None and amount.value.is_integer()
+        and YEAR_RANGE[0] <= amount.value <= YEAR_RANGE[1]
+    )
+
+
+def _resolve_field(amounts: List[Amount], cues, start: int, end: int,
+                   left_limit: int, right_limit: int) -> Optional[str]:
+    """Nearest compatible cue on the left, then on the right, within the window."""
+    allowed = set.intersection(*(_COMPATIBLE[a.kind] for a in amounts))
+    left = [c for c in cues if max(left_limit, start - CUE_WINDOW) <= c[1] <= start and c[2] in allowed]
+    if left:
+        return left[-1][2]
+    right = [c for c in cues if end <= c[0] <= min(right_limit, end + CUE_WINDOW) and c[2] in allowed]
+    if right:
+        return right[0][2]
+
+    # No cue word: fall back on what the amount looks like
+    if all(a.kind == "money" for a in amounts):
+        return FUNDING
+    if all(a.kind == "percent" for a in amounts):
+        return GROWTH
+    if all(_is_year(a) for a in amounts):
+        return YEAR
+    return None
+
+
+def _normalize(amount: Amount, fld: str) -> float:
+    if fld in MONEY_FIELDS:
+        unit = amount.unit or (None if amount.currency else DEFAULT_MONEY_UNIT)
+        return to_inr(amount.value, unit, amount.currency)
+    value = amount.value * UNIT_MULTIPLIERS.get(amount.unit or "", 1)
+    return int(value) if fld in INTEGER_FIELDS or value.is_integer() else value
+
+
+def _apply(constraints: Dict[str, Dict[str, float]], fld: str, bound: str, value: float) -> None:
+    current = constraints.setdefault(fld, {})
+    if bound in ("gte", "eq"):
+        current["gte"] = value if current.get("gte") is None else max(current["gte"], value)
+    if bound in ("lte", "eq"):
+        current["lte"] = value if current.get("lte") is None else min(current["lte"], value)
+
+
+def parse_numeric_constraints(query: str) -> NumericParse:
+    """Full parse: constraints plus any numeric phrase left unassigned."""
+    result = NumericParse()
+    cues = [(m.start(), m.end(), _CUE_FIELDS[m.lastgroup]) for m in _CUE_PATTERN.finditer(query)]
+    phrases = list(_PHRASE.finditer(query))
+
+    for i, m in enumerate(phrases):
+        left_limit = phrases[i - 1].end() if i else 0
+        right_limit = phrases[i + 1].start() if i + 1 < len(phrases) else len(query)
+
+        if m.group("date"):
+            # Calendar dates are not numeric ranges on any payload field
+            result.unparsed.append(m.group(0))
+            continue
+        if m.group("lo") or m.group("r_lo"):
+            lo = _parse_amount(m.group("lo") or m.group("r_lo"))
+            hi = _parse_amount(m.group("hi") or m.group("r_hi"))
+            # "50-100 cr", "$1 and $2 billion": the unit / currency written once
+            # on the upper bound applies to both ends
+            if lo.unit is None:
+                lo.unit = hi.unit
+            lo.currency = lo.currency or hi.currency
+            if lo.kind == "bare":
+                lo.kind = hi.kind
+            bounds = [("gte", False, lo), ("lte", False, hi)]
+        elif m.group("cmp"):
+            bound, strict = _COMPARATORS[" ".join(m.group("cmp").lower().split())]
+            amount = _parse_amount(m.group("c_amt"))
+            if bound == "eq" and not _is_year(amount):
+                # "in 5 cities" is not a constraint we can express
+                result.unparsed.append(m.group(0).strip())
+                continue
+            bounds = [(bound, strict, amount)]
+        else:
+            amount = _parse_amount(m.group("amt"))
+            if m.group("trail"):
+                bound, strict = _TRAILING[" ".join(m.group("trail").lower().split())]
+            elif amount.kind == "money":
+                bound, strict = "gte", False      # "raised $5 million" → at least
+            elif _is_year(amount):
+                bound, strict = "eq", False       # "founded 2018"
+            else:
+                # A lone count / percent with no comparator is too ambiguous to filter on
+                result.unparsed.append(m.group(0).strip())
+                continue
+            bounds = [(bound, strict, amount)]
+
+        amounts = [a for _, _, a in bounds]
+        fld = _resolve_field(amounts, cues, m.start(), m.end(), left_limit, right_limit)
+        if fld is None or (fld != YEAR and any(b == "eq" for b, _, _ in bounds)):
+            # An exact value ("founded in 2018") only means something for the
+            # founding year; "funding 2015" is not an exact ₹2015 Cr filter
+            result.unparsed.append(m.group(0).strip())
+            continue
+
+        for bound, strict, amount in bounds:
+            value = _normalize(amount, fld)
+            if strict and fld in INTEGER_FIELDS:
+                value = value + 1 if bound == "gte" else value - 1
+            _apply(result.constraints, fld, bound, value)
+
+    return result
+
+
+def extract_numeric_constraints(query: str) -> Dict[str, Dict[str, float]]:
+    """
+    Extract `{field: {"gte": x, "lte": y}}` range filters from a user query.
+    Returns {} when the query has no numeric constraints.
+    """
+    return parse_numeric_constraints(query).constraints
+
+
+# ─── Table-driven corpus ───────────────────────────────────
+# (query, expected constraints). Run with --check after changing the grammar.
+NUMERIC_CASES: List[Tuple[str, Dict[str, Dict[str, float]]]] = [
+    ("raised over 50 cr", {FUNDING: {"gte": 500_000_000}}),
+    ("funding above 50 crore", {FUNDING: {"gte": 500_000_000}}),
+    ("startups that raised $5 million", {FUNDING: {"gte": 415_000_000}}),
+    ("$5 million", {FUNDING: {"gte": 415_000_000}}),
+    ("funding between 10 cr and 50 cr", {FUNDING: {"gte": 100_000_000, "lte": 500_000_000}}),
+    ("raised 10-50 cr", {FUNDING: {"gte": 100_000_000, "lte": 500_000_000}}),
+    ("funding under ₹75 lakh", {FUNDING: {"gte": None, "lte": 7_500_000}}),
+    ("funding above 100", {FUNDING: {"gte": 1_000_000_000}}),
+    ("revenue above ₹10 cr and valuation under 1000 cr",
+     {REVENUE: {"gte": 100_000_000}, VALUATION: {"lte": 10_000_000_000}}),
+    ("valued at least 1 billion dollars", {VALUATION: {"gte": 83_000_000_000}}),
+    ("revenue of at least rs. 2.5 cr", {REVENUE: {"gte": 25_000_000}}),
+    ("between 2015 and 2020", {YEAR: {"gte": 2015, "lte": 2020}}),
+    ("founded after 2015", {YEAR: {"gte": 2016}}),
+    ("founded before 2010", {YEAR: {"lte": 2009}}),
+    ("established since 2012", {YEAR: {"gte": 2012}}),
+    ("founded in 2018", {YEAR: {"gte": 2018, "lte": 2018}}),
+    ("less than 100 employees", {EMPLOYEES: {"lte": 99}}),
+    ("at most 100 employees", {EMPLOYEES: {"lte": 100}}),
+    ("more than 1k employees", {EMPLOYEES: {"gte": 1001}}),
+    ("100 to 500 employees", {EMPLOYEES: {"gte": 100, "lte": 500}}),
+    ("500+ employees", {EMPLOYEES: {"gte": 500}}),
+    ("team size under 50", {EMPLOYEES: {"lte": 49}}),
+    ("over 2000 employees", {EMPLOYEES: {"gte": 2001}}),
+    ("more than 3 funding rounds", {ROUNDS: {"gte": 4}}),
+    ("growth above 20%", {GROWTH: {"gte": 20}}),
+    ("saas startups in bengaluru founded after 2015 with over 50 cr funding",
+     {YEAR: {"gte": 2016}, FUNDING: {"gte": 500_000_000}}),
+    ("fintechs with more than 200 employees that raised between 5 and 20 million dollars",
+     {EMPLOYEES: {"gte": 201}, FUNDING: {"gte": 415_000_000, "lte": 1_660_000_000}}),
+    ("healthtech startups in delhi", {}),
+    ("series a b2b startups", {}),
+    ("companies with 100 employees", {}),
+    ("b2b saas in 2nd tier cities", {}),
+    ("latest funding date 2022-08-31", {}),
+    ("valuation of 1,000 crores or more", {VALUATION: {"gte": 10_000_000_000}}),
+    ("raised ₹1,00,00,000", {FUNDING: {"gte": 10_000_000}}),
+    ("companies founded 2018-2020 with revenue over 100 cr",
+     {YEAR: {"gte": 2018, "lte": 2020}, REVENUE: {"gte": 1_000_000_000}}),
+    ("valued between $1 and $2 billion", {VALUATION: {"gte": 83_000_000_000, "lte": 166_000_000_000}}),
+    ("revenue between 50 lakh and 2 cr", {REVENUE: {"gte": 5_000_000, "lte": 20_000_000}}),
+    ("funding 2015", {}),
+    ("raised in 2019", {}),
+    ("startups founded 2019", {YEAR: {"gte": 2019, "lte": 2019}}),
+]
+
+
+def _matches(actual: Dict[str, Dict[str, float]], expected: Dict[str, Dict[str, float]]) -> bool:
+    strip = lambda d: {f: {b: v for b, v in r.items() if v is not None} for f, r in d.items()}
+    return strip(actual) == strip(expected)
+
+
+def run_corpus() -> int:
+    """Run NUMERIC_CASES and print failures. Returns the number of failures."""
+    failures = 0
+    for query, expected in NUMERIC_CASES:
+        actual = extract_numeric_constraints(query)
+        if not _matches(actual, expected):
+            failures += 1
+            print(f"❌ {query!r}\n   expected: {expected}\n   actual:   {actual}")
+    print(f"✅ {len(NUMERIC_CASES) - failures}/{len(NUMERIC_CASES)} numeric cases passed")
+    return failures
+
+
+def benchmark(rounds: int = 2000) -> float:
+    """Average microseconds per `extract_numeric_constraints` call over the corpus."""
+    import timeit
+    queries = [q for q, _ in NUMERIC_CASES]
+    seconds = timeit.timeit(lambda: [extract_numeric_constraints(q) for q in queries], number=rounds)
+    per_call = seconds / (rounds * len(queries)) * 1e6
+    print(f"⏱️ extract_numeric_constraints: {per_call:.1f} µs/query over {len(queries)} queries")
+    return per_call
+
+
+# For CLI testing
+if __name__ == "__main__":
+    import json
+    if "--check" in sys.argv:
+        sys.exit(1 if run_corpus() else 0)
+    elif "--bench" in sys.argv:
+        benchmark()
+    else:
+        query = " ".join(sys.argv[1:]) or "fintechs that raised over 50 cr founded after 2015"
+        print(json.dumps(extract_numeric_constraints(query), indent=2))
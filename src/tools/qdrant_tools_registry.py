@@ -25,7 +25,7 @@ from langchain.tools import Tool
 from langchain.tools import StructuredTool
 #from langchain_openai import OpenAIEmbeddings
 from qdrant_client import QdrantClient
-from langchain_huggingface import HuggingFaceEmbeddings
+from utils.embedding_loader import get_embedding_model
 
 # Import the QdrantSearchTool implementation from the actual server tool script
 from tools.qdrant_tools.qdrant_server_tool import QdrantSearchTool
@@ -43,7 +43,7 @@ class QdrantSearchInput(BaseModel):
 
 # Instantiate the tool
 #embedding_model = OpenAIEmbeddings()
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+embeddings = get_embedding_model()
 
 
 # Instantiate the tool
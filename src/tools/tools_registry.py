@@ -115,6 +115,9 @@ filter_composer_tool = Tool(
 from langchain.tools import Tool
 from langchain_openai import OpenAIEmbeddings  # Add this import
 from qdrant_tools.qdrant_server_tool import COLLECTION_NAME, QdrantSearchTool
+from utils.logger import get_logger
+
+log = get_logger("qdrant_search")
 
 # 4️⃣ Instantiate once
 embedding_model = OpenAIEmbeddings()
@@ -131,15 +134,13 @@ def wrapped_qdrant_search(inputs: dict) -> list:
     query = inputs.get("query", "")
     filters = inputs.get("filters", None)
     k = inputs.get("k", 5)
-    print(f"\n[DEBUG] Query: {query}")
-    print(f"[DEBUG] Filters: {filters}")
-    print(f"[DEBUG] Top K: {k}")
+    log.debug("qdrant.search", query=query, filters=filters, k=k)
     try:
         results = qdrant_tool.search(query=query, filters=filters, k=k)
-        print(f"[DEBUG] Raw results: {results}")
+        log.debug("qdrant.results", count=len(results), results=results)
         return results
     except Exception as e:
-        print(f"[ERROR] Qdrant search failed: {e}")
+        log.error("qdrant.search_failed", error=str(e), query=query)
         return []
 
 
@@ -0,0 +1,248 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/company_index.py
+"""
+In-memory columnar copy of the company catalogue for `/get_companies`.
+
+Browsing needs no LLM, embedding or Qdrant call: the dataset is loaded once
+(at startup, see graph.lifecycle) into one numpy array per numeric payload
+field and an inverted index (value → row ids) per keyword field. A page is then
+a few vectorised mask operations and a slice — well under a millisecond.
+
+- 🔎 Filters: the search-filter dialect (`{"industry_sector": ["fintech"],
+  "year_founded": {"gte": 2016}}`): a list matches any value, a single value
+  must match, `{gte, lte}` is an inclusive range; all conditions must hold
+- ↕️ Sorting: `sort="-total_funding_raised_inr"` (leading `-` = descending);
+  a row permutation per numeric field and direction (plus name) is precomputed,
+  missing values always last
+- 📄 Paging: an opaque cursor = position in the sort permutation; pages stay
+  stable because the index never changes after load
+- 🪪 Projection: rows are pre-projected to `Company` cards; `fields=` picks
+  a subset of their fields
+
+✅ Usage:
+     from utils.company_index import get_company_index
+     page = get_company_index().page(filters={"headquarters_city": ["bengaluru"]},
+                                     sort="-total_funding_raised_inr", limit=20)
+     page.items, page.next_cursor, page.total
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from schema.company_schema import Company, payload_key
+from tools.enhancer_agent_tools.keyword_extractor import KEYWORD_FIELDS
+from utils.currency import parse_inr_amount
+from utils.path_config import get_data_path
+
+
+# ─── Tunables ──────────────────────────────────────────────
+COMPANIES_PAGE_SIZE = int(os.getenv("COMPANIES_PAGE_SIZE", "20"))
+COMPANIES_MAX_PAGE_SIZE = int(os.getenv("COMPANIES_MAX_PAGE_SIZE", "100"))
+
+
+# ─── Parsing ───────────────────────────────────────────────
+def _to_number(value: Any) -> Optional[float]:
+    """"2018" / "3%" / 303 → float; None when unparseable."""
+    try:
+        return float(str(value).strip().rstrip("%").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _parse(parse, value: Any) -> float:
+    number = parse(value) if value is not None else None
+    return np.nan if number is None else float(number)
+
+
+def _keyword_values(value: Any, separator: Optional[str]) -> List[str]:
+    if value is None:
+        return []
+    parts = str(value).split(separator) if separator else [str(value)]
+    return [part.strip().lower() for part in parts if part.strip()]
+
+
+# Payload field → parser of the dataset value (None when missing / unparseable)
+NUMERIC_FIELDS = {
+    "year_founded": _to_number,
+    "total_funding_raised_inr": parse_inr_amount,
+    "number_of_funding_rounds": _to_number,
+    "revenue_estimate_annual": parse_inr_amount,
+    "valuation_estimate_if_available": parse_inr_amount,
+    "number_of_employees_current": _to_number,
+    "employee_growth_yoy": _to_number,
+}
+
+# Keyword payload field → multi-valued separator (None = one value per row)
+KEYWORD_INDEX_FIELDS: Dict[str, Optional[str]] = {
+    **{field: separator for field, separator in KEYWORD_FIELDS.values()},
+    "company_name": None,
+    "legal_entity_type": None,
+}
+
+NAME_ORDER = "company_name"
+
+
+@dataclass
+class CompanyPage:
+    """One page of `Company` cards (possibly projected)."""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    total: int          # rows matching the filters
+
+
+def encode_cursor(order: str, position: int) -> str:
+    return base64.urlsafe_b64encode(f"{order}:{position}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order: str) -> int:
+    """Cursor → position in the `order` permutation; ValueError when it belongs to another sort."""
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_order, _, position = text.rpartition(":")
+        value = int(position)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor") from None
+    if cursor_order != order or value < 0:
+        raise ValueError("Cursor does not belong to this sort order")
+    return value
+
+
+class CompanyIndex:
+    """Immutable columnar index over the dataset rows."""
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]]):
+        rows = [{payload_key(key): value for key, value in row.items()} for row in rows]
+        self.size = len(rows)
+        self.cards: List[Dict[str, Any]] = [Company.from_payload(row).model_dump() for row in rows]
+
+        # Numeric columns: float64 with NaN for missing values
+        self.columns: Dict[str, np.ndarray] = {
+            field: np.array([_parse(parse, row.get(field)) for row in rows], dtype=np.float64)
+            for field, parse in NUMERIC_FIELDS.items()
+        }
+
+        # Keyword columns: lower-cased value → sorted row ids
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {}
+        for field, separator in KEYWORD_INDEX_FIELDS.items():
+            grouped: Dict[str, List[int]] = {}
+            for i, row in enumerate(rows):
+                for value in _keyword_values(row.get(field), separator):
+                    grouped.setdefault(value, []).append(i)
+            self.postings[field] = {value: np.array(ids, dtype=np.int32) for value, ids in grouped.items()}
+
+        # Sort permutations: dataset order, name, each numeric field both ways (missing last)
+        self.orders: Dict[str, np.ndarray] = {"": np.arange(self.size, dtype=np.int32)}
+        names = np.array([card["name"].lower() for card in self.cards], dtype=object)
+        self.orders[NAME_ORDER] = np.argsort(names, kind="stable").astype(np.int32)
+        self.orders[f"-{NAME_ORDER}"] = self.orders[NAME_ORDER][::-1].copy()
+        for field, column in self.columns.items():
+            present = ~np.isnan(column)
+            ascending = np.argsort(column, kind="stable")           # NaN sorts last
+            descending = np.argsort(-column, kind="stable")
+            missing = np.flatnonzero(~present).astype(np.int32)
+            self.orders[field] = ascending.astype(np.int32)
+            self.orders[f"-{field}"] = np.concatenate([descending[:present.sum()], missing]).astype(np.int32)
+
+    @classmethod
+    def from_csv(cls, path: Optional[str] = None) -> "CompanyIndex":
+        import pandas as pd
+
+        df = pd.read_csv(path or get_data_path())
+        return cls(df.astype(object).where(df.notna(), None).to_dict("records"))
+
+    # ─── Query ─────────────────────────────────────────────
+    def mask(self, filters: Optional[Mapping[str, Any]]) -> np.ndarray:
+        """Boolean row mask for `filters` (search-filter dialect)."""
+        mask = np.ones(self.size, dtype=bool)
+        for field, condition in (filters or {}).items():
+            if condition is None:
+                continue
+            if field in self.columns:
+                if not isinstance(condition, Mapping):
+                    condition = {"gte": condition, "lte": condition}
+                column = self.columns[field]
+                if condition.get("gte") is not None:
+                    mask &= column >= float(condition["gte"])
+                if condition.get("lte") is not None:
+                    mask &= column <= float(condition["lte"])
+            elif field in self.postings:
+                values = condition if isinstance(condition, list) else [condition]
+                matched = np.zeros(self.size, dtype=bool)
+                for value in values:
+                    ids = self.postings[field].get(str(value).strip().lower())
+                    if ids is not None:
+                        matched[ids] = True
+                mask &= matched
+            else:
+                raise ValueError(f"Unknown filter field: {field}")
+        return mask
+
+    def page(self, filters: Optional[Mapping[str, Any]] = None, sort: Optional[str] = None,
+             limit: int = COMPANIES_PAGE_SIZE, cursor: Optional[str] = None,
+             fields: Optional[Sequence[str]] = None) -> CompanyPage:
+        """Filtered, sorted page of cards starting after `cursor`."""
+        order = sort or ""
+        if order not in self.orders:
+            raise ValueError(f"Cannot sort by: {sort}")
+        unknown = set(fields or ()) - set(Company.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        limit = max(1, min(limit, COMPANIES_MAX_PAGE_SIZE))
+        start = decode_cursor(cursor, order) if cursor else 0
+
+        mask = self.mask(filters)
+        permutation = self.orders[order]
+        # Positions (in the permutation) of matching rows from the cursor on
+        positions = np.flatnonzero(mask[permutation[start:]])[:limit + 1] + start
+
+        rows = permutation[positions[:limit]]
+        cards = [self.cards[i] for i in rows]
+        if fields:
+            cards = [{field: card[field] for field in fields} for card in cards]
+        next_cursor = encode_cursor(order, int(positions[limit])) if len(positions) > limit else None
+        return CompanyPage(items=cards, next_cursor=next_cursor, total=int(mask.sum()))
+
+
+# 🔁 Singleton index (loaded by the startup warm-up)
+_company_index: Optional[CompanyIndex] = None
+
+
+def get_company_index() -> CompanyIndex:
+    """Returns the process-wide CompanyIndex, loading the dataset on first use."""
+    global _company_index
+
+    if _company_index is None:
+        _company_index = CompanyIndex.from_csv()
+
+    return _company_index
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    started = time.perf_counter()
+    index = get_company_index()
+    print(f"✅ Loaded {index.size} companies in {time.perf_counter() - started:.3f}s")
+    started = time.perf_counter()
+    page = index.page(filters={"year_founded": {"gte": 2016}}, sort="-total_funding_raised_inr", limit=3)
+    print(f"⏱️ Page in {(time.perf_counter() - started) * 1000:.3f} ms")
+    print(json.dumps(page.items, indent=2, ensure_ascii=False), page.next_cursor, page.total)
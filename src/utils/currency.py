@@ -0,0 +1,86 @@
+# src/utils/currency.py
+
+"""
+Currency / unit normalization shared by ingest and query parsing.
+
+✅ Features:
+- One integer unit everywhere: whole Indian rupees (INR)
+- Indian units (crore, lakh) and western units (thousand, million, billion)
+- USD → INR conversion with a configurable FX rate (env `USD_TO_INR`)
+
+✅ Usage:
+     from utils.currency import format_inr_amount, parse_inr_amount, to_inr
+     parse_inr_amount("₹457 Cr")        # → 4_570_000_000
+     format_inr_amount(4_570_000_000)   # → "₹457 Cr"
+     to_inr(5, unit="million", currency="USD")
+"""
+
+import os
+import re
+from typing import Optional
+
+# 💱 Configurable FX rate for "$" / "usd" amounts
+USD_TO_INR = float(os.getenv("USD_TO_INR", "83.0"))
+
+# 📏 Multipliers for every unit spelling we accept
+UNIT_MULTIPLIERS = {
+    "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000,
+    "l": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000,
+    "k": 1_000, "thousand": 1_000,
+    "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000, "millions": 1_000_000,
+    "bn": 1_000_000_000, "billion": 1_000_000_000, "billions": 1_000_000_000,
+}
+
+_USD_MARKERS = {"$", "usd", "us$", "dollar", "dollars"}
+
+_AMOUNT_PATTERN = re.compile(
+    r"(?P<cur_pre>₹|rs\.?|inr|us\$|\$|usd)?\s*"
+    r"(?P<num>\d+(?:,\d+)*(?:\.\d+)?)\s*"
+    r"(?P<unit>crores?|cr|lakhs?|lacs?|lac|l|k|thousand|millions?|mn|m|billions?|bn)?\.?\s*"
+    r"(?P<cur_post>rupees|rs|inr|dollars|usd)?",
+    re.IGNORECASE,
+)
+
+
+def to_inr(amount: float, unit: Optional[str] = None, currency: Optional[str] = None,
+           fx_rate: Optional[float] = None) -> int:
+    """
+    Convert `amount` expressed in `unit` / `currency` to whole rupees.
+    Unknown units are treated as plain numbers.
+    """
+    value = float(amount) * UNIT_MULTIPLIERS.get((unit or "").lower().rstrip("."), 1)
+    if (currency or "").lower() in _USD_MARKERS:
+        value *= fx_rate if fx_rate is not None else USD_TO_INR
+    return int(round(value))
+
+
+def parse_inr_amount(text, fx_rate: Optional[float] = None) -> Optional[int]:
+    """
+    Parse a stored / typed amount such as "₹457 Cr", "$5 million" or "12,50,000"
+    into whole rupees. Returns None when no number is present.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return int(text)
+    match = _AMOUNT_PATTERN.search(str(text).strip())
+    if not match:
+        return None
+    currency = match.group("cur_pre") or match.group("cur_post")
+    number = float(match.group("num").replace(",", ""))
+    return to_inr(number, match.group("unit"), currency, fx_rate)
+
+
+def format_inr_amount(value) -> Optional[str]:
+    """
+    Whole rupees → the dataset's display form ("₹457 Cr", "₹75 L", "₹50,000").
+    Strings (amounts not yet migrated) are returned unchanged.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    for unit, label in (("cr", "Cr"), ("l", "L")):
+        if abs(value) >= UNIT_MULTIPLIERS[unit]:
+            return f"₹{round(value / UNIT_MULTIPLIERS[unit], 2):g} {label}"
+    return f"₹{int(value):,}"
@@ -0,0 +1,84 @@
+# src/utils/embedding_loader.py
+
+"""
+Embedding model loader utility.
+
+✅ Features:
+- Returns a singleton MiniLM embedding model (loaded once per process)
+- Shared by the Qdrant search tool and the enhancer semantic cache
+- Every embed call is timed (`embedding` latency histograms, see utils.metrics)
+- `aembed_query()` for async callers: inference runs on a small bounded pool
+  (`EMBEDDING_POOL_WORKERS`), never on the event loop
+
+✅ Usage:
+     from utils.embedding_loader import get_embedding_model
+     vector = get_embedding_model().embed_query("fintech startups in bengaluru")
+     vector = await aembed_query("fintech startups in bengaluru")
+"""
+
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from utils.metrics import timer
+from utils.tracing import set_attributes
+
+
+# ─── Tunables ──────────────────────────────────────────────
+# CPU-bound inference: a few workers (torch already uses several threads per call)
+EMBEDDING_POOL_WORKERS = int(os.getenv("EMBEDDING_POOL_WORKERS", "2"))
+
+# 📦 Model used at ingest time — query vectors must come from the same model
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+class TimedEmbeddings(HuggingFaceEmbeddings):
+    """HuggingFaceEmbeddings that records the latency of every embed call."""
+
+    def embed_query(self, text: str) -> List[float]:
+        with timer("embedding", "embed_query"):
+            return super().embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with timer("embedding", "embed_documents"):
+            set_attributes(batch_size=len(texts))
+            return super().embed_documents(texts)
+
+
+# 🔁 Singleton model instance
+_embedding_model = None
+
+
+def get_embedding_model() -> TimedEmbeddings:
+    """
+    Returns a cached singleton HuggingFaceEmbeddings instance.
+    """
+    global _embedding_model
+
+    if _embedding_model is None:
+        _embedding_model = TimedEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+    return _embedding_model
+
+
+# 🔁 Singleton bounded pool for embedding inference off the event loop
+_embedding_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_embedding_pool() -> ThreadPoolExecutor:
+    global _embedding_pool
+
+    if _embedding_pool is None:
+        _embedding_pool = ThreadPoolExecutor(max_workers=EMBEDDING_POOL_WORKERS, thread_name_prefix="embedding")
+
+    return _embedding_pool
+
+
+async def aembed_query(text: str) -> List[float]:
+    """Embed `text` on the embedding pool (the caller's context follows: spans, config)."""
+    loop = asyncio.get_running_loop()
+    model = get_embedding_model()
+    return await loop.run_in_executor(get_embedding_pool(), contextvars.copy_context().run, model.embed_query, text)
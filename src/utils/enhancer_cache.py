@@ -0,0 +1,278 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/enhancer_cache.py
+
+"""
+Persistent two-level cache of enhancer outputs.
+
+Users phrase the same intent many ways ("fintechs in blr", "Bangalore fintech
+startups"); without a cache every phrasing pays for a full enhancer agent run.
+
+✅ Features:
+- Level 1 — exact: key = normalized query text (lower-cased, punctuation dropped)
+- Level 2 — semantic: MiniLM cosine similarity ≥ `ENHANCER_CACHE_SIMILARITY`,
+  only among entries whose numeric literals AND extracted keyword entities
+  match EXACTLY ("over 100 cr" must never reuse the filters of "over 10 cr",
+  "fintech in pune" never those of "fintech in mumbai")
+- SQLite file under Data/artifacts, LRU eviction above `ENHANCER_CACHE_MAX_ENTRIES`
+- Hit / miss counters persisted next to the entries (`stats()`)
+
+✅ Usage:
+     from utils.enhancer_cache import get_enhancer_cache
+     cache = get_enhancer_cache()
+     cached = cache.get(query)              # EnhanceOutput | None
+     if cached is None:
+         cache.put(query, enhance_output)
+     cache.stats()                          # {"hit_rate": 0.42, ...}
+
+✅ CLI:
+     python utils/enhancer_cache.py --stats | --clear
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from schema.tools_schema import EnhanceOutput
+from tools.enhancer_agent_tools.keyword_extractor import (
+    extract_keyword_matches,
+    group_keyword_matches,
+    normalize_text,
+)
+from utils.path_config import get_enhancer_cache_path
+
+
+# ─── Tunables ──────────────────────────────────────────────
+CACHE_ENABLED = os.getenv("ENHANCER_CACHE_ENABLED", "1") != "0"
+SIMILARITY_THRESHOLD = float(os.getenv("ENHANCER_CACHE_SIMILARITY", "0.92"))
+MAX_ENTRIES = int(os.getenv("ENHANCER_CACHE_MAX_ENTRIES", "5000"))
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+_COUNTERS = ("exact_hits", "semantic_hits", "misses")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    numbers    TEXT NOT NULL,
+    entities   TEXT,
+    output     TEXT NOT NULL,
+    embedding  BLOB,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def cache_key(query: str) -> str:
+    """Normalized query text used as the exact-match key."""
+    return normalize_text(query)
+
+
+def numeric_signature(key: str) -> str:
+    """Every number in the normalized query, in order ("top 10 … over 100" → "10|100")."""
+    return "|".join(n.replace(",", "") for n in _NUMBER_PATTERN.findall(key))
+
+
+def entity_signature(key: str) -> str:
+    """Keyword entities of the normalized query as canonical JSON ({field: sorted values})."""
+    grouped = group_keyword_matches(extract_keyword_matches(key))
+    return json.dumps({field: sorted(values) for field, values in grouped.items()}, sort_keys=True)
+
+
+def _default_embed(text: str) -> List[float]:
+    from utils.embedding_loader import get_embedding_model
+    return get_embedding_model().embed_query(text)
+
+
+class EnhancerCache:
+    """SQLite-backed exact + semantic cache of `EnhanceOutput`."""
+
+    def __init__(self, path: str, embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 similarity_threshold: float = SIMILARITY_THRESHOLD, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.embed_fn = embed_fn or _default_embed
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "entities" not in columns:
+            # Older cache file: its entries stay exact-match only (no entities → no semantic group)
+            self._conn.execute("ALTER TABLE entries ADD COLUMN entities TEXT")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # (numeric signature, entity signature) → (keys, unit-norm embedding matrix); built lazily
+        self._vectors: Optional[Dict[Tuple[str, str], Tuple[List[str], np.ndarray]]] = None
+
+    # ─── Internals ─────────────────────────────────────────
+    def _embed(self, key: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(key), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load_vectors(self) -> Dict[Tuple[str, str], Tuple[List[str], np.ndarray]]:
+        if self._vectors is None:
+            grouped: Dict[Tuple[str, str], Tuple[List[str], List[np.ndarray]]] = {}
+            rows = self._conn.execute(
+                "SELECT key, numbers, entities, embedding FROM entries "
+                "WHERE embedding IS NOT NULL AND entities IS NOT NULL"
+            )
+            for key, numbers, entities, blob in rows:
+                keys, vectors = grouped.setdefault((numbers, entities), ([], []))
+                keys.append(key)
+                vectors.append(np.frombuffer(blob, dtype=np.float32))
+            self._vectors = {sig: (keys, np.vstack(vecs)) for sig, (keys, vecs) in grouped.items()}
+        return self._vectors
+
+    def _bump(self, counter: str) -> None:
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (counter,),
+        )
+
+    def _touch(self, key: str) -> Optional[EnhanceOutput]:
+        row = self._conn.execute("SELECT output FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+        )
+        return EnhanceOutput.model_validate_json(row[0])
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM entries WHERE key IN "
+            "(SELECT key FROM entries ORDER BY last_used ASC LIMIT ?)",
+            (overflow,),
+        )
+        self._vectors = None   # rebuilt on the next semantic lookup
+
+    # ─── Public API ────────────────────────────────────────
+    def get(self, query: str) -> Optional[EnhanceOutput]:
+        """Exact hit, else semantic hit with identical numbers and entities, else None."""
+        key = cache_key(query)
+        with self._lock, self._conn:
+            output = self._touch(key)
+            if output is not None:
+                self._bump("exact_hits")
+                return output
+        signature = (numeric_signature(key), entity_signature(key))
+        with self._lock:
+            has_candidates = signature in self._load_vectors()
+
+        # Embed outside the lock so concurrent lookups do not queue on the model
+        vector = self._embed(key) if has_candidates else None
+
+        with self._lock, self._conn:
+            candidates = self._load_vectors().get(signature) if vector is not None else None
+            if candidates:
+                keys, matrix = candidates
+                similarities = matrix @ vector
+                best = int(similarities.argmax())
+                if similarities[best] >= self.similarity_threshold:
+                    output = self._touch(keys[best])
+                    if output is not None:
+                        self._bump("semantic_hits")
+                        return output
+
+            self._bump("misses")
+            return None
+
+    def put(self, query: str, output: EnhanceOutput) -> None:
+        """Store (or refresh) the enhancement for `query`, evicting LRU entries."""
+        key = cache_key(query)
+        numbers, entities = numeric_signature(key), entity_signature(key)
+        vector = self._embed(key)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO entries (key, numbers, entities, output, embedding, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET numbers = excluded.numbers, entities = excluded.entities, "
+                "output = excluded.output, embedding = excluded.embedding, last_used = excluded.last_used",
+                (key, numbers, entities, output.model_dump_json(), vector.tobytes(), now, now),
+            )
+            if self._vectors is not None:
+                signature = (numbers, entities)
+                keys, matrix = self._vectors.get(signature, ([], np.empty((0, vector.size), np.float32)))
+                if key in keys:
+                    matrix[keys.index(key)] = vector          # refreshed entry: overwrite its row
+                else:
+                    self._vectors[signature] = (keys + [key], np.vstack([matrix, vector]))
+            self._evict()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit / miss counters, hit rate and current size."""
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        stats = {name: int(counters.get(name, 0)) for name in _COUNTERS}
+        lookups = sum(stats.values())
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["entries"] = entries
+        return stats
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM counters")
+            self._vectors = None
+
+
+# 🔁 Singleton cache instance
+_enhancer_cache: Optional[EnhancerCache] = None
+
+
+def get_enhancer_cache() -> Optional[EnhancerCache]:
+    """
+    Returns the cached singleton EnhancerCache, or None when the cache is
+    disabled with ENHANCER_CACHE_ENABLED=0.
+    """
+    global _enhancer_cache
+
+    if not CACHE_ENABLED:
+        return None
+    if _enhancer_cache is None:
+        _enhancer_cache = EnhancerCache(get_enhancer_cache_path())
+
+    return _enhancer_cache
+
+
+if __name__ == "__main__":
+    cache = EnhancerCache(get_enhancer_cache_path())
+    if "--clear" in sys.argv:
+        cache.clear()
+        print("🧹 Enhancer cache cleared")
+    print(json.dumps(cache.stats(), indent=2))
@@ -0,0 +1,240 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/llm_cache.py
+
+"""
+SQLite-backed LLM response cache + record / replay store.
+
+Every agent runs its chat model at temperature 0, so an identical prompt gives
+an identical answer; repeated requests should not pay the LLM round trip.
+
+✅ Features:
+- Key = sha256(model / params / bound tool schemas + canonical JSON of messages)
+  — LangChain passes both strings to `BaseCache.lookup`, tool schemas included
+- TTL (`LLM_CACHE_TTL_SECONDS`, 0 = never expires) and LRU size limit
+  (`LLM_CACHE_MAX_ENTRIES`)
+- Per-call bypass: `with llm_cache_bypass(): llm.invoke(...)`
+- Modes (`LLM_CACHE_MODE`):
+    read_write → normal cache (default)
+    record     → always call the provider, store every response
+    replay     → never call the provider; a miss raises `LLMCacheMiss`, so the
+                 whole graph can run offline in tests and benchmarks
+    off        → no cache
+- Store location: `LLM_CACHE_PATH` (default Data/artifacts/llm_cache.sqlite)
+
+✅ Usage:
+     from utils.llm_cache import get_llm_cache
+     ChatOpenAI(model="gpt-4o", temperature=0, cache=get_llm_cache())
+
+✅ CLI:
+     python utils/llm_cache.py --stats | --clear
+"""
+
+import contextvars
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from utils.path_config import get_llm_cache_path
+
+
+# ─── Tunables ──────────────────────────────────────────────
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "read_write")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+
+_MODES = {"read_write", "record", "replay", "off"}
+_MODEL_PATTERN = re.compile(r'"model(?:_name)?"\s*:\s*"([^"]+)"')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key        TEXT PRIMARY KEY,
+    model      TEXT,
+    response   TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used);
+"""
+
+# 🔁 Per-call bypass flag (contextvars follow LangChain into its worker threads)
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a prompt was never recorded."""
+
+
+@contextmanager
+def llm_cache_bypass() -> Iterator[None]:
+    """Skip the cache (lookup AND store) for LLM calls made inside the block."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _canonical(text: str) -> str:
+    try:
+        return json.dumps(json.loads(text), sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return text
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """sha256 over the model/params/tools string and the canonical messages."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(_canonical(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain `BaseCache` with TTL, LRU size bound and record/replay modes."""
+
+    def __init__(self, path: str, mode: str = LLM_CACHE_MODE, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        if mode not in _MODES:
+            raise ValueError(f"LLM_CACHE_MODE must be one of {sorted(_MODES)}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0, "stored": 0}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    # ─── BaseCache API ─────────────────────────────────────
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _bypass.get() or self.mode == "record":
+            return None
+
+        key = cache_key(prompt, llm_string)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            # Recordings never expire while replaying
+            if row and self.mode != "replay" and self.ttl_seconds and time.time() - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.stats["expired"] += 1
+                row = None
+            if row is None:
+                self.stats["misses"] += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+                )
+                self.stats["hits"] += 1
+
+        if row is None:
+            if self.mode == "replay":
+                match = _MODEL_PATTERN.search(llm_string)
+                raise LLMCacheMiss(f"No recorded response for {match.group(1) if match else 'LLM'} call {key[:12]}")
+            return None
+        return [loads(item) for item in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if _bypass.get() or self.mode == "replay":
+            return
+
+        key = cache_key(prompt, llm_string)
+        match = _MODEL_PATTERN.search(llm_string)
+        response = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO llm_cache (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET response = excluded.response, "
+                "created_at = excluded.created_at, last_used = excluded.last_used",
+                (key, match.group(1) if match else None, response, now, now),
+            )
+            self.stats["stored"] += 1
+            self._evict()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    # ─── Housekeeping ──────────────────────────────────────
+    def _evict(self) -> None:
+        # Recorded fixtures are never evicted
+        if self.mode == "record":
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """Entries per model plus this process's hit / miss counters."""
+        with self._lock:
+            per_model = dict(self._conn.execute(
+                "SELECT COALESCE(model, '?'), COUNT(*) FROM llm_cache GROUP BY model"
+            ).fetchall())
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "mode": self.mode,
+            "entries": per_model,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 🔁 Singleton cache instance
+_llm_cache: Optional[SQLiteLLMCache] = None
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """
+    Returns the shared LLM cache, or None when LLM_CACHE_MODE=off
+    (pass the result as `cache=` to a chat model).
+    """
+    global _llm_cache
+
+    if LLM_CACHE_MODE == "off":
+        return None
+    if _llm_cache is None:
+        _llm_cache = SQLiteLLMCache(get_llm_cache_path())
+
+    return _llm_cache
+
+
+if __name__ == "__main__":
+    cache = SQLiteLLMCache(get_llm_cache_path(), mode="read_write")
+    if "--clear" in sys.argv:
+        cache.clear()
+        print("🧹 LLM cache cleared")
+    print(json.dumps(cache.summary(), indent=2))
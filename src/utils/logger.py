@@ -0,0 +1,235 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/logger.py
+"""
+Non-blocking, sampled, structured logging for the request path.
+
+Debug `print`s of full prompts, raw LLM responses and search payloads did their
+stdout I/O and string formatting synchronously on the request thread. Here:
+
+- 💤 Lazy: `log.debug("enhancer.output", output=final_output)` is one
+  `isEnabledFor` check when DEBUG is off — no formatting, no record. Field
+  values may also be zero-argument callables, evaluated only when written.
+- 📨 Non-blocking: records go through a `QueueHandler` to a background
+  `QueueListener` thread that serialises and writes them; the request thread
+  never formats or touches stdout. When the queue is full, records are dropped
+  (and counted) instead of blocking.
+- 🎲 Sampled: `LOG_SAMPLE_RATES="llm.end=0.1,enhancer.*=0.5"` keeps a fraction
+  of the records of an event type (prefix wildcards allowed).
+- ✂️ Truncated: strings longer than `LOG_MAX_FIELD_CHARS` and lists longer than
+  `LOG_MAX_FIELD_ITEMS` are cut when the record is written.
+
+One JSON object per line (`LOG_FORMAT=text` for a console-friendly layout):
+
+    {"ts": "...", "level": "DEBUG", "logger": "enhancer", "event": "enhancer.output", "output": {...}}
+
+✅ Usage:
+     from utils.logger import get_logger
+     log = get_logger("enhancer")
+     log.debug("enhancer.input", user_input=user_input)
+     log.error("qdrant.search_failed", error=str(e))
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from utils.path_config import SERVICE_NAME
+
+
+# ─── Tunables ──────────────────────────────────────────────
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")                 # json | text
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")          # "event=rate,prefix.*=rate"
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+LOG_MAX_FIELD_ITEMS = int(os.getenv("LOG_MAX_FIELD_ITEMS", "20"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+ROOT_LOGGER = SERVICE_NAME
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """"llm.end=0.1, enhancer.*=0.5" → {"llm.end": 0.1, "enhancer.*": 0.5}"""
+    rates: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+_sample_rates = parse_sample_rates(LOG_SAMPLE_RATES)
+
+
+def sample_rate(event: str) -> float:
+    """Exact event rate, else the longest matching `prefix.*` rate, else 1."""
+    if event in _sample_rates:
+        return _sample_rates[event]
+    best, best_len = 1.0, -1
+    for pattern, rate in _sample_rates.items():
+        if pattern.endswith("*") and event.startswith(pattern[:-1]) and len(pattern) > best_len:
+            best, best_len = rate, len(pattern)
+    return best
+
+
+# ─── Writer side (runs on the listener thread) ─────────────
+def truncate(value: Any, max_chars: int = LOG_MAX_FIELD_CHARS, max_items: int = LOG_MAX_FIELD_ITEMS) -> Any:
+    """JSON-safe copy of `value` with long strings / collections cut."""
+    if callable(value) and not isinstance(value, type):
+        value = value()
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        items = list(value.items())
+        out = {str(k): truncate(v, max_chars, max_items) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            out["…"] = f"+{len(items) - max_items} keys"
+        return out
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        out = [truncate(v, max_chars, max_items) for v in items[:max_items]]
+        if len(items) > max_items:
+            out.append(f"… +{len(items) - max_items} items")
+        return out
+    text = value if isinstance(value, str) else str(value)
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}… (+{len(text) - max_chars} chars)"
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """Record → one JSON line (or `event key=value …` text)."""
+
+    def __init__(self, fmt: str = LOG_FORMAT):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = getattr(record, "event", None) or record.getMessage()
+        fields = truncate(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            fields["exception"] = self.formatException(record.exc_info)
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}"
+
+        if self.fmt == "text":
+            details = " ".join(f"{k}={v}" for k, v in fields.items())
+            return f"{ts} {record.levelname:<7} [{record.name}] {event} {details}".rstrip()
+        return json.dumps(
+            {"ts": ts, "level": record.levelname, "logger": record.name, "event": event, **fields},
+            ensure_ascii=False, default=str,
+        )
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks and never formats on the caller's thread."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process: hand the record over as is; the listener formats it
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# 🔁 Singleton queue handler / listener
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None, stream: Any = None) -> DroppingQueueHandler:
+    """Attach the queue handler to the `ROOT_LOGGER` logger and start the writer thread (idempotent)."""
+    global _queue_handler, _listener
+
+    with _configure_lock:
+        if _queue_handler is None:
+            q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            _queue_handler = DroppingQueueHandler(q)
+
+            writer = logging.StreamHandler(stream or sys.stdout)
+            writer.setFormatter(StructuredFormatter())
+            _listener = QueueListener(q, writer, respect_handler_level=False)
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+            root = logging.getLogger(ROOT_LOGGER)
+            root.addHandler(_queue_handler)
+            root.setLevel(level or LOG_LEVEL)
+            root.propagate = False
+        elif level:
+            logging.getLogger(ROOT_LOGGER).setLevel(level)
+
+    return _queue_handler
+
+
+def shutdown_logging() -> None:
+    """Flush the queue and stop the writer thread."""
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+# ─── Caller side ───────────────────────────────────────────
+class EventLogger:
+    """`log.<level>(event, **fields)`: level check → sampling → enqueue, nothing else."""
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+    def enabled(self, level: int = logging.DEBUG) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def log(self, level: int, event: str, exc_info: Any = None, **fields: Any) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        rate = sample_rate(event)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        self._logger.log(level, event, exc_info=exc_info, extra={"event": event, "fields": fields})
+
+    def debug(self, event: str, **fields: Any) -> None:
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, exc_info: Any = None, **fields: Any) -> None:
+        self.log(logging.ERROR, event, exc_info=exc_info, **fields)
+
+
+def get_logger(name: str) -> EventLogger:
+    """Structured logger `<ROOT_LOGGER>.<name>`; configures the queue / writer on first use."""
+    configure_logging()
+    return EventLogger(name)
@@ -0,0 +1,329 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/metrics.py
+"""
+Latency metrics: graph nodes, tools, embeddings and LLM calls.
+
+Every timed call is one `observe(kind, name, seconds)`:
+
+    kind       name (examples)
+    node       supervisor, enhancer, qdrant_search
+    tool       keyword_extractor, numeric_constraint_extractor, filter_composer, qdrant_search
+    embedding  embed_query, embed_documents
+    llm        <model name>                 (+ prompt / completion token counters)
+
+and is fanned out to the exporters:
+
+- 📈 `PrometheusExporter` — histograms / counters rendered on `/metrics`
+- 🧪 `InMemoryExporter`   — bounded sample windows with p50 / p95 / p99, for
+  tests, notebooks and the CLI (no Prometheus needed)
+
+Timing costs two `perf_counter()` calls and a lock per observation. Inside a
+traced request every timed call is also a span (`utils.tracing`).
+
+✅ Usage:
+     from utils.metrics import timer, timed, get_metrics
+     with timer("tool", "qdrant_search"):
+         hits = tool.search(...)
+
+     @timed("node", "enhancer")
+     def enhancer_node(state): ...
+
+     get_metrics().memory.snapshot()     # {"tool": {"qdrant_search": {"p95": ...}}}
+
+✅ CLI:
+     python utils/metrics.py             # Prometheus text of this process (empty)
+"""
+
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.path_config import SERVICE_NAME
+from utils.tracing import span
+
+
+# ─── Tunables ──────────────────────────────────────────────
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "2048"))      # samples kept per series in memory
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", SERVICE_NAME)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+# ─── Exporters ─────────────────────────────────────────────
+class InMemoryExporter:
+    """Keeps the last `window` samples per (kind, name) and token totals per model."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._errors: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._tokens: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self._samples[(kind, name)].append(seconds)
+            self._counts[(kind, name)] += 1
+            if error:
+                self._errors[(kind, name)] += 1
+
+    def add_tokens(self, model: str, token_type: str, count: int) -> None:
+        with self._lock:
+            self._tokens[(model, token_type)] += count
+
+    def samples(self, kind: str, name: str) -> List[float]:
+        with self._lock:
+            return list(self._samples.get((kind, name), ()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{kind: {name: {count, errors, mean, p50, p95, p99, max}}, "tokens": {model: {type: n}}}"""
+        with self._lock:
+            series = {key: sorted(values) for key, values in self._samples.items()}
+            counts, errors, tokens = dict(self._counts), dict(self._errors), dict(self._tokens)
+
+        report: Dict[str, Any] = {}
+        for (kind, name), ordered in series.items():
+            if not ordered:
+                continue
+            report.setdefault(kind, {})[name] = {
+                "count": counts[(kind, name)],
+                "errors": errors.get((kind, name), 0),
+                "mean": round(sum(ordered) / len(ordered), 6),
+                "p50": round(_percentile(ordered, 0.50), 6),
+                "p95": round(_percentile(ordered, 0.95), 6),
+                "p99": round(_percentile(ordered, 0.99), 6),
+                "max": round(ordered[-1], 6),
+            }
+        for (model, token_type), count in tokens.items():
+            report.setdefault("tokens", {}).setdefault(model, {})[token_type] = count
+        return report
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
+            self._tokens.clear()
+
+
+class PrometheusExporter:
+    """Prometheus histograms / counters on its own registry (rendered by `/metrics`)."""
+
+    def __init__(self, namespace: str = METRICS_NAMESPACE):
+        from prometheus_client import CollectorRegistry, Counter, Histogram
+
+        self.registry = CollectorRegistry()
+        self._latency = Histogram(
+            "latency_seconds", "Latency of graph nodes, tools, embedding and LLM calls",
+            ["kind", "name"], namespace=namespace, buckets=LATENCY_BUCKETS, registry=self.registry,
+        )
+        self._errors = Counter(
+            "errors_total", "Failed graph nodes, tools, embedding and LLM calls",
+            ["kind", "name"], namespace=namespace, registry=self.registry,
+        )
+        self._tokens = Counter(
+            "llm_tokens_total", "LLM tokens by model and type (prompt / completion)",
+            ["model", "type"], namespace=namespace, registry=self.registry,
+        )
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False) -> None:
+        self._latency.labels(kind, name).observe(seconds)
+        if error:
+            self._errors.labels(kind, name).inc()
+
+    def add_tokens(self, model: str, token_type: str, count: int) -> None:
+        self._tokens.labels(model, token_type).inc(count)
+
+    def render(self) -> Tuple[bytes, str]:
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+# ─── Metrics facade ────────────────────────────────────────
+class Metrics:
+    """Fans observations out to the in-memory exporter and (if installed) Prometheus."""
+
+    def __init__(self, prometheus: bool = True):
+        self.memory = InMemoryExporter()
+        self.prometheus: Optional[PrometheusExporter] = None
+        if prometheus:
+            try:
+                self.prometheus = PrometheusExporter()
+            except ImportError:
+                print("[METRICS] prometheus_client not installed: /metrics disabled, in-memory only")
+        self._exporters = [e for e in (self.memory, self.prometheus) if e is not None]
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False) -> None:
+        if not METRICS_ENABLED:
+            return
+        for exporter in self._exporters:
+            exporter.observe(kind, name, seconds, error)
+
+    def add_tokens(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        if not METRICS_ENABLED:
+            return
+        for exporter in self._exporters:
+            if prompt_tokens:
+                exporter.add_tokens(model, "prompt", prompt_tokens)
+            if completion_tokens:
+                exporter.add_tokens(model, "completion", completion_tokens)
+
+    def render_prometheus(self) -> Tuple[bytes, str]:
+        if self.prometheus is None:
+            raise RuntimeError("prometheus_client is not installed")
+        return self.prometheus.render()
+
+
+# 🔁 Singleton metrics instance
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+
+    return _metrics
+
+
+@contextmanager
+def timer(kind: str, name: str) -> Iterator[None]:
+    """Time the block as one `kind`/`name` observation (failures are counted as errors) and span."""
+    started = time.perf_counter()
+    error = False
+    try:
+        with span(f"{kind}.{name}"):
+            yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        get_metrics().observe(kind, name, time.perf_counter() - started, error)
+
+
+def timed(kind: str, name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of `timer` (name defaults to the function name)."""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timer(kind, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ─── LangChain callback: LLM + tool calls ──────────────────
+def model_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    params = kwargs.get("invocation_params") or {}
+    model = params.get("model") or params.get("model_name")
+    if not model and serialized:
+        model = (serialized.get("kwargs") or {}).get("model") or (serialized.get("kwargs") or {}).get("model_name")
+    return model or (serialized or {}).get("name") or "unknown"
+
+
+def token_usage(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) tokens from an LLMResult (provider usage or message usage_metadata)."""
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage:
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+    prompt = completion = 0
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += int(metadata.get("input_tokens") or 0)
+            completion += int(metadata.get("output_tokens") or 0)
+    return prompt, completion
+
+
+class MetricsCallback(BaseCallbackHandler):
+    """Times every LLM and tool run it sees (keyed by run_id) and counts LLM tokens."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running: Dict[UUID, Tuple[str, str, float]] = {}
+
+    def _start(self, run_id: UUID, kind: str, name: str) -> None:
+        with self._lock:
+            self._running[run_id] = (kind, name, time.perf_counter())
+
+    def _end(self, run_id: UUID, error: bool = False) -> Optional[str]:
+        with self._lock:
+            started = self._running.pop(run_id, None)
+        if started is None:
+            return None
+        kind, name, t0 = started
+        get_metrics().observe(kind, name, time.perf_counter() - t0, error)
+        return name
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm", model_name(serialized, kwargs))
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm", model_name(serialized, kwargs))
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        model = self._end(run_id)
+        if model is not None:
+            get_metrics().add_tokens(model, *token_usage(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=True)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "tool", (serialized or {}).get("name") or kwargs.get("name") or "unknown")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=True)
+
+
+# 🔁 Singleton callback (one instance, so LangChain de-duplicates it across config / model callbacks)
+_metrics_callback: Optional[MetricsCallback] = None
+
+
+def get_metrics_callback() -> MetricsCallback:
+    global _metrics_callback
+
+    with _metrics_lock:
+        if _metrics_callback is None:
+            _metrics_callback = MetricsCallback()
+
+    return _metrics_callback
+
+
+if __name__ == "__main__":
+    body, _ = get_metrics().render_prometheus()
+    print(body.decode())
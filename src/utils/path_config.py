@@ -1,6 +1,9 @@
 import os
 import sys
 
+# Project name: logger root, Prometheus metric prefix and trace service name
+SERVICE_NAME = os.getenv("SERVICE_NAME", "company_talk2data")
+
 def get_base_dir(levels_up: int = 1) -> str:
     """
     Returns the base directory of the project.
@@ -59,4 +62,73 @@ def get_schema_path() -> str:
     base_dir = get_base_dir()
 
     return os.path.join(base_dir, "schema", "payload_schema.json")
-#print(f"Schema path: {get_schema_path()}")
\ No newline at end of file
+#print(f"Schema path: {get_schema_path()}")
+
+
+# Get the directory for prebuilt artifacts (automata, dictionaries, caches)
+
+def get_artifacts_dir() -> str:
+    " GET directory for build-time artifacts (created on demand) "
+
+    path = os.path.join(get_base_dir(), "Data", "artifacts")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_keyword_automaton_path() -> str:
+    " GET path of the serialized keyword Aho-Corasick automaton "
+
+    return os.path.join(get_artifacts_dir(), "keyword_automaton.pkl")
+#print(f"Keyword automaton path: {get_keyword_automaton_path()}")
+
+
+# Get the SymSpell frequency dictionary and its prebuilt index
+
+def get_dictionary_path() -> str:
+    " GET path of the SymSpell English frequency dictionary "
+
+    return os.path.join(get_base_dir(), "Data", "frequency_dictionary_en_82_765.txt")
+
+
+def get_normalizer_artifact_dir() -> str:
+    " GET directory of the prebuilt (mmap-able) query-normalizer index "
+
+    path = os.path.join(get_artifacts_dir(), "query_normalizer")
+    os.makedirs(path, exist_ok=True)
+    return path
+#print(f"Dictionary path: {get_dictionary_path()}")
+
+
+# Get the on-disk enhancer cache (SQLite)
+
+def get_enhancer_cache_path() -> str:
+    " GET path of the persistent enhancer-output cache "
+
+    return os.path.join(get_artifacts_dir(), "enhancer_cache.sqlite")
+#print(f"Enhancer cache path: {get_enhancer_cache_path()}")
+
+
+# Get the on-disk LLM response cache / record-replay store (SQLite)
+
+def get_llm_cache_path() -> str:
+    " GET path of the LLM response cache (LLM_CACHE_PATH overrides it) "
+
+    return os.getenv("LLM_CACHE_PATH") or os.path.join(get_artifacts_dir(), "llm_cache.sqlite")
+#print(f"LLM cache path: {get_llm_cache_path()}")
+
+
+# Get the chat-session checkpoint database (SQLite)
+
+def get_session_db_path() -> str:
+    " GET path of the LangGraph checkpoint store backing multi-turn sessions "
+
+    return os.getenv("SESSION_DB_PATH") or os.path.join(get_artifacts_dir(), "sessions.sqlite")
+#print(f"Session DB path: {get_session_db_path()}")
+
+# Get the local trace export file (OTLP/JSON lines)
+
+def get_traces_path() -> str:
+    " GET path of the request-trace export file (TRACE_EXPORT_PATH overrides it) "
+
+    return os.getenv("TRACE_EXPORT_PATH") or os.path.join(get_artifacts_dir(), "traces.jsonl")
+#print(f"Traces path: {get_traces_path()}")
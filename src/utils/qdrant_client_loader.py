@@ -5,22 +5,35 @@ Qdrant client loader utility.
 
 ✅ Features:
 - Returns a singleton QdrantClient for local storage
+- Returns a singleton AsyncQdrantClient for the async request path
 - Points to localhost:6333 (Docker REST endpoint)
 - Centralized access to collection name
+- Default per-request timeout (env `QDRANT_TIMEOUT_SECONDS`); search calls pass
+  a tighter one from the request deadline (agents.search_pipeline.qdrant_timeout)
 
 ✅ Usage:
      from utils.qdrant_client_loader import get_qdrant_client, get_qdrant_collection_name
+     from utils.qdrant_client_loader import get_async_qdrant_client
 """
 
-from qdrant_client import QdrantClient
+import os
 
+from qdrant_client import AsyncQdrantClient, QdrantClient
 
-# 🔁 Singleton client instance
+
+# 🔁 Singleton client instances
 _qdrant_client = None
+_async_qdrant_client = None
+
+# 📡 Docker REST endpoint
+_QDRANT_URL = "http://localhost:6333"
 
 # 📦 Centralized collection name
 _QDRANT_COLLECTION_NAME = "indian_startups"
 
+# ⏱️ Whole seconds per request when the call does not pass its own timeout
+QDRANT_TIMEOUT_SECONDS = int(os.getenv("QDRANT_TIMEOUT_SECONDS", "5"))
+
 
 def get_qdrant_client() -> QdrantClient:
     """
@@ -29,12 +42,24 @@ def get_qdrant_client() -> QdrantClient:
     global _qdrant_client
 
     if _qdrant_client is None:
-        print("[Qdrant Client] Connecting to Docker server at http://localhost:6333")
-        _qdrant_client = QdrantClient(url="http://localhost:6333")
+        print(f"[Qdrant Client] Connecting to Docker server at {_QDRANT_URL}")
+        _qdrant_client = QdrantClient(url=_QDRANT_URL, timeout=QDRANT_TIMEOUT_SECONDS)
 
     return _qdrant_client
 
 
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """
+    Returns a cached singleton AsyncQdrantClient (same server) for code running on the event loop.
+    """
+    global _async_qdrant_client
+
+    if _async_qdrant_client is None:
+        _async_qdrant_client = AsyncQdrantClient(url=_QDRANT_URL, timeout=QDRANT_TIMEOUT_SECONDS)
+
+    return _async_qdrant_client
+
+
 def get_qdrant_collection_name() -> str:
     """
     Returns the name of the Qdrant collection to use for queries.
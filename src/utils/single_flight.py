@@ -0,0 +1,187 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/single_flight.py
+"""
+Single-flight request coalescing: identical calls in flight at the same time
+share ONE computation.
+
+When a popular query spikes, N identical `/chat` requests would each run the
+enhancer LLM, embed the query and search Qdrant. With single flight the first
+caller for a key (the leader) runs the work; every caller arriving while it is
+in flight (a follower) waits for the leader's result instead. Upstream load is
+proportional to the number of unique keys in flight, not to the request count.
+
+- ⏳ Bounded wait: followers wait at most `SINGLE_FLIGHT_WAIT_SECONDS` (or the
+  smaller `timeout=` passed by the caller, e.g. the remaining request budget)
+  and then raise `CoalesceTimeout` — a `TimeoutError`, so the callers' existing
+  deadline handling applies
+- 💥 Errors: the leader's exception is raised in every follower
+- 🧹 Nothing is cached: the key is released as soon as the leader finishes
+- 🛡️ Async: the work runs as its own task, so a leader whose client goes away
+  does not cancel the followers' result
+
+Layers (each with its own group): "chat" (API, normalized query), "enhancer"
+(LLM enhancement, normalized query), "search" (query, filters, k).
+
+✅ Usage:
+     flight = get_single_flight("search")
+     hits = flight.do(key, run_direct_search, payload)              # threads
+     hits = await flight.ado(key, arun_direct_search, payload)      # event loop
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.logger import get_logger
+from utils.tracing import set_attributes
+
+
+# ─── Tunables ──────────────────────────────────────────────
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") != "0"
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "15"))
+
+log = get_logger("single_flight")
+
+
+class CoalesceTimeout(TimeoutError):
+    """A follower gave up waiting for the leader's in-flight computation."""
+
+
+class SingleFlight:
+    """In-flight calls by key; the first caller runs, concurrent callers share its outcome."""
+
+    def __init__(self, name: str, wait_seconds: float = SINGLE_FLIGHT_WAIT_SECONDS):
+        self.name = name
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}                 # threads
+        self._tasks: Dict[str, asyncio.Task] = {}           # event loop
+        self._stats: Dict[str, int] = {"leaders": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _wait(self, timeout: Optional[float]) -> float:
+        return self.wait_seconds if timeout is None else max(0.0, min(self.wait_seconds, timeout))
+
+    def _joined(self, key: str) -> None:
+        self._count("coalesced")
+        set_attributes(coalesced=self.name)
+        log.debug("single_flight.coalesced", group=self.name, key=key)
+
+    def _timed_out(self, key: str, wait: float) -> CoalesceTimeout:
+        self._count("timeouts")
+        log.warning("single_flight.timeout", group=self.name, key=key, wait_seconds=wait)
+        return CoalesceTimeout(f"{self.name}: in-flight call not done within {wait:g}s")
+
+    # ─── Threads ───────────────────────────────────────────
+    def do(self, key: str, fn: Callable[..., Any], *args: Any,
+           timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """`fn(*args, **kwargs)`, shared with every concurrent `do` for the same key."""
+        if not SINGLE_FLIGHT:
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._stats["leaders"] += 1
+
+        if not leader:
+            self._joined(key)
+            wait = self._wait(timeout)
+            try:
+                return future.result(timeout=wait)
+            except FutureTimeout:
+                if future.done():
+                    raise               # the leader's own TimeoutError
+                raise self._timed_out(key, wait) from None
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._release(key)
+            self._count("errors")
+            future.set_exception(e)
+            raise
+        self._release(key)
+        future.set_result(result)
+        return result
+
+    def _release(self, key: str) -> None:
+        # Callers arriving from now on start a fresh call
+        with self._lock:
+            self._calls.pop(key, None)
+
+    # ─── Event loop ────────────────────────────────────────
+    async def ado(self, key: str, fn: Callable[..., Awaitable[Any]], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """`await fn(*args, **kwargs)`, shared with every concurrent `ado` for the same key."""
+        if not SINGLE_FLIGHT:
+            return await fn(*args, **kwargs)
+
+        task = self._tasks.get(key)
+        if task is None:
+            self._count("leaders")
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda done: self._finished(key, done))
+            # Shielded: cancelling the leader's request leaves the work to the followers
+            return await asyncio.shield(task)
+
+        self._joined(key)
+        wait = self._wait(timeout)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=wait)
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise self._timed_out(key, wait) from None
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._count("errors")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = len(self._calls) + len(self._tasks)
+        return stats
+
+
+# 🔁 One SingleFlight per layer, created on first use
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Returns the process-wide SingleFlight group `name` ("chat", "enhancer", "search")."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Leaders / coalesced / timeouts / errors per group for this process."""
+    with _groups_lock:
+        groups = dict(_groups)
+    return {name: group.stats() for name, group in groups.items()}
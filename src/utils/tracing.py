@@ -0,0 +1,350 @@
+# %%
+import sys, os
+try:
+    # ✅ Running from a Python script (.py file)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",))
+except NameError:
+    # ✅ Running from a Jupyter notebook (__file__ is not defined)
+    TOOLS_PATH = os.path.abspath(os.path.join(os.getcwd(), ".."))
+
+SRC_PATH = os.path.join(TOOLS_PATH)
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+
+# src/utils/tracing.py
+"""
+OpenTelemetry-style request tracing with local file export.
+
+One request = one trace: a root span opened by the API (`start_trace`) and
+child spans for everything below it, parented through a contextvar:
+
+    POST /chat                               request_id, query
+    ├── node.supervisor
+    ├── node.enhancer                        filters, k
+    │   ├── tool.keyword_extractor
+    │   ├── llm.<model>                      prompt_tokens, completion_tokens
+    │   └── tool.<agent tool>
+    ├── node.qdrant_search
+    │   ├── tool.qdrant_search               filters, k, hits
+    │   │   └── embedding.embed_query        batch_size
+    ...
+
+Node / tool / embedding spans come from `utils.metrics.timer` (every timed call
+is also a span); LLM and agent-tool spans from `TracingCallback`. Spans outside
+a trace are no-ops, so library code can be instrumented unconditionally.
+
+Finished traces are written by a background thread as OTLP/JSON
+(`{"resourceSpans": [...]}`, one trace per line) to `Data/artifacts/traces.jsonl`
+— loadable by an OpenTelemetry collector's file receiver, no service needed.
+
+✅ Usage:
+     with start_trace("POST /chat", request_id=rid, query=q):
+         with span("tool.qdrant_search", k=5) as s:
+             hits = search(...)
+             set_attributes(hits=len(hits))
+
+✅ CLI:
+     python utils/tracing.py chrome [out.json]   # Chrome trace events → Perfetto / chrome://tracing flame graph
+     python utils/tracing.py tree               # indented timeline of the latest trace
+"""
+
+import contextvars
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.path_config import SERVICE_NAME, get_traces_path
+
+
+# ─── Tunables ──────────────────────────────────────────────
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") != "0"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_MAX_ATTRIBUTE_CHARS = int(os.getenv("TRACE_MAX_ATTRIBUTE_CHARS", "512"))
+
+_STATUS_OK, _STATUS_ERROR = 1, 2
+
+
+class Span:
+    """One timed operation; `trace` is the list of finished spans shared by the whole trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "message", "trace")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.status = _STATUS_OK
+        self.message = ""
+        self.trace: Dict[str, Any] = parent.trace if parent else {"spans": [], "exported": False}
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = _STATUS_ERROR
+        self.message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self.trace["spans"].append(self)
+        if not self.parent_id:
+            _export(self.trace["spans"])
+            self.trace["exported"] = True
+        elif self.trace["exported"]:
+            # Finished after its request (e.g. an abandoned call past the deadline)
+            _export([self])
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span (no-op outside a trace)."""
+    active = _current.get()
+    if active is not None:
+        active.set_attributes(**attributes)
+
+
+@contextmanager
+def _activate(active: Span) -> Iterator[Span]:
+    token = _current.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.record_error(e)
+        raise
+    finally:
+        active.end()
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Exited in another context (async generator resumed elsewhere)
+            _current.set(None)
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Root span of a request (sampled by TRACE_SAMPLE_RATE); yields None when not traced."""
+    if not TRACING_ENABLED or random.random() >= TRACE_SAMPLE_RATE:
+        yield None
+        return
+    with _activate(Span(name, **attributes)) as root:
+        yield root
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current one; no-op (yields None) outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    with _activate(Span(name, parent, **attributes)) as child:
+        yield child
+
+
+# ─── OTLP/JSON export (background writer) ──────────────────
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    return {"stringValue": text[:TRACE_MAX_ATTRIBUTE_CHARS]}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": f"{SERVICE_NAME}.tracing"},
+                "spans": [{
+                    "traceId": s.trace_id,
+                    "spanId": s.span_id,
+                    "parentSpanId": s.parent_id,
+                    "name": s.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [
+                        {"key": k, "value": _attribute_value(v)} for k, v in s.attributes.items() if v is not None
+                    ],
+                    "status": {"code": s.status, "message": s.message},
+                } for s in spans],
+            }],
+        }]
+    }
+
+
+# 🔁 Singleton writer thread (one worker → lines are never interleaved)
+_writer: Optional[ThreadPoolExecutor] = None
+_writer_lock = threading.Lock()
+
+
+def _write(spans: List[Span]) -> None:
+    path = get_traces_path()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(to_otlp(spans), ensure_ascii=False) + "\n")
+
+
+def _export(spans: List[Span]) -> None:
+    global _writer
+
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+    _writer.submit(_write, list(spans))
+
+
+def flush(timeout: Optional[float] = None) -> None:
+    """Wait until every trace submitted so far is on disk."""
+    if _writer is not None:
+        _writer.submit(lambda: None).result(timeout=timeout)
+
+
+# ─── LangChain callback: LLM + agent tool spans ────────────
+class TracingCallback(BaseCallbackHandler):
+    """Opens a span per LLM / tool run under the span active where the run started."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running: Dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, name: str, **attributes: Any) -> None:
+        parent = _current.get()
+        if parent is None:
+            return
+        with self._lock:
+            self._running[run_id] = Span(name, parent, **attributes)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        with self._lock:
+            running = self._running.pop(run_id, None)
+        if running is None:
+            return
+        running.set_attributes(**attributes)
+        if error is not None:
+            running.record_error(error)
+        running.end()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        from utils.metrics import model_name     # utils.metrics imports this module
+        self._start(run_id, f"llm.{model_name(serialized, kwargs)}")
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID, **kwargs: Any) -> None:
+        from utils.metrics import model_name     # utils.metrics imports this module
+        self._start(run_id, f"llm.{model_name(serialized, kwargs)}")
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        from utils.metrics import token_usage
+        prompt_tokens, completion_tokens = token_usage(response)
+        self._end(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, f"tool.{(serialized or {}).get('name') or 'unknown'}", input=input_str)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+
+# 🔁 Singleton callback (one instance, so LangChain de-duplicates it across config / model callbacks)
+_tracing_callback: Optional[TracingCallback] = None
+
+
+def get_tracing_callback() -> TracingCallback:
+    global _tracing_callback
+
+    with _writer_lock:
+        if _tracing_callback is None:
+            _tracing_callback = TracingCallback()
+
+    return _tracing_callback
+
+
+# ─── Offline viewing ───────────────────────────────────────
+def load_traces(path: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+    """Exported file → list of traces, each a list of OTLP span dicts."""
+    traces: List[List[Dict[str, Any]]] = []
+    with open(path or get_traces_path(), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                traces.append([s for rs in record["resourceSpans"] for ss in rs["scopeSpans"] for s in ss["spans"]])
+    return traces
+
+
+def to_chrome_trace(traces: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Chrome trace-event format ("X" events, µs): one row (tid) per trace."""
+    events = []
+    for tid, spans in enumerate(traces):
+        for s in spans:
+            start_us = int(s["startTimeUnixNano"]) // 1000
+            events.append({
+                "name": s["name"], "ph": "X", "pid": 1, "tid": tid,
+                "ts": start_us, "dur": int(s["endTimeUnixNano"]) // 1000 - start_us,
+                "args": {a["key"]: next(iter(a["value"].values())) for a in s["attributes"]},
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def format_tree(spans: List[Dict[str, Any]]) -> str:
+    """Indented timeline of one trace: offset, duration and name per span."""
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        children.setdefault(s["parentSpanId"], []).append(s)
+    roots = children.get("", [])
+    t0 = min(int(s["startTimeUnixNano"]) for s in spans)
+    lines: List[str] = []
+
+    def walk(node: Dict[str, Any], depth: int) -> None:
+        start_ms = (int(node["startTimeUnixNano"]) - t0) / 1e6
+        dur_ms = (int(node["endTimeUnixNano"]) - int(node["startTimeUnixNano"])) / 1e6
+        flag = " ❌" if node["status"]["code"] == _STATUS_ERROR else ""
+        lines.append(f"{start_ms:9.1f} ms {dur_ms:9.1f} ms  {'  ' * depth}{node['name']}{flag}")
+        for child in sorted(children.get(node["spanId"], []), key=lambda c: int(c["startTimeUnixNano"])):
+            walk(child, depth + 1)
+
+    for root in roots:
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "tree"
+    traces = load_traces()
+    if command == "chrome":
+        out = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(get_traces_path())[0] + ".chrome.json"
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(to_chrome_trace(traces), f)
+        print(f"✅ {len(traces)} traces → {out}")
+    elif traces:
+        print(format_tree(traces[-1]))